@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""Atomic, skip-if-unchanged writer for the JSON artifacts the build scripts emit.
+
+Every artifact is serialized once (indent=2, ensure_ascii=False, trailing newline),
+compared with the bytes already on disk and only written when they differ, so
+watch:cache and Vite HMR are not woken up by no-op rebuilds. Writes go to a temp
+file in the target directory and are renamed into place, so a reader (or a second
+build racing this one) never sees a truncated file.
+
+cache_lock() takes an advisory lock on cache/ for the duration of a build; a second
+generate_cache.py / rebuild_locale_post_caches.py run waits for the first to finish.
+Locking is a no-op where fcntl is unavailable.
+
+Stdlib-only.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Iterator
+
+import pipeline_profile
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None  # type: ignore[assignment]
+
+LOCK_NAME = ".build.lock"
+
+# mkstemp creates 0600 files; give artifacts the mode a plain open() would.
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+_FILE_MODE = 0o666 & ~_UMASK
+
+
+def dumps(payload: Any) -> str:
+    return json.dumps(payload, indent=2, ensure_ascii=False) + "\n"
+
+
+def envelope(fields: dict[str, Any], key: str, text: str) -> str:
+    """Wrap already-serialized JSON as the last value of an object, as dumps() would.
+
+    envelope({"url": u}, "posts", dumps(posts)) == dumps({"url": u, "posts": posts}),
+    without serializing posts a second time.
+    """
+    head = "".join(f"  {json.dumps(k, ensure_ascii=False)}: {json.dumps(v, ensure_ascii=False)},\n" for k, v in fields.items())
+    body = text.rstrip("\n").replace("\n", "\n  ")
+    return "{\n" + head + f"  {json.dumps(key, ensure_ascii=False)}: {body}\n}}\n"
+
+
+def _unchanged(path: Path, data: bytes) -> bool:
+    try:
+        if path.stat().st_size != len(data):
+            return False
+        return path.read_bytes() == data
+    except OSError:
+        return False
+
+
+def write_text(path: Path, text: str) -> bool:
+    """Atomically write text (UTF-8) unless the file already holds it; returns True if written."""
+    return write_bytes(path, text.encode("utf-8"))
+
+
+def write_bytes(path: Path, data: bytes) -> bool:
+    """Atomically write data unless the file already holds it; returns True if written."""
+    if _unchanged(path, data):
+        pipeline_profile.count("files_unchanged")
+        return False
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=path.parent)
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(data)
+        os.chmod(tmp, _FILE_MODE)
+        os.replace(tmp, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.unlink(tmp)
+        raise
+    pipeline_profile.count("files_written")
+    pipeline_profile.count("bytes_written", len(data))
+    return True
+
+
+def write_json(path: Path, payload: Any) -> bool:
+    return write_text(path, dumps(payload))
+
+
+def write_json_pair(
+    path: Path, api_path: Path, payload: Any, fields: dict[str, Any], key: str
+) -> tuple[bool, bool]:
+    """Write payload to path and {**fields, key: payload} to api_path from one serialization."""
+    text = dumps(payload)
+    return write_text(path, text), write_text(api_path, envelope(fields, key, text))
+
+
+@contextlib.contextmanager
+def cache_lock(directory: Path) -> Iterator[None]:
+    """Hold an exclusive advisory lock on directory/.build.lock (blocking)."""
+    if fcntl is None:
+        yield
+        return
+    directory.mkdir(parents=True, exist_ok=True)
+    with open(directory / LOCK_NAME, "a") as fh:
+        fcntl.flock(fh.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(fh.fileno(), fcntl.LOCK_UN)
@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""Scaling benchmark for the cache pipeline on synthetic corpora.
+
+For each corpus size (default 100 and 1000 posts) this builds a throwaway react-app
+tree in a temp dir: a Neotoma export with revision duplicates, src/content/posts
+markdown with summary sidecars and drafts, conventional hero/OG image files, and
+translations.<locale>.json for every supported locale, written in each locale's
+script (Devanagari, Bengali, Arabic, Cyrillic, Han, accented Latin). The scripts
+are copied into the tree, so the real cache/ is never touched.
+
+Stages, each run as a subprocess with --profile (see pipeline_profile.py):
+
+- generate_full:        generate_cache.py --full
+- rebuild_locales:      rebuild_locale_post_caches.py (posts.en.json seeded from posts.json)
+- generate_incremental: generate_cache.py with nothing changed (hydrates 13 locales)
+
+Wall time, peak RSS and bytes written per stage are compared with a stored baseline
+(--baseline, default scripts/bench_cache_pipeline.baseline.json, committed so CI and
+every checkout compare against the same numbers). A metric that is worse by more
+than --threshold (and by more than a small absolute slack) fails the run;
+--save-baseline records the current numbers instead. Without a baseline the run
+only prints its numbers, unless --require-baseline (CI) makes that a failure.
+Offline and stdlib-only.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+DEFAULT_BASELINE = SCRIPT_DIR / "bench_cache_pipeline.baseline.json"
+STAGES = ("generate_full", "rebuild_locales", "generate_incremental")
+METRICS = ("wall_s", "peak_rss_mib", "bytes_written")
+# Absolute slack per metric so tiny corpora do not fail on noise.
+SLACK = {"wall_s": 0.25, "peak_rss_mib": 8.0, "bytes_written": 64 * 1024}
+
+# Code point ranges used to render synthetic "translations" in each locale's script.
+LOCALE_SCRIPTS: dict[str, list[tuple[int, int]]] = {
+    "es": [(0x61, 0x7A), (0xE1, 0xFA)],
+    "ca": [(0x61, 0x7A), (0xE0, 0xFC)],
+    "fr": [(0x61, 0x7A), (0xE0, 0xFB)],
+    "pt": [(0x61, 0x7A), (0xE0, 0xFA)],
+    "de": [(0x61, 0x7A), (0xE4, 0xFC)],
+    "id": [(0x61, 0x7A)],
+    "zh": [(0x4E00, 0x9FA5)],
+    "hi": [(0x0915, 0x0939), (0x093E, 0x094C)],
+    "bn": [(0x0995, 0x09B9), (0x09BE, 0x09CC)],
+    "ar": [(0x0627, 0x064A)],
+    "ur": [(0x0627, 0x064A), (0x0679, 0x06D2)],
+    "ru": [(0x0430, 0x044F)],
+}
+WORDS = (
+    "memory agent state truth ledger local first provenance schema entity timeline "
+    "record import export sync privacy user data model build deploy cache locale"
+).split()
+
+
+def _words(rng: random.Random, n: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(n))
+
+
+def _markdown_body(rng: random.Random, chars: int) -> str:
+    parts: list[str] = []
+    size = 0
+    while size < chars:
+        kind = rng.random()
+        if kind < 0.12:
+            block = f"## {_words(rng, 4).title()}"
+        elif kind < 0.22:
+            block = "\n".join(f"- {_words(rng, rng.randint(4, 12))}" for _ in range(rng.randint(2, 5)))
+        elif kind < 0.3:
+            block = f"{_words(rng, 20)} [{_words(rng, 2)}](https://example.com/{rng.randint(1, 999)}) {_words(rng, 10)}."
+        else:
+            block = _words(rng, rng.randint(40, 120)).capitalize() + "."
+        parts.append(block)
+        size += len(block) + 2
+    return "\n\n".join(parts)
+
+
+def _script_table(rng: random.Random, ranges: list[tuple[int, int]]) -> dict[int, str]:
+    """Letter -> character in the locale's script, for str.translate."""
+    table: dict[int, str] = {}
+    for ch in "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ":
+        lo, hi = rng.choice(ranges)
+        table[ord(ch)] = chr(rng.randint(lo, hi))
+    return table
+
+
+def _write(path: Path, text: str) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding="utf-8")
+
+
+def make_corpus(root: Path, posts: int, body_chars: int, seed: int = 7) -> Path:
+    """Synthetic react-app tree under root; returns the react-app dir."""
+    rng = random.Random(seed)
+    app = root / "react-app"
+    scripts = app / "scripts"
+    scripts.mkdir(parents=True)
+    for py in SCRIPT_DIR.glob("*.py"):
+        shutil.copy2(py, scripts / py.name)
+    posts_dir = app / "src" / "content" / "posts"
+    images = app / "public" / "images" / "posts"
+    og = app / "public" / "images" / "og"
+    for d in (posts_dir / "drafts", images, og, app / "cache" / "api"):
+        d.mkdir(parents=True, exist_ok=True)
+
+    export_posts: list[dict[str, Any]] = []
+    sources: dict[str, dict[str, str]] = {}
+    for i in range(posts):
+        slug = f"synthetic-post-{i:05d}"
+        # Log-normal-ish lengths: most posts short, a tail of long essays.
+        chars = int(body_chars * min(6.0, rng.lognormvariate(0, 0.6)))
+        body = _markdown_body(rng, chars)
+        title = _words(rng, rng.randint(3, 8)).title()
+        excerpt = _words(rng, 30).capitalize() + "."
+        record = {
+            "slug": slug,
+            "title": title,
+            "excerpt": excerpt,
+            "body": body,
+            "published": i % 10 != 0,
+            "published_date": f"20{10 + i % 15:02d}-{1 + i % 12:02d}-{1 + i % 28:02d}",
+            "category": rng.choice(["essay", "technical", "personal"]),
+            "tags": json.dumps(rng.sample(WORDS, 3)),
+            "share_tweet": _words(rng, 15),
+        }
+        export_posts.append(record)
+        # Older revisions that must lose the dedupe ranking.
+        for rev in range(i % 3):
+            export_posts.append(dict(record, body=body[: len(body) // 2], published=False, updated_date=f"2000-01-0{rev + 1}"))
+        sources[slug] = {"title": title, "excerpt": excerpt, "summary": excerpt, "body": body}
+        if i % 2 == 0:
+            _write(posts_dir / f"{slug}.md", f"---\ntitle: {title}\n---\n\n{body}\n")
+        if i % 5 == 0:
+            _write(posts_dir / f"{slug}.summary.md", _words(rng, 40) + "\n")
+        if i % 3 == 0:
+            _write(images / f"{slug}-hero.png", "png")
+            _write(images / f"{slug}-hero-square.png", "png")
+        if i % 4 == 0:
+            _write(og / f"{slug}-1200x630.jpg", "jpg")
+    for i in range(max(1, posts // 50)):
+        _write(posts_dir / "drafts" / f"synthetic-draft-{i:04d}.md", f"---\ntitle: Draft {i}\n---\n\n{_markdown_body(rng, 2000)}\n")
+    rng.shuffle(export_posts)
+    _write(app / "data" / "export.json", json.dumps({"posts": export_posts, "links": [], "timeline": []}))
+
+    for locale, ranges in LOCALE_SCRIPTS.items():
+        # Same shape as the English text (markdown markers, spaces), letters in the locale's script.
+        table = _script_table(rng, ranges)
+        translations = {
+            slug: {field: text.translate(table) for field, text in fields.items()}
+            for slug, fields in sources.items()
+        }
+        _write(posts_dir / f"translations.{locale}.json", json.dumps(translations, ensure_ascii=False, indent=2))
+    return app
+
+
+def _run_stage(app: Path, stage: str, profile_dir: Path) -> dict[str, Any]:
+    scripts = app / "scripts"
+    export = str(app / "data" / "export.json")
+    if stage == "generate_full":
+        cmd = [str(scripts / "generate_cache.py"), "--from-neotoma-json", export, "--full"]
+    elif stage == "generate_incremental":
+        cmd = [str(scripts / "generate_cache.py"), "--from-neotoma-json", export]
+    else:
+        # rebuild_locale_post_caches reads posts.en.json, which upstream tooling derives from posts.json.
+        posts = json.loads((app / "cache" / "posts.json").read_text(encoding="utf-8"))
+        _write(app / "cache" / "posts.en.json", json.dumps(posts, ensure_ascii=False, indent=2) + "\n")
+        cmd = [str(scripts / "rebuild_locale_post_caches.py")]
+    out_dir = profile_dir / stage
+    env = dict(os.environ, PIPELINE_PROFILE="1", PIPELINE_PROFILE_DIR=str(out_dir))
+    proc = subprocess.run([sys.executable, *cmd], cwd=app, env=env, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(f"{stage} failed: {proc.stderr.strip()[-2000:]}")
+    report = json.loads(next(out_dir.glob("*.json")).read_text(encoding="utf-8"))
+    return {
+        "wall_s": report["wall_seconds"],
+        "peak_rss_mib": max(report["peak_rss_mib"], report.get("children_peak_rss_mib") or 0),
+        "bytes_written": report["counters"].get("bytes_written", 0),
+    }
+
+
+def regressions(results: dict[str, dict[str, Any]], baseline: dict[str, dict[str, Any]], threshold: float) -> list[str]:
+    out: list[str] = []
+    for key, metrics in results.items():
+        base = baseline.get(key)
+        if not isinstance(base, dict):
+            continue
+        for metric in METRICS:
+            before, now = base.get(metric), metrics[metric]
+            if not isinstance(before, (int, float)):
+                continue
+            if now - before > SLACK[metric] and now > before * (1 + threshold):
+                out.append(f"{key} {metric}: {before:g} -> {now:g} (+{(now - before) / max(before, 1e-9):.0%})")
+    return out
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark generate_cache / rebuild_locale_post_caches scaling.")
+    parser.add_argument("--sizes", default="100,1000", help="Comma-separated post counts (e.g. 100,1000,10000)")
+    parser.add_argument("--body-chars", type=int, default=6_000, help="Median body length in characters")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE, help=f"Baseline JSON (default: {DEFAULT_BASELINE})")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed relative regression (default: 0.25)")
+    parser.add_argument("--save-baseline", action="store_true", help="Write results as the new baseline")
+    parser.add_argument(
+        "--require-baseline", action="store_true", help="Fail when the baseline is missing or has none of these sizes"
+    )
+    parser.add_argument("--keep", action="store_true", help="Keep the synthetic trees (path is printed)")
+    args = parser.parse_args()
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+
+    results: dict[str, dict[str, Any]] = {}
+    tmp = Path(tempfile.mkdtemp(prefix="bench-cache-pipeline-"))
+    try:
+        for size in sizes:
+            app = make_corpus(tmp / str(size), size, args.body_chars)
+            translations = sum(p.stat().st_size for p in (app / "src" / "content" / "posts").glob("translations.*.json"))
+            print(f"Corpus {size} posts: translations {translations / (1 << 20):.1f} MiB", flush=True)
+            for stage in STAGES:
+                results[f"{size}:{stage}"] = _run_stage(app, stage, tmp / str(size) / "profile")
+    finally:
+        if args.keep:
+            print(f"Synthetic trees kept in {tmp}")
+        else:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+    print(f"\n{'posts':>6} {'stage':<22} {'wall (s)':>9} {'peak RSS (MiB)':>15} {'written (MiB)':>14}")
+    for key, r in results.items():
+        size, stage = key.split(":", 1)
+        print(f"{size:>6} {stage:<22} {r['wall_s']:>9.2f} {r['peak_rss_mib']:>15.1f} {r['bytes_written'] / (1 << 20):>14.1f}")
+
+    if args.save_baseline:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps(results, indent=2) + "\n", encoding="utf-8")
+        print(f"\nBaseline saved to {args.baseline}")
+        return 0
+    if not args.baseline.exists():
+        print(f"\nNo baseline at {args.baseline}; run with --save-baseline to record one.")
+        return 1 if args.require_baseline else 0
+    baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+    if args.require_baseline and not any(key in baseline for key in results):
+        print(f"\nFAIL: {args.baseline} has no entries for --sizes {args.sizes}.")
+        return 1
+    found = regressions(results, baseline, args.threshold)
+    if found:
+        print(f"\nFAIL: regressions beyond {args.threshold:.0%}:")
+        for line in found:
+            print(f"  {line}")
+        return 1
+    print(f"\nNo regressions beyond {args.threshold:.0%} vs {args.baseline}.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
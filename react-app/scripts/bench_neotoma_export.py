@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""Benchmark Neotoma export ingestion: whole-document json.loads vs streaming dedupe.
+
+Writes a synthetic export (default 100k post records: a few thousand live slugs,
+each with many revision duplicates) to a temp dir, then loads it in a fresh
+interpreter per loader so peak RSS is not shared between runs:
+
+- current:   generate_cache.load_from_neotoma_json + full `seen` dict dedupe
+- streaming: neotoma_export.load_export on the single file
+- sharded:   neotoma_export.load_export on the same records split into shards
+
+Each loader must produce the same deduped posts. Offline and stdlib-only.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+LOADERS = ("current", "streaming", "sharded")
+
+
+def _synthetic_post(rng: random.Random, slug: str, revision: int, body_chars: int) -> dict:
+    words = ["memory", "agent", "state", "truth", "ledger", "local", "first", "provenance", "schema"]
+    body = " ".join(rng.choice(words) for _ in range(body_chars // 7))[:body_chars]
+    return {
+        "slug": slug,
+        "title": f"Post {slug} r{revision}",
+        "excerpt": body[:160],
+        "body": body,
+        "summary": body[:280] if revision % 2 else "",
+        "published": revision % 3 != 0,
+        "published_date": "2025-01-01" if revision % 4 else None,
+        "updated_date": f"2025-{1 + revision % 12:02d}-{1 + revision % 28:02d}",
+        "category": "essay",
+        "tags": json.dumps(["a", "b"]),
+    }
+
+
+def write_synthetic_export(out_dir: Path, records: int, slugs: int, body_chars: int, shards: int) -> tuple[Path, Path]:
+    """Write export.json and a shards/ dir holding the same records split in order."""
+    rng = random.Random(42)
+    posts = [
+        _synthetic_post(rng, f"slug-{i % slugs}", i // slugs, body_chars)
+        for i in range(records)
+    ]
+    rng.shuffle(posts)
+    export = out_dir / "export.json"
+    export.write_text(json.dumps({"posts": posts, "links": [], "timeline": []}), encoding="utf-8")
+    shard_dir = out_dir / "shards"
+    shard_dir.mkdir()
+    per = -(-records // shards)
+    for n in range(shards):
+        part = posts[n * per : (n + 1) * per]
+        (shard_dir / f"export-{n:03d}.json").write_text(
+            json.dumps({"posts": part, "links": [], "timeline": []}), encoding="utf-8"
+        )
+    return export, shard_dir
+
+
+def _peak_rss_kib() -> int:
+    try:
+        for line in Path("/proc/self/status").read_text().splitlines():
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1])
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def _measure(loader: str, path: Path) -> dict:
+    """Run one loader in this process; returns wall time, peak RSS and a digest of the result."""
+    sys.path.insert(0, str(SCRIPT_DIR))
+    started = time.perf_counter()
+    if loader == "current":
+        import generate_cache
+
+        raw_posts, _, _ = generate_cache.load_from_neotoma_json(path)
+        seen: dict[str, dict] = {}
+        for post in raw_posts:
+            slug = post.get("slug")
+            if not slug:
+                continue
+            existing = seen.get(slug)
+            if existing is None or generate_cache._post_dedupe_rank(post) >= generate_cache._post_dedupe_rank(existing):
+                seen[slug] = post
+        posts = list(seen.values())
+    else:
+        import neotoma_export
+
+        posts, _, _, _ = neotoma_export.load_export(path)
+    wall = time.perf_counter() - started
+    # KiB. ru_maxrss survives fork+exec from the (large) parent, so prefer VmHWM;
+    # RUSAGE_CHILDREN covers the shard pool workers.
+    rss_kib = _peak_rss_kib()
+    rss_kib = max(rss_kib, resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    digest = hashlib.sha256(json.dumps(posts, sort_keys=True).encode("utf-8")).hexdigest()
+    return {"wall_s": wall, "peak_rss_mib": rss_kib / 1024, "posts": len(posts), "digest": digest}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark Neotoma export ingestion.")
+    parser.add_argument("--records", type=int, default=100_000, help="Post records in the export")
+    parser.add_argument("--slugs", type=int, default=4_000, help="Distinct slugs (rest are revisions)")
+    parser.add_argument("--body-chars", type=int, default=1_200, help="Body length per record")
+    parser.add_argument("--shards", type=int, default=4, help="Shard files for the sharded loader")
+    parser.add_argument("--measure", nargs=2, metavar=("LOADER", "PATH"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        loader, path = args.measure
+        print(json.dumps(_measure(loader, Path(path))))
+        return 0
+
+    with tempfile.TemporaryDirectory() as tmp:
+        export, shard_dir = write_synthetic_export(
+            Path(tmp), args.records, args.slugs, args.body_chars, args.shards
+        )
+        size_mib = export.stat().st_size / (1 << 20)
+        print(f"Synthetic export: {args.records} records, {args.slugs} slugs, {size_mib:.1f} MiB")
+        results: dict[str, dict] = {}
+        for loader in LOADERS:
+            target = shard_dir if loader == "sharded" else export
+            proc = subprocess.run(
+                [sys.executable, __file__, "--measure", loader, str(target)],
+                capture_output=True,
+                text=True,
+                check=True,
+            )
+            results[loader] = json.loads(proc.stdout)
+
+    print(f"{'loader':<10} {'wall (s)':>9} {'peak RSS (MiB)':>15} {'posts':>7}")
+    for loader, r in results.items():
+        print(f"{loader:<10} {r['wall_s']:>9.2f} {r['peak_rss_mib']:>15.1f} {r['posts']:>7}")
+
+    digests = {r["digest"] for r in results.values()}
+    if len(digests) != 1:
+        print("FAIL: loaders disagree on deduped posts")
+        return 1
+    print("All loaders produced identical deduped posts.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""Benchmark glossary heading scan/correction over every locale cache.
+
+Loads cache/posts.<locale>.json for all 13 locales (read-only) and runs, per post
+title and body:
+
+- legacy:   the nested loops smoke_i18n_locales.py / rebuild_locale_post_caches.py
+            used before translation_glossary.py (glossary re-read per call in the
+            correction, one re.compile per line x term x pattern)
+- compiled: translation_glossary.Glossary (one alternation regex per locale)
+
+Every --plant-every'th post gets a heading with each of its locale's forbidden
+senses appended, so the hit path is exercised too. Both must report the same
+(term, pattern, line) hits and produce the same corrected texts. Stdlib-only.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+from translation_glossary import GLOSSARY_PATH, load_glossary
+
+ROOT = Path(__file__).resolve().parents[1]
+CACHE_DIR = ROOT / "cache"
+SUPPORTED_LOCALES = ("en", "es", "ca", "zh", "hi", "ar", "fr", "pt", "ru", "bn", "ur", "id", "de")
+
+Texts = list[tuple[str, str]]  # (locale, text)
+
+
+def _legacy_scan(texts: Texts, glossary_path: Path) -> list[tuple[str, str, str]]:
+    forbidden = json.loads(glossary_path.read_text(encoding="utf-8")).get("forbidden_senses", {})
+    hits: list[tuple[str, str, str]] = []
+    for locale, text in texts:
+        for hl in [ln for ln in text.split("\n") if ln.lstrip().startswith("#")]:
+            for en_term, locale_map in forbidden.items():
+                if not isinstance(locale_map, dict) or locale not in locale_map:
+                    continue
+                for bad in locale_map[locale]:
+                    if re.compile(r"\b" + re.escape(bad) + r"\b", re.IGNORECASE).search(hl):
+                        hits.append((en_term, bad, hl))
+    return hits
+
+
+def _legacy_correct(texts: Texts, glossary_path: Path) -> list[str]:
+    out: list[str] = []
+    for locale, text in texts:
+        glossary = json.loads(glossary_path.read_text(encoding="utf-8"))
+        forbidden = glossary.get("forbidden_senses", {})
+        overrides = glossary.get("heading_overrides", {})
+        if locale == "en":
+            out.append(text)
+            continue
+        lines: list[str] = []
+        for line in text.split("\n"):
+            if line.lstrip().startswith("#"):
+                for en_term, locale_map in forbidden.items():
+                    if not isinstance(locale_map, dict) or locale not in locale_map:
+                        continue
+                    repl_map = overrides.get(en_term)
+                    if not isinstance(repl_map, dict) or locale not in repl_map:
+                        continue
+                    for bad in sorted(locale_map[locale], key=len, reverse=True):
+                        line = re.compile(r"\b" + re.escape(bad) + r"\b", re.IGNORECASE).sub(repl_map[locale], line)
+            lines.append(line)
+        out.append("\n".join(lines))
+    return out
+
+
+def _compiled_scan(texts: Texts, glossary_path: Path) -> list[tuple[str, str, str]]:
+    glossary = load_glossary(glossary_path)
+    return [hit for locale, text in texts for hit in glossary.forbidden_in_headings(text, locale)]
+
+
+def _compiled_correct(texts: Texts, glossary_path: Path) -> list[str]:
+    glossary = load_glossary(glossary_path)
+    return [glossary.correct_headings(text, locale) for locale, text in texts]
+
+
+def load_texts(plant_every: int) -> Texts:
+    forbidden = load_glossary(GLOSSARY_PATH).forbidden_senses
+    texts: Texts = []
+    for locale in SUPPORTED_LOCALES:
+        path = CACHE_DIR / f"posts.{locale}.json"
+        if not path.exists():
+            continue
+        planted = [bad for m in forbidden.values() if isinstance(m, dict) for bad in m.get(locale, [])]
+        posts: list[dict[str, Any]] = json.loads(path.read_text(encoding="utf-8"))
+        for i, post in enumerate(posts):
+            for field in ("title", "body"):
+                text = post.get(field) or ""
+                if field == "body" and planted and plant_every and i % plant_every == 0:
+                    text += "".join(f"\n\n## Rousseau: {bad.title()}" for bad in planted)
+                if text:
+                    texts.append((locale, text))
+    return texts
+
+
+def _time(fn: Callable[[Texts, Path], Any], texts: Texts, repeat: int) -> tuple[float, Any]:
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn(texts, GLOSSARY_PATH)
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def main() -> int:
+    p = argparse.ArgumentParser(description="Benchmark glossary heading scan/correction over the locale caches.")
+    p.add_argument("--repeat", type=int, default=5, help="Runs per variant; the best is reported")
+    p.add_argument("--plant-every", type=int, default=10, help="Append forbidden-sense headings to every Nth post (0: none)")
+    args = p.parse_args()
+
+    texts = load_texts(args.plant_every)
+    if not texts:
+        print(f"No locale caches under {CACHE_DIR}; run generate_cache.py first.")
+        return 1
+    locales = len({locale for locale, _ in texts})
+    mib = sum(len(t) for _, t in texts) / (1 << 20)
+    print(f"{len(texts)} titles/bodies across {locales} locale caches ({mib:.1f} MiB of text)")
+
+    failed = False
+    print(f"{'operation':<10} {'legacy (s)':>11} {'compiled (s)':>13} {'speedup':>8} {'hits':>6}")
+    for name, legacy, compiled in (
+        ("scan", _legacy_scan, _compiled_scan),
+        ("correct", _legacy_correct, _compiled_correct),
+    ):
+        legacy_s, legacy_out = _time(legacy, texts, args.repeat)
+        compiled_s, compiled_out = _time(compiled, texts, args.repeat)
+        hits = len(compiled_out) if name == "scan" else sum(a != b for (_, a), b in zip(texts, compiled_out))
+        print(f"{name:<10} {legacy_s:>11.3f} {compiled_s:>13.3f} {legacy_s / max(compiled_s, 1e-9):>7.1f}x {hits:>6}")
+        if legacy_out != compiled_out:
+            print(f"FAIL: legacy and compiled {name} disagree")
+            failed = True
+    if failed:
+        return 1
+    print("Legacy and compiled matchers agree.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""Publish cache/api/**/*.json to public/api as minified JSON with .gz / .br siblings.
+
+The API payloads are static, so they are compressed once here at maximum level
+(gzip -9, brotli quality 11) instead of per request. Brotli output needs the
+optional `brotli` package; without it only .json and .json.gz are written.
+
+Prints a raw / minified / gzip / brotli size report (top-level files one per line,
+api/posts/<locale>/ shards summed per locale) and compares minified sizes with the
+previous build's report (data/tmp/api_size_report.json). The budget covers the
+aggregate payloads only: top-level files (posts.json, search.<locale>.json, ...),
+each directory's index.json, and the summed shards of each directory; a single
+post shard is not budgeted on its own. Exits 1 when one of these grew by more than
+--max-growth (and by more than --slack-bytes); the report is only replaced when the
+budget check passes, or with --accept-growth (or ACCEPT_API_GROWTH=1).
+"""
+
+from __future__ import annotations
+
+import argparse
+import concurrent.futures
+import gzip
+import json
+import os
+import sys
+from pathlib import Path
+from typing import Any
+
+import pipeline_profile
+from artifact_writer import write_bytes, write_text
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+ROOT = Path(__file__).resolve().parents[1]
+CACHE_API_DIR = ROOT / "cache" / "api"
+PUBLIC_API_DIR = ROOT / "public" / "api"
+SIZE_REPORT_JSON = ROOT / "data" / "tmp" / "api_size_report.json"
+
+
+def minify(raw: bytes) -> bytes:
+    return json.dumps(json.loads(raw), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def build_artifact(src: Path, dest: Path) -> dict[str, Any]:
+    """Write dest (minified), dest.gz and dest.br; returns the sizes in bytes."""
+    raw = src.read_bytes()
+    data = minify(raw)
+    write_bytes(dest, data)
+    # mtime=0 keeps the .gz bytes stable, so unchanged artifacts are not rewritten.
+    gz = gzip.compress(data, compresslevel=9, mtime=0)
+    write_bytes(dest.with_name(dest.name + ".gz"), gz)
+    br_size = None
+    if brotli is not None:
+        br = brotli.compress(data, quality=11)
+        write_bytes(dest.with_name(dest.name + ".br"), br)
+        br_size = len(br)
+    return {"raw": len(raw), "minified": len(data), "gzip": len(gz), "brotli": br_size}
+
+
+def _fmt(n: int | None) -> str:
+    if n is None:
+        return "-"
+    if n >= 1 << 20:
+        return f"{n / (1 << 20):.2f}M"
+    if n >= 1 << 10:
+        return f"{n / (1 << 10):.1f}K"
+    return str(n)
+
+
+def _sum(rows: list[dict[str, Any]]) -> dict[str, Any]:
+    total: dict[str, Any] = {"raw": 0, "minified": 0, "gzip": 0, "brotli": 0}
+    for row in rows:
+        for k in total:
+            total[k] = None if row[k] is None or total[k] is None else total[k] + row[k]
+    return total
+
+
+def _row(label: str, rows: list[dict[str, Any]]) -> str:
+    s = _sum(rows)
+    return (
+        f"{label:<32} {len(rows):>5} {_fmt(s['raw']):>9} {_fmt(s['minified']):>9} "
+        f"{_fmt(s['gzip']):>9} {_fmt(s['brotli']):>9}"
+    )
+
+
+def print_report(sizes: dict[str, dict[str, Any]]) -> None:
+    """Top-level files one row each; files in subdirectories summed per directory."""
+    groups: dict[str, list[dict[str, Any]]] = {}
+    for rel, row in sorted(sizes.items()):
+        key = rel if "/" not in rel else rel.rsplit("/", 1)[0] + "/*"
+        groups.setdefault(key, []).append(row)
+    print(f"{'artifact':<32} {'files':>5} {'raw':>9} {'minified':>9} {'gzip':>9} {'brotli':>9}")
+    for key, rows in groups.items():
+        print(_row(key, rows))
+    print(_row("total", list(sizes.values())))
+
+
+def budget_sizes(sizes: dict[str, dict[str, Any]]) -> dict[str, int]:
+    """Minified sizes of the budgeted aggregates: top-level files, index.json files, per-directory shard totals."""
+    out: dict[str, int] = {}
+    for rel, row in sorted(sizes.items()):
+        minified = row.get("minified") if isinstance(row, dict) else None
+        if not isinstance(minified, int):
+            continue
+        if "/" in rel and not rel.endswith("/index.json"):
+            key = rel.rsplit("/", 1)[0] + "/*"
+            out[key] = out.get(key, 0) + minified
+        else:
+            out[rel] = minified
+    return out
+
+
+def budget_violations(
+    sizes: dict[str, dict[str, Any]], previous: dict[str, dict[str, Any]], max_growth: float, slack: int
+) -> list[str]:
+    out: list[str] = []
+    before_sizes = budget_sizes(previous)
+    for key, after in budget_sizes(sizes).items():
+        before = before_sizes.get(key)
+        if before is None:
+            continue
+        growth = after - before
+        if growth > slack and growth > before * max_growth:
+            out.append(f"{key}: {_fmt(before)} -> {_fmt(after)} (+{growth / max(before, 1):.0%})")
+    return out
+
+
+def load_previous_report() -> dict[str, dict[str, Any]]:
+    if not SIZE_REPORT_JSON.exists():
+        return {}
+    try:
+        data = json.loads(SIZE_REPORT_JSON.read_text(encoding="utf-8"))
+    except Exception as exc:
+        print(f"WARNING: Failed to parse {SIZE_REPORT_JSON}: {exc}")
+        return {}
+    files = data.get("files") if isinstance(data, dict) else None
+    return files if isinstance(files, dict) else {}
+
+
+def main() -> int:
+    pipeline_profile.start("build_api_artifacts")
+    p = argparse.ArgumentParser(description="Minify and precompress cache/api JSON into public/api.")
+    p.add_argument("--out", type=Path, default=PUBLIC_API_DIR, help=f"Output directory (default: {PUBLIC_API_DIR})")
+    p.add_argument(
+        "--max-growth",
+        type=float,
+        default=0.10,
+        help="Fail when a file's minified size grows by more than this fraction vs the previous build (default: 0.10)",
+    )
+    p.add_argument(
+        "--slack-bytes",
+        type=int,
+        default=4096,
+        help="Growth below this many bytes never fails the budget (default: 4096)",
+    )
+    p.add_argument(
+        "--accept-growth",
+        action="store_true",
+        default=os.environ.get("ACCEPT_API_GROWTH", "") == "1",
+        help="Report budget violations but do not fail, and take this build as the new baseline "
+        "(default: on when ACCEPT_API_GROWTH=1)",
+    )
+    p.add_argument("--workers", type=int, default=None, help="Compression processes (default: CPU count)")
+    args = p.parse_args()
+
+    sources = sorted(
+        path
+        for path in CACHE_API_DIR.rglob("*.json")
+        if not any(part.startswith(".") for part in path.relative_to(CACHE_API_DIR).parts)
+    )
+    if not sources:
+        print(f"No API artifacts under {CACHE_API_DIR}")
+        return 0
+    if brotli is None:
+        print("WARNING: brotli is not installed; skipping .br output (pip install brotli)")
+
+    rels = [src.relative_to(CACHE_API_DIR).as_posix() for src in sources]
+    out_dir = args.out.resolve()
+    max_workers = min(len(sources), args.workers or os.cpu_count() or 1)
+    with pipeline_profile.stage("compress"), concurrent.futures.ProcessPoolExecutor(max_workers=max_workers) as pool:
+        results = list(pool.map(build_artifact, sources, [out_dir / rel for rel in rels], chunksize=16))
+    pipeline_profile.count("artifacts", len(results))
+    sizes = dict(zip(rels, results))
+
+    print_report(sizes)
+    previous = load_previous_report()
+    violations = budget_violations(sizes, previous, args.max_growth, args.slack_bytes)
+    if violations:
+        print(f"\nSize budget exceeded (>{args.max_growth:.0%} and >{args.slack_bytes} bytes vs previous build):")
+        for line in violations:
+            print(f"  {line}")
+        if not args.accept_growth:
+            print("Rerun with --accept-growth (or ACCEPT_API_GROWTH=1) if the growth is intended.")
+            return 1
+    write_text(SIZE_REPORT_JSON, json.dumps({"files": sizes}, indent=2) + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
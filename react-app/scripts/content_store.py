@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+"""Indexed SQLite copy of the build's intermediate content (data/tmp/content_store.sqlite).
+
+The build scripts used to re-parse the same multi-megabyte JSON files on every run
+(cache/posts*.json, translations.<locale>.json, the glossary) and then scan lists
+linearly for one slug. The store holds them as rows keyed by locale and slug:
+
+- posts(locale, position, slug, canonical_slug, published, doc)
+      cache/posts.json (locale BASE) and cache/posts.<locale>.json, in file order
+- overrides(locale, slug, doc)       src/content/posts/translations.<locale>.json
+- glossary(section, doc)             src/content/posts/translation_glossary.json
+- assets(slug, kind, name)           conventional hero / square / style / OG files
+
+doc columns are the JSON of one record. The JSON files stay the artifacts the site
+and CI consume; the store is derived from them. Every source is recorded with its
+(mtime_ns, size), and open_store() re-imports only sources that changed since the
+last sync, so readers never see stale rows. The scripts that emit the post caches
+(generate_cache.py, rebuild_locale_post_caches.py) record each file with put_posts()
+as they write it, so the next reader finds the store filled instead of parsing the
+file again; generate_cache.py then syncs the remaining sources at the end of a build.
+
+A source that fails to parse (or has the wrong shape) has no rows; its error is
+raised as ValueError by the query for it. Stdlib-only.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import json
+import os
+import re
+import sqlite3
+from pathlib import Path
+from typing import Any, Iterable, Iterator
+
+import pipeline_profile
+
+ROOT = Path(__file__).resolve().parents[1]
+STORE_PATH = ROOT / "data" / "tmp" / "content_store.sqlite"
+CACHE_DIR = ROOT / "cache"
+POSTS_CONTENT_DIR = ROOT / "src" / "content" / "posts"
+GLOSSARY_PATH = POSTS_CONTENT_DIR / "translation_glossary.json"
+IMAGE_DIRS = (ROOT / "public" / "images" / "posts", ROOT / "public" / "images" / "og")
+
+# Locale key for cache/posts.json (the base listing, not a translation).
+BASE = "base"
+SCHEMA_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE sources (path TEXT PRIMARY KEY, mtime_ns INTEGER, size INTEGER, error TEXT);
+CREATE TABLE posts (
+    locale TEXT, position INTEGER, slug TEXT, canonical_slug TEXT, published INTEGER, doc TEXT,
+    PRIMARY KEY (locale, position)
+);
+CREATE INDEX posts_by_slug ON posts (locale, slug);
+CREATE INDEX posts_by_canonical ON posts (locale, canonical_slug);
+CREATE TABLE overrides (locale TEXT, slug TEXT, doc TEXT, PRIMARY KEY (locale, slug));
+CREATE TABLE glossary (section TEXT PRIMARY KEY, doc TEXT);
+CREATE TABLE assets (slug TEXT, kind TEXT, name TEXT, PRIMARY KEY (slug, kind, name));
+"""
+
+_LOCALE_FILE = re.compile(r"^(?:posts|translations)\.([a-z]{2})\.json$")
+_ASSET_NAME = re.compile(r"^(.+)-(hero-square\.png|hero-style\.txt|hero\.png|1200x630\.(?:png|jpg))$")
+_ASSET_KINDS = {"hero.png": "hero", "hero-square.png": "hero_square", "hero-style.txt": "hero_style"}
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
+def _sources() -> dict[str, Path]:
+    """Every file/dir the store mirrors, keyed by path relative to ROOT."""
+    paths = [CACHE_DIR / "posts.json", GLOSSARY_PATH, *IMAGE_DIRS]
+    paths += [p for p in CACHE_DIR.glob("posts.*.json") if _LOCALE_FILE.match(p.name)]
+    paths += [p for p in POSTS_CONTENT_DIR.glob("translations.*.json") if _LOCALE_FILE.match(p.name)]
+    return {p.relative_to(ROOT).as_posix(): p for p in paths}
+
+
+def _stat(path: Path) -> tuple[int, int] | None:
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+class ContentStore:
+    def __init__(self, conn: sqlite3.Connection, path: Path = STORE_PATH) -> None:
+        self.conn = conn
+        # Worker processes open their own connection to the same file.
+        self.path = path
+
+    # -- sync -----------------------------------------------------------------
+
+    def sync(self, only: Iterable[Path] | None = None) -> int:
+        """Re-import sources whose (mtime_ns, size) changed; returns how many were imported.
+
+        only limits the check to those source paths (a writer about to replace the rest).
+        """
+        known = {row[0]: (row[1], row[2]) for row in self.conn.execute("SELECT path, mtime_ns, size FROM sources")}
+        current = _sources()
+        candidates = set(known) | set(current)
+        if only is not None:
+            candidates &= {p.resolve().relative_to(ROOT).as_posix() for p in only}
+        imported = 0
+        with pipeline_profile.stage("content_store_sync"):
+            for rel in sorted(candidates):
+                path = current.get(rel, ROOT / rel)
+                stat = _stat(path)
+                if stat is not None and known.get(rel) == stat:
+                    continue
+                if stat is None and rel not in known:
+                    continue
+                with self.conn:
+                    self._import(rel, path, stat)
+                imported += 1
+        pipeline_profile.count("store_sources_imported", imported)
+        return imported
+
+    def _import(self, rel: str, path: Path, stat: tuple[int, int] | None) -> None:
+        self._clear(rel)
+        if stat is None:
+            self.conn.execute("DELETE FROM sources WHERE path = ?", (rel,))
+            return
+        error = None
+        if path.is_dir():
+            self._import_assets(path)
+        else:
+            try:
+                data = json.loads(path.read_text(encoding="utf-8"))
+                pipeline_profile.count("files_read")
+                self._insert(path, data)
+            except (OSError, ValueError) as exc:
+                error = f"Failed to load {path}: {exc}"
+        self.conn.execute(
+            "INSERT OR REPLACE INTO sources (path, mtime_ns, size, error) VALUES (?, ?, ?, ?)",
+            (rel, stat[0], stat[1], error),
+        )
+
+    def _clear(self, rel: str) -> None:
+        path = ROOT / rel
+        if path in IMAGE_DIRS:
+            # OG images are the only kind kept in images/og.
+            op = "=" if path.name == "og" else "!="
+            self.conn.execute(f"DELETE FROM assets WHERE kind {op} 'og'")
+        elif path == GLOSSARY_PATH:
+            self.conn.execute("DELETE FROM glossary")
+        elif path.name.startswith("translations."):
+            self.conn.execute("DELETE FROM overrides WHERE locale = ?", (self._locale(path),))
+        else:
+            self.conn.execute("DELETE FROM posts WHERE locale = ?", (self._locale(path),))
+
+    @staticmethod
+    def _locale(path: Path) -> str:
+        m = _LOCALE_FILE.match(path.name)
+        return m.group(1) if m else BASE
+
+    def _insert(self, path: Path, data: Any) -> None:
+        if path == GLOSSARY_PATH:
+            if not isinstance(data, dict):
+                raise ValueError("expected an object")
+            self.conn.executemany(
+                "INSERT INTO glossary (section, doc) VALUES (?, ?)", ((k, _dumps(v)) for k, v in data.items())
+            )
+        elif path.name.startswith("translations."):
+            if not isinstance(data, dict):
+                raise ValueError("expected an object")
+            self.conn.executemany(
+                "INSERT INTO overrides (locale, slug, doc) VALUES (?, ?, ?)",
+                ((self._locale(path), slug, _dumps(v)) for slug, v in data.items() if isinstance(v, dict)),
+            )
+        else:
+            if not isinstance(data, list):
+                raise ValueError("expected a list")
+            self._insert_posts(self._locale(path), data)
+
+    def _insert_posts(self, locale: str, posts: list[Any]) -> None:
+        rows = []
+        for position, post in enumerate(posts):
+            if not isinstance(post, dict):
+                continue
+            slug = post.get("slug") if isinstance(post.get("slug"), str) else None
+            canonical = post.get("canonicalSlug") if isinstance(post.get("canonicalSlug"), str) else slug
+            rows.append((locale, position, slug, canonical, int(bool(post.get("published"))), _dumps(post)))
+        self.conn.executemany(
+            "INSERT INTO posts (locale, position, slug, canonical_slug, published, doc) VALUES (?, ?, ?, ?, ?, ?)",
+            rows,
+        )
+
+    def _import_assets(self, directory: Path) -> None:
+        rows = []
+        for entry in os.scandir(directory):
+            m = _ASSET_NAME.match(entry.name)
+            if not m or not entry.is_file():
+                continue
+            slug, suffix = m.groups()
+            if directory.name == "og":
+                kind = "og" if suffix.startswith("1200x630") else None
+            else:
+                kind = _ASSET_KINDS.get(suffix)
+            if kind is None:
+                continue
+            rows.append((slug, kind, entry.name))
+        self.conn.executemany("INSERT OR REPLACE INTO assets (slug, kind, name) VALUES (?, ?, ?)", rows)
+
+    def put_posts(self, locale: str, path: Path, posts: list[dict[str, Any]]) -> None:
+        """Record posts just written to path, so the next sync does not re-parse it.
+
+        A no-op when path is unchanged since it was last imported or put.
+        """
+        rel = path.resolve().relative_to(ROOT).as_posix()
+        stat = _stat(path)
+        known = self.conn.execute(
+            "SELECT mtime_ns, size FROM sources WHERE path = ? AND error IS NULL", (rel,)
+        ).fetchone()
+        if stat is not None and known is not None and tuple(known) == stat:
+            return
+        with self.conn:
+            self._clear(rel)
+            self._insert_posts(locale, posts)
+            if stat is not None:
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO sources (path, mtime_ns, size, error) VALUES (?, ?, ?, NULL)",
+                    (rel, stat[0], stat[1]),
+                )
+
+    # -- queries --------------------------------------------------------------
+
+    def _check(self, path: Path) -> bool:
+        """True if path was imported; raises ValueError if it failed to parse."""
+        row = self.conn.execute(
+            "SELECT error FROM sources WHERE path = ?", (path.relative_to(ROOT).as_posix(),)
+        ).fetchone()
+        if row is None:
+            return False
+        if row[0]:
+            raise ValueError(row[0])
+        return True
+
+    @staticmethod
+    def posts_path(locale: str) -> Path:
+        return CACHE_DIR / ("posts.json" if locale == BASE else f"posts.{locale}.json")
+
+    def has_posts(self, locale: str) -> bool:
+        return self._check(self.posts_path(locale))
+
+    def posts(self, locale: str) -> list[dict[str, Any]] | None:
+        """All records of cache/posts.<locale>.json in file order (None if the file is missing)."""
+        if not self.has_posts(locale):
+            return None
+        rows = self.conn.execute("SELECT doc FROM posts WHERE locale = ? ORDER BY position", (locale,))
+        return [json.loads(doc) for (doc,) in rows]
+
+    def post(self, locale: str, slug: str) -> dict[str, Any] | None:
+        row = self.conn.execute(
+            "SELECT doc FROM posts WHERE locale = ? AND slug = ? ORDER BY position LIMIT 1", (locale, slug)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def post_by_canonical(self, locale: str, canonical_slug: str) -> dict[str, Any] | None:
+        row = self.conn.execute(
+            "SELECT doc FROM posts WHERE locale = ? AND canonical_slug = ? ORDER BY position LIMIT 1",
+            (locale, canonical_slug),
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def post_locales(self) -> list[str]:
+        """Locales with a cache/posts.<locale>.json (BASE excluded)."""
+        rows = self.conn.execute("SELECT DISTINCT locale FROM posts WHERE locale != ? ORDER BY locale", (BASE,))
+        return [locale for (locale,) in rows]
+
+    def published_slugs(self, locale: str) -> list[str]:
+        rows = self.conn.execute(
+            "SELECT DISTINCT slug FROM posts WHERE locale = ? AND published AND slug IS NOT NULL ORDER BY slug",
+            (locale,),
+        )
+        return [slug for (slug,) in rows]
+
+    def overrides(self, locale: str) -> dict[str, dict[str, Any]]:
+        """translations.<locale>.json as {slug: fields} ({} if the file is missing)."""
+        self._check(POSTS_CONTENT_DIR / f"translations.{locale}.json")
+        rows = self.conn.execute("SELECT slug, doc FROM overrides WHERE locale = ?", (locale,))
+        return {slug: json.loads(doc) for slug, doc in rows}
+
+    def override(self, locale: str, slug: str) -> dict[str, Any] | None:
+        row = self.conn.execute(
+            "SELECT doc FROM overrides WHERE locale = ? AND slug = ?", (locale, slug)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def glossary(self) -> dict[str, Any]:
+        """translation_glossary.json ({} if the file is missing)."""
+        self._check(GLOSSARY_PATH)
+        return {section: json.loads(doc) for section, doc in self.conn.execute("SELECT section, doc FROM glossary")}
+
+    def assets(self, slug: str) -> dict[str, list[str]]:
+        """Conventional image files for slug, by kind (hero, hero_square, hero_style, og)."""
+        out: dict[str, list[str]] = {}
+        for kind, name in self.conn.execute("SELECT kind, name FROM assets WHERE slug = ? ORDER BY name", (slug,)):
+            out.setdefault(kind, []).append(name)
+        return out
+
+
+def _connect(path: Path) -> sqlite3.Connection:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(path, timeout=30)
+    try:
+        row = conn.execute("SELECT value FROM meta WHERE key = 'schema_version'").fetchone()
+    except sqlite3.DatabaseError:
+        row = None
+    if row is None or row[0] != str(SCHEMA_VERSION):
+        # Derived data: on a schema change (or a damaged file) start over.
+        conn.close()
+        path.unlink(missing_ok=True)
+        conn = sqlite3.connect(path, timeout=30)
+        with conn:
+            conn.executescript(_SCHEMA)
+            conn.execute("INSERT INTO meta (key, value) VALUES ('schema_version', ?)", (str(SCHEMA_VERSION),))
+    return conn
+
+
+@contextlib.contextmanager
+def open_store(path: Path = STORE_PATH, sync: bool = True) -> Iterator[ContentStore]:
+    """Open (creating if needed) the store; by default bring it up to date with its sources first."""
+    conn = _connect(path)
+    try:
+        store = ContentStore(conn, path)
+        if sync:
+            store.sync()
+        yield store
+    finally:
+        conn.close()
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""Incrementally fetch the Neotoma website export into a local snapshot.
+
+Instead of shipping the whole export on every deploy, this pulls only post records
+changed since the last stored watermark and merges them into
+data/tmp/neotoma_website_export.json, which generate_cache.py then reads as usual.
+
+Endpoint contract (GET <url>, JSON response):
+
+    ?updated_since=<watermark>&cursor=<c>&limit=<n>
+    -> {"posts": [...], "links": [...], "timeline": [...], "next_cursor": "<c>" | null}
+
+- posts: records with updated_date >= updated_since (all records when omitted),
+  every revision included; {"slug": s, "deleted": true} removes a slug.
+- links / timeline: sent in full on the first page; a missing key keeps the
+  snapshot's copy.
+- ETag / Last-Modified describe the export's current version. They are sent back
+  as If-None-Match / If-Modified-Since on the first page, and a 304 means nothing
+  changed since the last fetch.
+
+Merging uses the same rank as the full load (neotoma_export.post_dedupe_rank:
+the record with the highest rank wins, the later one on ties), so the snapshot
+dedupes to the same posts a full export would. The snapshot holds one record per
+slug. The watermark (max updated_date received) and validators live in
+data/tmp/neotoma_export_state.json and only advance after every page arrived.
+
+The URL comes from --url or $NEOTOMA_EXPORT_URL, a bearer token from
+$NEOTOMA_EXPORT_TOKEN. neotoma_export_stub.py serves an export file under this
+contract for offline runs and tests. Stdlib-only.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gzip
+import json
+import os
+import sys
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import pipeline_profile
+from artifact_writer import write_json, write_text
+from neotoma_export import post_dedupe_rank, scan_export_file
+
+ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_SNAPSHOT = ROOT / "data" / "tmp" / "neotoma_website_export.json"
+DEFAULT_STATE = ROOT / "data" / "tmp" / "neotoma_export_state.json"
+URL_ENV = "NEOTOMA_EXPORT_URL"
+TOKEN_ENV = "NEOTOMA_EXPORT_TOKEN"
+DEFAULT_PAGE_SIZE = 200
+MAX_PAGES = 10_000
+
+
+@dataclass
+class FetchResult:
+    not_modified: bool
+    pages: int
+    post_records: int
+    bytes_received: int
+    watermark: str | None
+
+
+def _record_watermark(post: dict[str, Any]) -> str:
+    return str(post.get("updated_date") or post.get("published_date") or "")
+
+
+def _get(url: str, headers: dict[str, str], timeout: float) -> tuple[int, dict[str, str], bytes, int]:
+    """(status, headers, decoded body, bytes on the wire); a 304 is returned, not raised."""
+    request = urllib.request.Request(url, headers={"Accept-Encoding": "gzip", **headers})
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as resp:
+            status, resp_headers, body = resp.status, dict(resp.headers), resp.read()
+    except urllib.error.HTTPError as exc:
+        if exc.code != 304:
+            raise
+        return 304, dict(exc.headers), b"", 0
+    wire = len(body)
+    pipeline_profile.count("bytes_received", wire)
+    if resp_headers.get("Content-Encoding") == "gzip":
+        body = gzip.decompress(body)
+    return status, resp_headers, body, wire
+
+
+def _page_url(url: str, params: dict[str, str]) -> str:
+    parts = urllib.parse.urlsplit(url)
+    query = urllib.parse.parse_qsl(parts.query) + sorted(params.items())
+    return urllib.parse.urlunsplit(parts._replace(query=urllib.parse.urlencode(query)))
+
+
+def load_state(path: Path) -> dict[str, Any]:
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def load_snapshot(path: Path) -> tuple[dict[str, tuple[tuple[int, str], dict[str, Any]]], list[Any], list[Any]]:
+    """Best record per slug (with its rank), links and timeline of the current snapshot."""
+    if not path.exists():
+        return {}, [], []
+    scan = scan_export_file(path)
+    return scan["posts"], scan["links"], scan["timeline"]
+
+
+def fetch(
+    url: str,
+    snapshot_path: Path = DEFAULT_SNAPSHOT,
+    state_path: Path = DEFAULT_STATE,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    full: bool = False,
+    token: str | None = None,
+    timeout: float = 60.0,
+) -> FetchResult:
+    """Pull changes since the stored watermark and merge them into the snapshot."""
+    state = {} if full or not snapshot_path.exists() else load_state(state_path)
+    if state.get("url") != url:
+        # Watermarks from another endpoint say nothing about this one.
+        state = {}
+    headers = {"Accept": "application/json"}
+    if token:
+        headers["Authorization"] = f"Bearer {token}"
+    validators = {}
+    if state.get("etag"):
+        validators["If-None-Match"] = state["etag"]
+    if state.get("last_modified"):
+        validators["If-Modified-Since"] = state["last_modified"]
+
+    params = {"limit": str(page_size)}
+    if state.get("watermark"):
+        params["updated_since"] = state["watermark"]
+
+    best, links, timeline = ({}, [], []) if not state else load_snapshot(snapshot_path)
+    watermark = state.get("watermark")
+    pages = records = received = 0
+    etag = last_modified = None
+    cursor: str | None = None
+    while True:
+        page_params = dict(params, cursor=cursor) if cursor else params
+        with pipeline_profile.stage("fetch_pages"):
+            status, resp_headers, body, wire = _get(
+                _page_url(url, page_params), dict(headers, **(validators if pages == 0 else {})), timeout
+            )
+        if status == 304:
+            return FetchResult(True, 0, 0, 0, watermark)
+        pages += 1
+        received += wire
+        if pages == 1:
+            etag, last_modified = resp_headers.get("ETag"), resp_headers.get("Last-Modified")
+        page = json.loads(body)
+        if pages == 1:
+            if "links" in page:
+                links = list(page["links"] or [])
+            if "timeline" in page:
+                timeline = list(page["timeline"] or [])
+        for post in page.get("posts") or []:
+            records += 1
+            if not isinstance(post, dict) or not post.get("slug"):
+                continue
+            slug = post["slug"]
+            mark = _record_watermark(post)
+            if mark and (watermark is None or mark > watermark):
+                watermark = mark
+            if post.get("deleted"):
+                best.pop(slug, None)
+                continue
+            rank = post_dedupe_rank(post)
+            existing = best.get(slug)
+            if existing is None or rank >= existing[0]:
+                best[slug] = (rank, post)
+        cursor = page.get("next_cursor")
+        if not cursor:
+            break
+        if pages >= MAX_PAGES:
+            raise RuntimeError(f"Export pagination did not finish after {MAX_PAGES} pages")
+
+    pipeline_profile.count("post_records_fetched", records)
+    snapshot = {"posts": [record for _, record in best.values()], "links": links, "timeline": timeline}
+    # Compact: the snapshot is machine-read input, like the export it replaces.
+    write_text(snapshot_path, json.dumps(snapshot, ensure_ascii=False) + "\n")
+    write_json(
+        state_path,
+        {"url": url, "watermark": watermark, "etag": etag, "last_modified": last_modified, "fetched_at": int(time.time())},
+    )
+    return FetchResult(False, pages, records, received, watermark)
+
+
+def main() -> int:
+    pipeline_profile.start("fetch_neotoma_export")
+    p = argparse.ArgumentParser(description="Fetch Neotoma export changes since the last watermark into a local snapshot.")
+    p.add_argument("--url", default=os.environ.get(URL_ENV), help=f"Export endpoint (default: ${URL_ENV})")
+    p.add_argument("--out", type=Path, default=DEFAULT_SNAPSHOT, help=f"Snapshot path (default: {DEFAULT_SNAPSHOT})")
+    p.add_argument("--state", type=Path, default=DEFAULT_STATE, help=f"Watermark state path (default: {DEFAULT_STATE})")
+    p.add_argument("--page-size", type=int, default=DEFAULT_PAGE_SIZE, help=f"Records per page (default: {DEFAULT_PAGE_SIZE})")
+    p.add_argument("--full", action="store_true", help="Ignore the stored watermark and re-fetch everything")
+    p.add_argument("--timeout", type=float, default=60.0, help="Per-request timeout in seconds (default: 60)")
+    args = p.parse_args()
+    if not args.url:
+        print(f"No export URL (pass --url or set {URL_ENV})", file=sys.stderr)
+        return 2
+
+    try:
+        result = fetch(
+            args.url, args.out, args.state, args.page_size, args.full, os.environ.get(TOKEN_ENV), args.timeout
+        )
+    except (urllib.error.URLError, OSError, ValueError, RuntimeError) as exc:
+        print(f"Export fetch failed; snapshot left unchanged: {exc}", file=sys.stderr)
+        return 1
+    if result.not_modified:
+        print(f"Export not modified since last fetch (watermark {result.watermark}); {args.out.name} unchanged")
+    else:
+        print(
+            f"Fetched {result.post_records} post record(s) in {result.pages} page(s), "
+            f"{result.bytes_received / 1024:.1f} KiB; watermark {result.watermark}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -7,6 +7,8 @@ Fixes common issues from machine translation:
 - Known mangled URLs (e.g. merged Asana/HomeKit, Google Calendar typo)
 
 Run after regenerating or bulk-updating translations.es.json / translations.ca.json.
+URLs and link targets are masked before MT since translation_placeholders.py, so
+only entries translated before that (or pasted in by hand) still need this.
 """
 
 from __future__ import annotations
@@ -16,6 +18,8 @@ import re
 import sys
 from pathlib import Path
 
+from artifact_writer import write_json
+
 ROOT = Path(__file__).resolve().parents[1]
 TRANSLATIONS = (
     ROOT / "src" / "content" / "posts" / "translations.es.json",
@@ -63,8 +67,10 @@ def main() -> int:
             for key in ("body", "summary"):
                 if key in entry and isinstance(entry[key], str):
                     entry[key] = fix_text(entry[key])
-        path.write_text(json.dumps(data, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
-        print(f"Fixed {path.name}")
+        if write_json(path, data):
+            print(f"Fixed {path.name}")
+        else:
+            print(f"Unchanged {path.name}")
     return 0
 
 
@@ -4,21 +4,48 @@ Generate react-app/cache/*.json from a Neotoma website export JSON.
 
 This script is intentionally self-contained (stdlib-only) so it can run in CI
 inside the website repo without depending on the parent ateles repo.
+
+Builds are incremental by default: data/tmp/cache_build_manifest.json records, per
+slug, the export record digest plus every markdown file, sidecar and image asset
+probed while building it. Slugs whose inputs are unchanged reuse their previous
+metadata; pass --full to ignore the manifest and rebuild everything.
+
+--watch keeps the process resident (used by scripts/watch-cache.mjs): the export,
+content files and slug manifest stay in memory, and each change cycle re-reads only
+the changed files.
 """
 
 from __future__ import annotations
 
 import argparse
+import concurrent.futures
+import copy
+import hashlib
 import json
+import os
+import re
+import time
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+import pipeline_profile
+from artifact_writer import cache_lock, write_json, write_json_pair, write_text
+from content_store import BASE, ContentStore, open_store
+from neotoma_export import load_export
+from neotoma_export import post_dedupe_rank as _post_dedupe_rank
+from post_shards import has_locale_index, write_locale_shards
+from related_posts import add_related_slugs
+from search_index import search_index_path, write_search_index
 
 
 SCRIPT_DIR = Path(__file__).resolve().parent
 REACT_APP_ROOT = SCRIPT_DIR.parent
 
 DEFAULT_NEOTOMA_EXPORT = REACT_APP_ROOT / "data" / "tmp" / "neotoma_website_export.json"
+# Per-slug input fingerprints + built metadata from the previous run (incremental builds).
+BUILD_MANIFEST_JSON = REACT_APP_ROOT / "data" / "tmp" / "cache_build_manifest.json"
+BUILD_MANIFEST_VERSION = 1
 
 CACHE_DIR = REACT_APP_ROOT / "cache"
 CACHE_API_DIR = CACHE_DIR / "api"
@@ -48,11 +75,6 @@ REPO_OVERRIDE_SLUGS = {
 }
 
 
-def write_json(path: Path, payload: Any) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    path.write_text(json.dumps(payload, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
-
-
 def _parse_frontmatter(content: str) -> Tuple[Dict[str, str], str]:
     if not content.startswith("---\n"):
         return {}, content
@@ -71,14 +93,272 @@ def _parse_frontmatter(content: str) -> Tuple[Dict[str, str], str]:
     return parsed, content[idx + 5 :].lstrip("\n")
 
 
-def _safe_read(path: Path) -> Optional[str]:
+class AssetIndex:
+    """In-memory view of public/images/posts and public/images/og from one scandir pass per dir.
+
+    Answers the conventional hero/OG/square/style lookups without per-slug stat calls;
+    hero style files are small and read once when first asked for.
+    """
+
+    def __init__(self, dirs: Iterable[Path]) -> None:
+        self.files: Dict[Path, Set[str]] = {}
+        self._texts: Dict[Path, Optional[str]] = {}
+        for d in dirs:
+            names: Set[str] = set()
+            try:
+                with os.scandir(d) as it:
+                    for e in it:
+                        if e.is_file():
+                            names.add(e.name)
+            except OSError:
+                pass
+            self.files[d] = names
+
+    def covers(self, path: Path) -> bool:
+        return path.parent in self.files
+
+    def exists(self, path: Path) -> bool:
+        return path.name in self.files[path.parent]
+
+    def read_text(self, path: Path) -> Optional[str]:
+        if path not in self._texts:
+            text: Optional[str] = None
+            if self.exists(path):
+                try:
+                    text = path.read_text(encoding="utf-8")
+                except Exception:
+                    text = None
+            self._texts[path] = text
+        return self._texts[path]
+
+    def refresh(self, paths: Iterable[Path]) -> None:
+        """Re-stat changed paths under the indexed dirs (watch mode)."""
+        for path in paths:
+            if path.parent in self.files:
+                names = self.files[path.parent]
+                if path.is_file():
+                    names.add(path.name)
+                else:
+                    names.discard(path.name)
+                self._texts.pop(path, None)
+
+    def unowned(self, slugs: Iterable[str], referenced: Iterable[str]) -> List[str]:
+        """Assets (relative to public/images) not named after a known slug nor referenced by name."""
+        slug_set = set(slugs)
+        ref_names = {Path(str(r)).name for r in referenced if r}
+        out: List[str] = []
+        for d, names in self.files.items():
+            for name in sorted(names):
+                if name in ref_names:
+                    continue
+                parts = name.split("-")
+                if any("-".join(parts[:i]) in slug_set for i in range(1, len(parts))):
+                    continue
+                out.append(f"{d.name}/{name}")
+        return out
+
+
+_asset_index: Optional[AssetIndex] = None
+
+
+def asset_index() -> AssetIndex:
+    global _asset_index
+    if _asset_index is None:
+        _asset_index = AssetIndex((PUBLIC_POSTS_IMAGES, PUBLIC_OG_IMAGES_DIR))
+    return _asset_index
+
+
+def _read_file(path: Path) -> Optional[str]:
     try:
-        return path.read_text(encoding="utf-8")
+        text = path.read_text(encoding="utf-8")
     except Exception:
         return None
+    pipeline_profile.count("files_read")
+    return text
+
+
+class ContentRepository:
+    """src/content/posts (and drafts/) read and parsed at most once per run.
+
+    Directory listings come from one scandir per dir; every markdown file is prefetched
+    in a thread pool. JSON files (manifest, overrides) are parsed on first use and
+    frontmatter is parsed once per file, so all overlay and draft-discovery passes
+    share the same parsed content.
+    """
+
+    def __init__(self, dirs: Iterable[Path], workers: int = 8) -> None:
+        self.files: Dict[Path, Set[str]] = {}
+        for d in dirs:
+            names: Set[str] = set()
+            try:
+                with os.scandir(d) as it:
+                    for e in it:
+                        if e.is_file():
+                            names.add(e.name)
+            except OSError:
+                pass
+            self.files[d] = names
+        md_paths = [d / name for d, names in self.files.items() for name in sorted(names) if name.endswith(".md")]
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as pool:
+            self._texts: Dict[Path, Optional[str]] = dict(zip(md_paths, pool.map(_read_file, md_paths)))
+        self._markdown: Dict[Path, Tuple[Dict[str, str], str]] = {}
+        self._json: Dict[Path, Any] = {}
+        self._manifest_by_slug: Optional[Dict[str, Dict[str, Any]]] = None
+
+    def covers(self, path: Path) -> bool:
+        return path.parent in self.files
+
+    def exists(self, path: Path) -> bool:
+        return path.name in self.files[path.parent]
+
+    def names(self, d: Path) -> Set[str]:
+        return self.files.get(d, set())
+
+    def read_text(self, path: Path) -> Optional[str]:
+        if path not in self._texts:
+            self._texts[path] = _read_file(path) if self.exists(path) else None
+        return self._texts[path]
+
+    def markdown(self, path: Path) -> Optional[Tuple[Dict[str, str], str]]:
+        """(frontmatter, body) for a markdown file; callers must not mutate the frontmatter."""
+        if path not in self._markdown:
+            raw = self.read_text(path)
+            if raw is None:
+                return None
+            self._markdown[path] = _parse_frontmatter(raw)
+        return self._markdown[path]
+
+    def json(self, path: Path) -> Any:
+        """Parsed JSON file, or None when missing/invalid."""
+        if path not in self._json:
+            raw = self.read_text(path)
+            try:
+                self._json[path] = json.loads(raw) if raw else None
+            except Exception:
+                self._json[path] = None
+        return self._json[path]
+
+    def refresh(self, paths: Iterable[Path]) -> None:
+        """Forget cached content for changed paths so they are re-read on next use (watch mode)."""
+        for path in paths:
+            if path.parent not in self.files:
+                continue
+            names = self.files[path.parent]
+            if path.is_file():
+                names.add(path.name)
+            else:
+                names.discard(path.name)
+            self._texts.pop(path, None)
+            self._markdown.pop(path, None)
+            self._json.pop(path, None)
+            if path == CONTENT_MANIFEST_JSON:
+                self._manifest_by_slug = None
+
+    def manifest_entry(self, slug: str) -> Optional[Dict[str, Any]]:
+        if self._manifest_by_slug is None:
+            self._manifest_by_slug = {}
+            for m in load_content_manifest():
+                self._manifest_by_slug.setdefault(m.get("slug"), m)
+        return self._manifest_by_slug.get(slug)
+
+
+_content_repository: Optional[ContentRepository] = None
+
+
+def content_repository() -> ContentRepository:
+    global _content_repository
+    if _content_repository is None:
+        _content_repository = ContentRepository((WEBSITE_POSTS_DIR, WEBSITE_POSTS_DIR / "drafts"))
+    return _content_repository
+
+
+def _path_exists(path: Path) -> bool:
+    for source in (asset_index(), content_repository()):
+        if source.covers(path):
+            return source.exists(path)
+    return path.exists()
+
+
+def _read_text(path: Path) -> Optional[str]:
+    for source in (asset_index(), content_repository()):
+        if source.covers(path):
+            return source.read_text(path)
+    return _read_file(path)
+
+
+# Inputs probed while building the current slug (None when not recording).
+# Keys are "<kind>:<path relative to react-app>"; see _dependency_value.
+_dependency_log: Optional[Dict[str, Any]] = None
+
+
+def _rel_path(path: Path) -> str:
+    try:
+        return path.relative_to(REACT_APP_ROOT).as_posix()
+    except ValueError:
+        return str(path)
+
+
+def _text_digest(text: Optional[str]) -> Optional[str]:
+    if text is None:
+        return None
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _record_dependency(kind: str, path: Path, value: Any) -> None:
+    if _dependency_log is not None:
+        _dependency_log[f"{kind}:{_rel_path(path)}"] = value
+
+
+def _exists(path: Path) -> bool:
+    present = _path_exists(path)
+    _record_dependency("exists", path, present)
+    return present
+
+
+def _safe_read(path: Path) -> Optional[str]:
+    text = _read_text(path)
+    _record_dependency("read", path, _text_digest(text))
+    return text
+
+
+def _read_markdown(path: Path) -> Optional[Tuple[Dict[str, str], str]]:
+    """Tracked read of a markdown file, parsed into (frontmatter, body)."""
+    raw = _safe_read(path)
+    if raw is None:
+        return None
+    repo = content_repository()
+    if repo.covers(path):
+        return repo.markdown(path)
+    return _parse_frontmatter(raw)
+
+
+def _mtime_day(path: Path) -> Optional[str]:
+    try:
+        day: Optional[str] = datetime.fromtimestamp(path.stat().st_mtime).strftime("%Y-%m-%d")
+    except Exception:
+        day = None
+    _record_dependency("mtime", path, day)
+    return day
+
+
+def _dependency_value(key: str) -> Any:
+    """Current value of a recorded dependency key (same encoding as when it was recorded)."""
+    kind, _, rel = key.partition(":")
+    path = Path(rel) if Path(rel).is_absolute() else REACT_APP_ROOT / rel
+    if kind == "exists":
+        return _path_exists(path)
+    if kind == "read":
+        return _text_digest(_read_text(path))
+    if kind == "mtime":
+        try:
+            return datetime.fromtimestamp(path.stat().st_mtime).strftime("%Y-%m-%d")
+        except Exception:
+            return None
+    return object()  # unknown kind: never matches, forces a rebuild
 
 
 def load_from_neotoma_json(path: Path) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Whole-document load (every revision kept); main() streams via neotoma_export.load_export."""
     data = json.loads(path.read_text(encoding="utf-8"))
     posts = data.get("posts") or []
     links = data.get("links") or []
@@ -86,32 +366,9 @@ def load_from_neotoma_json(path: Path) -> Tuple[List[Dict[str, Any]], List[Dict[
     return posts, links, timeline
 
 
-def _post_dedupe_rank(post: Dict[str, Any]) -> Tuple[int, str]:
-    """Rank duplicate post records by usefulness for website cache generation."""
-    score = 0
-    if post.get("published") is True:
-        score += 1000
-    if post.get("published_date"):
-        score += 100
-    if post.get("title"):
-        score += 10
-    if post.get("excerpt"):
-        score += 10
-    if post.get("body"):
-        score += 10
-    if post.get("summary"):
-        score += 5
-    if post.get("share_tweet"):
-        score += 5
-    recency = post.get("updated_date") or post.get("published_date") or ""
-    return score, str(recency)
-
-
 def load_listing_overrides() -> List[str]:
-    if not LISTING_OVERRIDES_JSON.exists():
-        return []
+    data = content_repository().json(LISTING_OVERRIDES_JSON)
     try:
-        data = json.loads(LISTING_OVERRIDES_JSON.read_text(encoding="utf-8"))
         return list(data.get("exclude_from_listing") or [])
     except Exception:
         return []
@@ -127,10 +384,8 @@ def overlay_listing_excludes(metadata_list: List[Dict[str, Any]]) -> None:
 
 
 def load_alternative_slugs() -> Dict[str, List[str]]:
-    if not ALTERNATIVE_SLUGS_JSON.exists():
-        return {}
+    data = content_repository().json(ALTERNATIVE_SLUGS_JSON)
     try:
-        data = json.loads(ALTERNATIVE_SLUGS_JSON.read_text(encoding="utf-8"))
         out: Dict[str, List[str]] = {}
         for k, v in (data or {}).items():
             out[k] = list(v) if isinstance(v, list) else []
@@ -170,9 +425,9 @@ def overlay_summaries_from_markdown(metadata_list: List[Dict[str, Any]]) -> None
             continue
         published = bool(meta.get("published", False))
         path = summary_md_path(slug, published)
-        if not path.exists() and published:
+        if not _exists(path) and published:
             path = summary_md_path(slug, False)
-        if not path.exists():
+        if not _exists(path):
             continue
         raw = _safe_read(path)
         if raw is None:
@@ -184,17 +439,17 @@ def _apply_repo_hero_and_og_convention(meta: Dict[str, Any], slug: str) -> None:
     """If export omitted hero/og but repo has conventional assets, attach them (same as draft markdown flow)."""
     if not meta.get("heroImage"):
         hero_path = PUBLIC_POSTS_IMAGES / f"{slug}-hero.png"
-        if hero_path.exists():
+        if _exists(hero_path):
             meta["heroImage"] = f"{slug}-hero.png"
             style_raw = _safe_read(PUBLIC_POSTS_IMAGES / f"{slug}-hero-style.txt")
             meta["heroImageStyle"] = (style_raw or "").strip() or "keep-proportions"
             square_path = PUBLIC_POSTS_IMAGES / f"{slug}-hero-square.png"
-            if square_path.exists():
+            if _exists(square_path):
                 meta["heroImageSquare"] = f"{slug}-hero-square.png"
     if not meta.get("ogImage"):
         for pattern in (f"{slug}-1200x630.png", f"{slug}-1200x630.jpg"):
             og_p = PUBLIC_OG_IMAGES_DIR / pattern
-            if og_p.exists():
+            if _exists(og_p):
                 meta["ogImage"] = f"og/{pattern}"
                 break
 
@@ -206,14 +461,14 @@ def overlay_body_from_markdown(metadata_list: List[Dict[str, Any]]) -> None:
             continue
         published = bool(meta.get("published", True))
         path = body_md_path(slug, published)
-        if not path.exists() and published:
+        if not _exists(path) and published:
             path = body_md_path(slug, False)
-        if not path.exists():
+        if not _exists(path):
             continue
-        raw = _safe_read(path)
-        if raw is None:
+        parsed = _read_markdown(path)
+        if parsed is None:
             continue
-        frontmatter, body = _parse_frontmatter(raw)
+        frontmatter, body = parsed
         meta["body"] = body
         if frontmatter.get("title"):
             meta["title"] = frontmatter["title"].strip()
@@ -265,7 +520,7 @@ def overlay_body_from_markdown(metadata_list: List[Dict[str, Any]]) -> None:
             else:
                 base, ext = hi.rsplit(".", 1) if "." in hi else (hi, "")
                 square_name = f"{base}-square.{ext}" if ext else f"{base}-square"
-                if (PUBLIC_POSTS_IMAGES / square_name).exists():
+                if _exists(PUBLIC_POSTS_IMAGES / square_name):
                     meta["heroImageSquare"] = square_name
             if not meta.get("heroImageStyle"):
                 meta["heroImageStyle"] = "keep-proportions"
@@ -275,35 +530,22 @@ def overlay_body_from_markdown(metadata_list: List[Dict[str, Any]]) -> None:
         _apply_repo_hero_and_og_convention(meta, slug)
 
 
-def _manifest_entry_for_slug(slug: str) -> Optional[Dict[str, Any]]:
-    if not CONTENT_MANIFEST_JSON.exists():
-        return None
-    try:
-        manifest = json.loads(CONTENT_MANIFEST_JSON.read_text(encoding="utf-8"))
-        for m in manifest if isinstance(manifest, list) else []:
-            if isinstance(m, dict) and m.get("slug") == slug:
-                return m
-    except Exception:
-        pass
-    return None
-
-
 def ensure_repo_override_posts(metadata_list: List[Dict[str, Any]]) -> None:
     """For REPO_OVERRIDE_SLUGS, force body/title/excerpt from repo markdown. Inject if missing."""
     slugs_in_list = {m.get("slug") for m in metadata_list if m.get("slug")}
-    for slug in REPO_OVERRIDE_SLUGS:
+    for slug in sorted(REPO_OVERRIDE_SLUGS):
         path = body_md_path(slug, True)
-        if not path.exists():
+        if not _path_exists(path):
             path = body_md_path(slug, False)
-        if not path.exists():
+        if not _path_exists(path):
             continue
-        raw = _safe_read(path)
-        if raw is None:
+        parsed = _read_markdown(path)
+        if parsed is None:
             continue
-        frontmatter, body = _parse_frontmatter(raw)
+        frontmatter, body = parsed
         title = (frontmatter.get("title") or "").strip()
         excerpt = (frontmatter.get("excerpt") or "").strip()
-        manifest_entry = _manifest_entry_for_slug(slug)
+        manifest_entry = content_repository().manifest_entry(slug)
         if not title and manifest_entry:
             title = (manifest_entry.get("title") or "").strip()
         if not excerpt and manifest_entry:
@@ -347,171 +589,160 @@ def ensure_repo_override_posts(metadata_list: List[Dict[str, Any]]) -> None:
 
 def draft_slugs_from_markdown() -> List[Path]:
     drafts_dir = WEBSITE_POSTS_DIR / "drafts"
-    if not drafts_dir.exists():
-        return []
     out: List[Path] = []
-    for p in drafts_dir.glob("*.md"):
-        if p.name.endswith(".summary.md") or p.name.endswith(".tweet.md") or p.name.endswith(".postscript.md"):
+    for name in sorted(content_repository().names(drafts_dir)):
+        if not name.endswith(".md"):
             continue
-        out.append(p)
+        if name.endswith(".summary.md") or name.endswith(".tweet.md") or name.endswith(".postscript.md"):
+            continue
+        out.append(drafts_dir / name)
     return out
 
 
 CONTENT_MANIFEST_JSON = WEBSITE_POSTS_DIR / "posts.json"
 
 
-def metadata_for_content_only_drafts(export_slugs: set) -> List[Dict[str, Any]]:
-    """Drafts that live in content/posts (not drafts/) and are listed in content posts.json but not in the export."""
-    if not CONTENT_MANIFEST_JSON.exists():
-        return []
-    raw = _safe_read(CONTENT_MANIFEST_JSON)
-    if not raw:
-        return []
-    try:
-        manifest = json.loads(raw)
-    except Exception:
-        return []
+def load_content_manifest() -> List[Dict[str, Any]]:
+    manifest = content_repository().json(CONTENT_MANIFEST_JSON)
     if not isinstance(manifest, list):
         return []
+    return [m for m in manifest if isinstance(m, dict)]
+
+
+def content_only_draft_entries(export_slugs: set) -> List[Dict[str, Any]]:
+    """Unpublished content posts.json entries whose slug is not in the export."""
     out: List[Dict[str, Any]] = []
-    for entry in manifest:
-        slug = entry.get("slug") if isinstance(entry, dict) else None
+    for entry in load_content_manifest():
+        slug = entry.get("slug")
         if not slug or slug in export_slugs:
             continue
         if entry.get("published", False):
             continue
-        body_path = WEBSITE_POSTS_DIR / f"{slug}.md"
-        if not body_path.exists():
-            continue
-        raw_body = _safe_read(body_path)
-        if raw_body is None:
-            continue
-        frontmatter, body = _parse_frontmatter(raw_body)
-        title = (frontmatter.get("title") or entry.get("title") or "").strip()
-        excerpt = (frontmatter.get("excerpt") or entry.get("excerpt") or "").strip()
-        if not title:
-            for line in body.splitlines():
-                s = line.strip()
-                if not s:
-                    continue
-                if s.startswith("## "):
-                    title = s[3:].strip()
-                else:
-                    title = s[:80] if len(s) > 80 else s
-                break
-        if not title:
-            title = slug.replace("-", " ").title()
-        summary_raw = _safe_read(WEBSITE_POSTS_DIR / f"{slug}.summary.md")
-        tweet_path = WEBSITE_POSTS_DIR / "drafts" / f"{slug}.tweet.md"
-        tweet_raw = _safe_read(tweet_path) if tweet_path.exists() else None
-        try:
-            mtime = body_path.stat().st_mtime
-            updated = datetime.fromtimestamp(mtime).strftime("%Y-%m-%d")
-        except Exception:
-            updated = entry.get("updatedDate") or entry.get("createdDate") or ""
-        series_desc = (frontmatter.get("series_description") or "").strip()
-        meta: Dict[str, Any] = {
-            "slug": slug,
-            "title": title,
-            "excerpt": excerpt,
-            "body": body,
-            "published": False,
-            "publishedDate": None,
-            "category": entry.get("category") or "essay",
-            "readTime": entry.get("readTime"),
-            "tags": entry.get("tags") or [],
-            "createdDate": entry.get("createdDate") or updated,
-            "updatedDate": entry.get("updatedDate") or updated,
-            "summary": (summary_raw or "").strip(),
-            "shareTweet": (tweet_raw or "").strip(),
-        }
-        hero_path = PUBLIC_POSTS_IMAGES / f"{slug}-hero.png"
-        if hero_path.exists():
-            meta["heroImage"] = f"{slug}-hero.png"
-            style_raw = _safe_read(PUBLIC_POSTS_IMAGES / f"{slug}-hero-style.txt")
-            meta["heroImageStyle"] = (style_raw or "").strip() or "keep-proportions"
-            square_path = PUBLIC_POSTS_IMAGES / f"{slug}-hero-square.png"
-            if square_path.exists():
-                meta["heroImageSquare"] = f"{slug}-hero-square.png"
-        if series_desc:
-            meta["seriesDescription"] = series_desc
-        out.append(meta)
+        out.append(entry)
     return out
 
 
-def metadata_for_draft_only_slugs(export_slugs: set) -> List[Dict[str, Any]]:
-    drafts_paths = draft_slugs_from_markdown()
-    draft_slugs = sorted({p.stem for p in drafts_paths} - set(export_slugs))
-    if not draft_slugs:
-        return []
+def metadata_for_content_only_draft(entry: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    slug = entry["slug"]
+    body_path = WEBSITE_POSTS_DIR / f"{slug}.md"
+    if not _exists(body_path):
+        return None
+    parsed = _read_markdown(body_path)
+    if parsed is None:
+        return None
+    frontmatter, body = parsed
+    title = (frontmatter.get("title") or entry.get("title") or "").strip()
+    excerpt = (frontmatter.get("excerpt") or entry.get("excerpt") or "").strip()
+    if not title:
+        for line in body.splitlines():
+            s = line.strip()
+            if not s:
+                continue
+            if s.startswith("## "):
+                title = s[3:].strip()
+            else:
+                title = s[:80] if len(s) > 80 else s
+            break
+    if not title:
+        title = slug.replace("-", " ").title()
+    summary_raw = _safe_read(WEBSITE_POSTS_DIR / f"{slug}.summary.md")
+    tweet_path = WEBSITE_POSTS_DIR / "drafts" / f"{slug}.tweet.md"
+    tweet_raw = _safe_read(tweet_path) if _exists(tweet_path) else None
+    updated = _mtime_day(body_path) or entry.get("updatedDate") or entry.get("createdDate") or ""
+    series_desc = (frontmatter.get("series_description") or "").strip()
+    meta: Dict[str, Any] = {
+        "slug": slug,
+        "title": title,
+        "excerpt": excerpt,
+        "body": body,
+        "published": False,
+        "publishedDate": None,
+        "category": entry.get("category") or "essay",
+        "readTime": entry.get("readTime"),
+        "tags": entry.get("tags") or [],
+        "createdDate": entry.get("createdDate") or updated,
+        "updatedDate": entry.get("updatedDate") or updated,
+        "summary": (summary_raw or "").strip(),
+        "shareTweet": (tweet_raw or "").strip(),
+    }
+    hero_path = PUBLIC_POSTS_IMAGES / f"{slug}-hero.png"
+    if _exists(hero_path):
+        meta["heroImage"] = f"{slug}-hero.png"
+        style_raw = _safe_read(PUBLIC_POSTS_IMAGES / f"{slug}-hero-style.txt")
+        meta["heroImageStyle"] = (style_raw or "").strip() or "keep-proportions"
+        square_path = PUBLIC_POSTS_IMAGES / f"{slug}-hero-square.png"
+        if _exists(square_path):
+            meta["heroImageSquare"] = f"{slug}-hero-square.png"
+    if series_desc:
+        meta["seriesDescription"] = series_desc
+    return meta
 
-    out: List[Dict[str, Any]] = []
-    drafts_dir = WEBSITE_POSTS_DIR / "drafts"
-    for slug in draft_slugs:
-        body_path = drafts_dir / f"{slug}.md"
-        raw = _safe_read(body_path)
-        if raw is None:
-            continue
-        frontmatter, body = _parse_frontmatter(raw)
-        title = (frontmatter.get("title") or "").strip()
-        excerpt = (frontmatter.get("excerpt") or "").strip()
-        if not title:
-            for line in body.splitlines():
-                s = line.strip()
-                if not s:
-                    continue
-                if s.startswith("## "):
-                    title = s[3:].strip()
-                else:
-                    title = s[:80] if len(s) > 80 else s
-                break
-        if not title:
-            title = slug.replace("-", " ").title()
 
-        summary_raw = _safe_read(drafts_dir / f"{slug}.summary.md")
-        tweet_raw = _safe_read(drafts_dir / f"{slug}.tweet.md")
+def draft_only_slugs(export_slugs: set) -> List[str]:
+    return sorted({p.stem for p in draft_slugs_from_markdown()} - set(export_slugs))
 
-        try:
-            mtime = body_path.stat().st_mtime
-            updated = datetime.fromtimestamp(mtime).strftime("%Y-%m-%d")
-        except Exception:
-            updated = ""
-
-        pub = frontmatter.get("published")
-        published = str(pub).lower() in ("true", "1", "yes") if pub is not None else False
-        pub_date = (frontmatter.get("published_date") or frontmatter.get("publisheddate") or "").strip()
-
-        meta: Dict[str, Any] = {
-            "slug": slug,
-            "title": title,
-            "excerpt": excerpt,
-            "body": body,
-            "published": published,
-            "publishedDate": pub_date or None,
-            "category": "essay",
-            "readTime": None,
-            "tags": [],
-            "createdDate": updated or None,
-            "updatedDate": updated or None,
-            "summary": (summary_raw or "").strip(),
-            "shareTweet": (tweet_raw or "").strip(),
-        }
 
-        hero_path = PUBLIC_POSTS_IMAGES / f"{slug}-hero.png"
-        if hero_path.exists():
-            meta["heroImage"] = f"{slug}-hero.png"
-            style_raw = _safe_read(PUBLIC_POSTS_IMAGES / f"{slug}-hero-style.txt")
-            meta["heroImageStyle"] = (style_raw or "").strip() or "keep-proportions"
-            square_path = PUBLIC_POSTS_IMAGES / f"{slug}-hero-square.png"
-            if square_path.exists():
-                meta["heroImageSquare"] = f"{slug}-hero-square.png"
+def metadata_for_draft_only_slug(slug: str) -> Optional[Dict[str, Any]]:
+    drafts_dir = WEBSITE_POSTS_DIR / "drafts"
+    body_path = drafts_dir / f"{slug}.md"
+    parsed = _read_markdown(body_path)
+    if parsed is None:
+        return None
+    frontmatter, body = parsed
+    title = (frontmatter.get("title") or "").strip()
+    excerpt = (frontmatter.get("excerpt") or "").strip()
+    if not title:
+        for line in body.splitlines():
+            s = line.strip()
+            if not s:
+                continue
+            if s.startswith("## "):
+                title = s[3:].strip()
+            else:
+                title = s[:80] if len(s) > 80 else s
+            break
+    if not title:
+        title = slug.replace("-", " ").title()
+
+    summary_raw = _safe_read(drafts_dir / f"{slug}.summary.md")
+    tweet_raw = _safe_read(drafts_dir / f"{slug}.tweet.md")
+
+    updated = _mtime_day(body_path) or ""
+
+    pub = frontmatter.get("published")
+    published = str(pub).lower() in ("true", "1", "yes") if pub is not None else False
+    pub_date = (frontmatter.get("published_date") or frontmatter.get("publisheddate") or "").strip()
+
+    meta: Dict[str, Any] = {
+        "slug": slug,
+        "title": title,
+        "excerpt": excerpt,
+        "body": body,
+        "published": published,
+        "publishedDate": pub_date or None,
+        "category": "essay",
+        "readTime": None,
+        "tags": [],
+        "createdDate": updated or None,
+        "updatedDate": updated or None,
+        "summary": (summary_raw or "").strip(),
+        "shareTweet": (tweet_raw or "").strip(),
+    }
 
-        series_desc_draft = (frontmatter.get("series_description") or "").strip()
-        if series_desc_draft:
-            meta["seriesDescription"] = series_desc_draft
+    hero_path = PUBLIC_POSTS_IMAGES / f"{slug}-hero.png"
+    if _exists(hero_path):
+        meta["heroImage"] = f"{slug}-hero.png"
+        style_raw = _safe_read(PUBLIC_POSTS_IMAGES / f"{slug}-hero-style.txt")
+        meta["heroImageStyle"] = (style_raw or "").strip() or "keep-proportions"
+        square_path = PUBLIC_POSTS_IMAGES / f"{slug}-hero-square.png"
+        if _exists(square_path):
+            meta["heroImageSquare"] = f"{slug}-hero-square.png"
 
-        out.append(meta)
-    return out
+    series_desc_draft = (frontmatter.get("series_description") or "").strip()
+    if series_desc_draft:
+        meta["seriesDescription"] = series_desc_draft
+
+    return meta
 
 
 def convert_post_to_metadata(post: Dict[str, Any], include_body: bool, include_share_tweet: bool) -> Dict[str, Any]:
@@ -548,7 +779,7 @@ def convert_post_to_metadata(post: Dict[str, Any], include_body: bool, include_s
         h = str(post.get("hero_image"))
         base, ext = h.rsplit(".", 1) if "." in h else (h, "")
         square_name = f"{base}-square.{ext}" if ext else f"{base}-square"
-        if (PUBLIC_POSTS_IMAGES / square_name).exists():
+        if _exists(PUBLIC_POSTS_IMAGES / square_name):
             metadata["heroImageSquare"] = square_name
 
     if post.get("exclude_from_listing"):
@@ -568,7 +799,7 @@ def convert_post_to_metadata(post: Dict[str, Any], include_body: bool, include_s
         metadata["ogImage"] = post.get("og_image")
     else:
         slug = post.get("slug")
-        if slug and (PUBLIC_OG_IMAGES_DIR / f"{slug}-1200x630.jpg").exists():
+        if slug and _exists(PUBLIC_OG_IMAGES_DIR / f"{slug}-1200x630.jpg"):
             metadata["ogImage"] = f"og/{slug}-1200x630.jpg"
 
     if post.get("linked_tweet_url"):
@@ -609,110 +840,201 @@ def convert_post_to_metadata(post: Dict[str, Any], include_body: bool, include_s
     return metadata
 
 
-def sync_locale_caches_hero_from_posts_json() -> None:
-    """Copy heroImage / square / style / ogImage from cache/posts.json into posts.<locale>.json by slug."""
-    if not POSTS_JSON.exists():
-        return
+HERO_KEYS = ("heroImage", "heroImageSquare", "heroImageStyle", "ogImage")
+
+
+def locale_cache_paths() -> List[Tuple[str, Path]]:
+    """(locale, path) for every cache/posts.<locale>.json (two-letter locales only)."""
+    out: List[Tuple[str, Path]] = []
+    for path in sorted(CACHE_DIR.glob("posts.*.json")):
+        mid = path.name.replace("posts.", "").replace(".json", "")
+        if len(mid) == 2 and mid.isalpha():
+            out.append((mid, path))
+    return out
+
+
+def hydrate_locale_cache(
+    locale: str,
+    path: Path,
+    base_heroes: Dict[str, Dict[str, Any]],
+    repo_markdown: Set[str],
+    store_path: Optional[Path] = None,
+) -> Tuple[str, bool, float]:
+    """Propagate hero/OG fields into one locale cache; returns (locale, changed, seconds).
+
+    Copies heroImage / square / style / ogImage from cache/posts.json by slug, then
+    attaches conventional repo assets to posts that have a src/content/posts/<slug>.md
+    (posts may exist only in locale caches). The file, its api/posts/<locale>/
+    shards and api/search.<locale>.json are rewritten only when the serialized
+    output differs. With store_path, the posts are also recorded in that content
+    store (each worker writes its own locale, so the lists never travel back to the
+    parent process).
+    """
+    started = time.perf_counter()
     try:
-        base_list = json.loads(POSTS_JSON.read_text(encoding="utf-8"))
+        raw = path.read_text(encoding="utf-8")
+        data = json.loads(raw)
     except Exception:
-        return
-    if not isinstance(base_list, list):
-        return
-    base_by_slug = {p["slug"]: p for p in base_list if isinstance(p, dict) and p.get("slug")}
-    hero_keys = ("heroImage", "heroImageSquare", "heroImageStyle", "ogImage")
-    for path in CACHE_DIR.glob("posts.*.json"):
-        name = path.name
-        if name == "posts.private.json":
-            continue
-        mid = name.replace("posts.", "").replace(".json", "")
-        if len(mid) != 2 or not mid.isalpha():
-            continue
-        try:
-            data = json.loads(path.read_text(encoding="utf-8"))
-        except Exception:
-            continue
-        if not isinstance(data, list):
+        return locale, False, time.perf_counter() - started
+    if not isinstance(data, list):
+        return locale, False, time.perf_counter() - started
+    for post in data:
+        if not isinstance(post, dict):
             continue
-        changed = False
-        for post in data:
-            slug = post.get("slug") if isinstance(post, dict) else None
-            if not slug or slug not in base_by_slug:
-                continue
-            b = base_by_slug[slug]
-            for key in hero_keys:
-                v = b.get(key)
-                if v and post.get(key) != v:
-                    post[key] = v
-                    changed = True
-        if changed:
-            write_json(path, data)
-
-
-def hydrate_locale_posts_repo_assets() -> None:
-    """Set heroImage / ogImage on posts.<locale>.json when repo has conventional assets (posts may exist only in locale caches)."""
-    for path in CACHE_DIR.glob("posts.*.json"):
-        name = path.name
-        if name == "posts.private.json":
-            continue
-        mid = name.replace("posts.", "").replace(".json", "")
-        if len(mid) != 2 or not mid.isalpha():
-            continue
-        try:
-            data = json.loads(path.read_text(encoding="utf-8"))
-        except Exception:
-            continue
-        if not isinstance(data, list):
+        slug = post.get("slug")
+        if not slug or not isinstance(slug, str):
             continue
-        changed = False
-        for post in data:
-            if not isinstance(post, dict):
-                continue
-            slug = post.get("slug")
-            if not slug or not isinstance(slug, str):
-                continue
-            body_path = WEBSITE_POSTS_DIR / f"{slug}.md"
-            if not body_path.exists():
-                continue
-            before = {k: post.get(k) for k in ("heroImage", "heroImageSquare", "heroImageStyle", "ogImage")}
+        for key, v in base_heroes.get(slug, {}).items():
+            if v and post.get(key) != v:
+                post[key] = v
+        if f"{slug}.md" in repo_markdown:
             _apply_repo_hero_and_og_convention(post, slug)
-            if any(post.get(k) != before.get(k) for k in before):
-                changed = True
-        if changed:
-            write_json(path, data)
+    text = json.dumps(data, indent=2, ensure_ascii=False) + "\n"
+    changed = text != raw
+    if changed:
+        write_text(path, text)
+    if changed or not has_locale_index(CACHE_API_DIR, locale):
+        write_locale_shards(CACHE_API_DIR, locale, data)
+    if changed or not search_index_path(CACHE_API_DIR, locale).exists():
+        write_search_index(CACHE_API_DIR, locale, data)
+    if store_path is not None:
+        with open_store(store_path, sync=False) as store:
+            store.put_posts(locale, path, data)
+    return locale, changed, time.perf_counter() - started
+
+
+def hydrate_locale_caches(workers: Optional[int] = None, store_path: Optional[Path] = None) -> None:
+    """One hero/OG pass per cache/posts.<locale>.json, run across locales in a process pool.
+
+    With store_path, each locale's posts are recorded in that content store as they are written.
+    """
+    with pipeline_profile.stage("hydrate_locales"):
+        _hydrate_locale_caches(workers, store_path)
+
+
+def _hydrate_locale_caches(workers: Optional[int], store_path: Optional[Path]) -> None:
+    targets = locale_cache_paths()
+    if not targets:
+        return
+    base_heroes: Dict[str, Dict[str, Any]] = {}
+    try:
+        base_list = json.loads(POSTS_JSON.read_text(encoding="utf-8")) if POSTS_JSON.exists() else []
+    except Exception:
+        base_list = []
+    if isinstance(base_list, list):
+        for p in base_list:
+            if isinstance(p, dict) and p.get("slug"):
+                base_heroes[p["slug"]] = {k: p.get(k) for k in HERO_KEYS}
+    repo_markdown = {n for n in content_repository().names(WEBSITE_POSTS_DIR) if n.endswith(".md")}
+
+    max_workers = min(len(targets), workers or os.cpu_count() or 1)
+    if max_workers > 1:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers) as pool:
+            futures = [
+                pool.submit(hydrate_locale_cache, locale, path, base_heroes, repo_markdown, store_path)
+                for locale, path in targets
+            ]
+            results = [f.result() for f in futures]
+    else:
+        results = [hydrate_locale_cache(locale, path, base_heroes, repo_markdown, store_path) for locale, path in targets]
 
+    changed = sum(1 for _, c, _ in results if c)
+    pipeline_profile.count("locale_caches_rewritten", changed)
+    timings = ", ".join(f"{locale} {secs * 1000:.0f}ms{'*' if c else ''}" for locale, c, secs in results)
+    print(f"Locale hydration: {changed} changed, {len(results) - changed} unchanged ({timings}; * = rewritten)")
 
-def generate_posts_cache(posts: List[Dict[str, Any]]) -> None:
-    if not posts:
-        export_slugs_empty: set = set()
-        draft_only_metadata = metadata_for_draft_only_slugs(export_slugs_empty)
-        content_only_drafts = metadata_for_content_only_drafts(export_slugs_empty)
-        draft_only_slugs = {m.get("slug") for m in draft_only_metadata if m.get("slug")}
-        for m in content_only_drafts:
-            if m.get("slug") and m.get("slug") not in draft_only_slugs:
-                draft_only_metadata.append(m)
 
-        # No export: committed cache/posts.json + api/posts.json are the deploy
-        # artifact (CI runs SKIP_WEBSITE_CACHE_REGEN=1); only rebuild the
-        # dev-only private cache so a watcher run can't degrade them.
-        all_metadata = list(draft_only_metadata)
-        all_metadata.sort(
-            key=lambda m: (
-                0 if m.get("published") else 1,
-                m.get("publishedDate") or m.get("updatedDate") or m.get("createdDate") or "0000-01-01",
-                m.get("title", ""),
-            ),
-            reverse=True,
-        )
-        overlay_summaries_from_markdown(all_metadata)
-        overlay_body_from_markdown(all_metadata)
-        ensure_repo_override_posts(all_metadata)
-        overlay_listing_excludes(all_metadata)
-        overlay_alternative_slugs(all_metadata)
-        write_json(POSTS_PRIVATE_JSON, all_metadata)
-        sync_locale_caches_hero_from_posts_json()
-        hydrate_locale_posts_repo_assets()
-        return
+def _include_in_listing(post: Dict[str, Any]) -> bool:
+    if not post.get("published"):
+        return False
+    if (post.get("category") or "").lower() == "tweet":
+        return False
+    return True
+
+
+# Metadata keys the listing/private sorts read; snapshotted before markdown overlays run.
+SORT_FIELDS = ("slug", "title", "published", "publishedDate", "updatedDate", "createdDate")
+
+
+def _sort_fields(meta: Dict[str, Any]) -> Dict[str, Any]:
+    return {k: meta[k] for k in SORT_FIELDS if k in meta}
+
+
+def build_slug_entry(source: str, record: Any) -> Dict[str, Any]:
+    """Build one slug's listing/private metadata with markdown overlays applied.
+
+    ``source`` is "export" (record: deduped export post), "draft" (record: slug under
+    drafts/) or "content-draft" (record: unpublished content posts.json entry).
+    List-level passes (repo overrides, listing excludes, alternative slugs) run later.
+    """
+    listing: Optional[Dict[str, Any]] = None
+    if source == "export":
+        private = convert_post_to_metadata(record, include_body=True, include_share_tweet=True)
+        if _include_in_listing(record):
+            listing = convert_post_to_metadata(record, include_body=True, include_share_tweet=False)
+    elif source == "draft":
+        private = metadata_for_draft_only_slug(record)
+    else:
+        private = metadata_for_content_only_draft(record)
+    if private is None:
+        return {"source": source, "order": None, "listing": None, "private": None}
+    order = _sort_fields(private)
+    for meta in (listing, private):
+        if meta is not None:
+            overlay_summaries_from_markdown([meta])
+            overlay_body_from_markdown([meta])
+    if source != "export" and private.get("published"):
+        listing = copy.deepcopy(private)
+    return {"source": source, "order": order, "listing": listing, "private": private}
+
+
+def _record_digest(source: str, record: Any) -> str:
+    raw = json.dumps([source, record], sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _script_digest() -> str:
+    return hashlib.sha256(Path(__file__).read_bytes()).hexdigest()
+
+
+# Manifest entries of the last build in this process (watch mode reuses them without re-reading).
+_build_manifest: Optional[Dict[str, Any]] = None
+
+
+def load_build_manifest() -> Dict[str, Any]:
+    """Slug entries from the previous run, or {} when missing/stale (different script or format)."""
+    if _build_manifest is not None:
+        return _build_manifest
+    try:
+        data = json.loads(BUILD_MANIFEST_JSON.read_text(encoding="utf-8"))
+    except Exception:
+        return {}
+    if not isinstance(data, dict):
+        return {}
+    if data.get("version") != BUILD_MANIFEST_VERSION or data.get("script") != _script_digest():
+        return {}
+    entries = data.get("entries")
+    return entries if isinstance(entries, dict) else {}
+
+
+def _entry_is_current(cached: Any, record_digest: str) -> bool:
+    if not isinstance(cached, dict) or cached.get("record") != record_digest:
+        return False
+    deps = cached.get("deps")
+    if not isinstance(deps, dict):
+        return False
+    return all(_dependency_value(key) == value for key, value in deps.items())
+
+
+def build_post_entries(
+    posts: List[Dict[str, Any]], previous: Dict[str, Any]
+) -> Tuple[List[Dict[str, Any]], Dict[str, Any], int]:
+    """Per-slug entries in pre-sort cache order, the manifest entries to persist, and the rebuilt count.
+
+    Entries in ``previous`` whose record digest and recorded dependencies still match are
+    reused as-is; everything else is rebuilt while recording the inputs it touches.
+    """
+    global _dependency_log
 
     seen: Dict[str, Dict[str, Any]] = {}
     for post in posts:
@@ -722,59 +1044,150 @@ def generate_posts_cache(posts: List[Dict[str, Any]]) -> None:
         existing = seen.get(slug)
         if existing is None or _post_dedupe_rank(post) >= _post_dedupe_rank(existing):
             seen[slug] = post
-    posts = list(seen.values())
-
-    def should_include_in_listing(p: Dict[str, Any]) -> bool:
-        if not p.get("published"):
-            return False
-        if (p.get("category") or "").lower() == "tweet":
-            return False
-        return True
-
-    published_metadata = [
-        convert_post_to_metadata(post, include_body=True, include_share_tweet=False)
-        for post in posts
-        if should_include_in_listing(post)
-    ]
+    export_slugs = set(seen)
+
+    sources: List[Tuple[str, str, Any]] = [(slug, "export", post) for slug, post in seen.items()]
+    sources.extend((slug, "draft", slug) for slug in draft_only_slugs(export_slugs))
+    sources.extend((e["slug"], "content-draft", e) for e in content_only_draft_entries(export_slugs))
+
+    entries: List[Dict[str, Any]] = []
+    manifest: Dict[str, Any] = {}
+    rebuilt = 0
+    for slug, source, record in sources:
+        if slug in manifest and manifest[slug].get("private") is not None:
+            # drafts/ wins over a content posts.json draft with the same slug.
+            continue
+        digest = _record_digest(source, record)
+        cached = previous.get(slug)
+        if _entry_is_current(cached, digest):
+            entry = cached
+        else:
+            _dependency_log = {}
+            try:
+                entry = build_slug_entry(source, record)
+                entry["record"] = digest
+                entry["deps"] = _dependency_log
+            finally:
+                _dependency_log = None
+            rebuilt += 1
+        manifest[slug] = entry
+        if entry.get("private") is not None:
+            entries.append(entry)
+    return entries, manifest, rebuilt
+
+
+def _private_sort_key(meta: Dict[str, Any]) -> Tuple[Any, Any, Any]:
+    if meta.get("published"):
+        return (0, meta.get("publishedDate") or "0000-01-01", meta.get("title", ""))
+    return (1, meta.get("updatedDate") or meta.get("createdDate") or "0000-01-01", meta.get("title", ""))
+
+
+def _apply_list_overlays(metadata_list: List[Dict[str, Any]]) -> None:
+    ensure_repo_override_posts(metadata_list)
+    overlay_listing_excludes(metadata_list)
+    overlay_alternative_slugs(metadata_list)
+
+
+def generate_posts_cache(
+    posts: List[Dict[str, Any]],
+    incremental: bool = False,
+    locale_workers: Optional[int] = None,
+    hydrate_locales: bool = True,
+    store: Optional[ContentStore] = None,
+) -> List[Dict[str, Any]]:
+    """Write the posts caches; returns the private (all posts) metadata list.
+
+    The locale hero/OG pass runs when hydrate_locales is set or posts.json changed.
+    With a store, posts.json and the locale caches are recorded in it as they are written.
+    """
+    global _build_manifest
+
+    with pipeline_profile.stage("build_entries"):
+        previous = load_build_manifest() if incremental else {}
+        entries, manifest, rebuilt = build_post_entries(posts, previous)
+    _build_manifest = manifest
+    pipeline_profile.count("slugs_rebuilt", rebuilt)
+    pipeline_profile.count("slugs_reused", len(manifest) - rebuilt)
+    # Internal build state: written compact, it carries every slug's full metadata.
+    write_text(
+        BUILD_MANIFEST_JSON,
+        json.dumps(
+            {"version": BUILD_MANIFEST_VERSION, "script": _script_digest(), "entries": manifest},
+            ensure_ascii=False,
+        ),
+    )
+    mode = "incremental" if incremental else "full"
+    print(f"Posts cache ({mode}): {rebuilt} slug(s) rebuilt, {len(manifest) - rebuilt} reused")
 
-    export_slugs = {p.get("slug") for p in posts if p.get("slug")}
-    draft_only_metadata = metadata_for_draft_only_slugs(export_slugs)
-    content_only_drafts = metadata_for_content_only_drafts(export_slugs)
-    draft_only_slugs = {m.get("slug") for m in draft_only_metadata if m.get("slug")}
-    for m in content_only_drafts:
-        if m.get("slug") and m.get("slug") not in draft_only_slugs:
-            draft_only_metadata.append(m)
-    published_metadata.extend(m for m in draft_only_metadata if m.get("published"))
-
-    published_metadata.sort(key=lambda m: (m.get("slug") or ""))
-    published_metadata.sort(key=lambda m: (m.get("publishedDate") or "0000-01-01"), reverse=True)
-    overlay_summaries_from_markdown(published_metadata)
-    overlay_body_from_markdown(published_metadata)
-    ensure_repo_override_posts(published_metadata)
-    overlay_listing_excludes(published_metadata)
-    overlay_alternative_slugs(published_metadata)
-
-    write_json(POSTS_JSON, published_metadata)
-    write_json(API_POSTS_JSON, {"url": f"{SITE_BASE}/api/posts.json", "posts": published_metadata})
-
-    all_metadata = [convert_post_to_metadata(post, include_body=True, include_share_tweet=True) for post in posts]
-    if draft_only_metadata:
-        all_metadata.extend(draft_only_metadata)
-
-    def private_sort_key(meta: Dict[str, Any]) -> Tuple[Any, Any, Any]:
-        if meta.get("published"):
-            return (0, meta.get("publishedDate") or "0000-01-01", meta.get("title", ""))
-        return (1, meta.get("updatedDate") or meta.get("createdDate") or "0000-01-01", meta.get("title", ""))
-
-    all_metadata.sort(key=private_sort_key, reverse=True)
-    overlay_summaries_from_markdown(all_metadata)
-    overlay_body_from_markdown(all_metadata)
-    ensure_repo_override_posts(all_metadata)
-    overlay_listing_excludes(all_metadata)
-    overlay_alternative_slugs(all_metadata)
+    if not posts:
+        # No export: committed cache/posts.json + api/posts.json are the deploy
+        # artifact (CI runs SKIP_WEBSITE_CACHE_REGEN=1); only rebuild the
+        # dev-only private cache so a watcher run can't degrade them.
+        rows = [(e["order"], copy.deepcopy(e["private"])) for e in entries]
+        rows.sort(
+            key=lambda row: (
+                0 if row[0].get("published") else 1,
+                row[0].get("publishedDate") or row[0].get("updatedDate") or row[0].get("createdDate") or "0000-01-01",
+                row[0].get("title", ""),
+            ),
+            reverse=True,
+        )
+        all_metadata = [meta for _, meta in rows]
+        _apply_list_overlays(all_metadata)
+        write_json(POSTS_PRIVATE_JSON, all_metadata)
+        if hydrate_locales:
+            hydrate_locale_caches(locale_workers, store.path if store is not None else None)
+        return all_metadata
+
+    listing_rows = [(e["order"], copy.deepcopy(e["listing"])) for e in entries if e["listing"] is not None]
+    listing_rows.sort(key=lambda row: (row[0].get("slug") or ""))
+    listing_rows.sort(key=lambda row: (row[0].get("publishedDate") or "0000-01-01"), reverse=True)
+    published_metadata = [meta for _, meta in listing_rows]
+    _apply_list_overlays(published_metadata)
+    add_related_slugs(published_metadata)
+
+    posts_written = any(
+        write_json_pair(POSTS_JSON, API_POSTS_JSON, published_metadata, {"url": f"{SITE_BASE}/api/posts.json"}, "posts")
+    )
+    if store is not None:
+        store.put_posts(BASE, POSTS_JSON, published_metadata)
+
+    # Published drafts share one object between both lists, so the private sort sees
+    # their markdown-overlaid fields; everything else sorts on pre-overlay fields.
+    private_rows = [
+        (e["private"] if e["source"] != "export" and e["private"].get("published") else e["order"], copy.deepcopy(e["private"]))
+        for e in entries
+    ]
+    private_rows.sort(key=lambda row: _private_sort_key(row[0]), reverse=True)
+    all_metadata = [meta for _, meta in private_rows]
+    _apply_list_overlays(all_metadata)
     write_json(POSTS_PRIVATE_JSON, all_metadata)
-    sync_locale_caches_hero_from_posts_json()
-    hydrate_locale_posts_repo_assets()
+    if hydrate_locales or posts_written:
+        hydrate_locale_caches(locale_workers, store.path if store is not None else None)
+    return all_metadata
+
+
+BODY_IMAGE_REF = re.compile(r"images/(?:posts|og)/([^)\s\"'`]+)")
+
+
+def report_unowned_assets(metadata_list: List[Dict[str, Any]], list_all: bool) -> None:
+    """Print how many indexed images no post owns (by slug prefix or by reference)."""
+    slugs = {m.get("slug") for m in metadata_list if m.get("slug")}
+    slugs.update(n.split(".", 1)[0] for n in content_repository().names(WEBSITE_POSTS_DIR) if n.endswith(".md"))
+    slugs.update(p.stem for p in draft_slugs_from_markdown())
+    referenced: Set[str] = set()
+    for meta in metadata_list:
+        for key in ("heroImage", "heroImageSquare", "ogImage"):
+            if meta.get(key):
+                referenced.add(str(meta[key]))
+        referenced.update(BODY_IMAGE_REF.findall(str(meta.get("body") or "")))
+    index = asset_index()
+    unowned = index.unowned(slugs, referenced)
+    total = sum(len(names) for names in index.files.values())
+    print(f"Asset index: {total} file(s); {len(unowned)} without an owning post")
+    if list_all:
+        for name in unowned:
+            print(f"  {name}")
 
 
 def generate_links_cache(links: List[Dict[str, Any]]) -> None:
@@ -791,8 +1204,7 @@ def generate_links_cache(links: List[Dict[str, Any]]) -> None:
         }
         for link in links
     ]
-    write_json(LINKS_JSON, output)
-    write_json(API_LINKS_JSON, {"url": f"{SITE_BASE}/api/links.json", "links": output})
+    write_json_pair(LINKS_JSON, API_LINKS_JSON, output, {"url": f"{SITE_BASE}/api/links.json"}, "links")
 
 
 def _parse_description(desc: Any) -> List[str]:
@@ -827,17 +1239,128 @@ def generate_timeline_cache(timeline: List[Dict[str, Any]]) -> None:
                 "description": _parse_description(entry.get("description")),
             }
         )
-    write_json(TIMELINE_JSON, output)
-    write_json(API_TIMELINE_JSON, {"url": f"{SITE_BASE}/api/timeline.json", "timeline": output})
+    write_json_pair(TIMELINE_JSON, API_TIMELINE_JSON, output, {"url": f"{SITE_BASE}/api/timeline.json"}, "timeline")
+
+
+WATCH_DIRS = (WEBSITE_POSTS_DIR, WEBSITE_POSTS_DIR / "drafts", PUBLIC_POSTS_IMAGES, PUBLIC_OG_IMAGES_DIR)
+
+
+def _watch_snapshot(export_path: Path) -> Dict[Path, Tuple[int, int]]:
+    """(mtime_ns, size) of every file the build reads: content dirs, image dirs, export file(s)."""
+    snapshot: Dict[Path, Tuple[int, int]] = {}
+    dirs = list(WATCH_DIRS)
+    if export_path.is_dir():
+        dirs.append(export_path)
+    for d in dirs:
+        try:
+            with os.scandir(d) as it:
+                for e in it:
+                    if e.is_file() and not e.name.startswith("."):
+                        st = e.stat()
+                        snapshot[Path(e.path)] = (st.st_mtime_ns, st.st_size)
+        except OSError:
+            pass
+    if export_path.is_file():
+        st = export_path.stat()
+        snapshot[export_path] = (st.st_mtime_ns, st.st_size)
+    return snapshot
+
+
+def watch(export_path: Path, export_workers: Optional[int], locale_workers: Optional[int], interval: float) -> None:
+    """Rebuild on change, keeping the export, content and slug manifest in memory between cycles.
+
+    Changes are found by polling mtime/size of the watched files. Only the changed
+    paths are re-read; slugs whose recorded inputs are untouched are reused, and the
+    writer skips outputs whose bytes did not change.
+    """
+    posts, links, timeline, _ = load_export(export_path, workers=export_workers)
+    with cache_lock(CACHE_DIR), open_store(sync=False) as store:
+        generate_posts_cache(posts, incremental=True, locale_workers=locale_workers, store=store)
+        generate_links_cache(links)
+        generate_timeline_cache(timeline)
+    snapshot = _watch_snapshot(export_path)
+    print(f"Watching {len(snapshot)} file(s) every {interval:g}s (Ctrl-C to stop)", flush=True)
+    try:
+        while True:
+            time.sleep(interval)
+            current = _watch_snapshot(export_path)
+            changed = {p for p in snapshot.keys() | current.keys() if snapshot.get(p) != current.get(p)}
+            if not changed:
+                continue
+            started = time.perf_counter()
+            # Latency is measured from the newest change; deletions count from detection.
+            changed_at = max((current[p][0] / 1e9 for p in changed if p in current), default=time.time())
+            export_changed = any(p == export_path or p.parent == export_path for p in changed)
+            hydrate = any(
+                p.parent in (PUBLIC_POSTS_IMAGES, PUBLIC_OG_IMAGES_DIR)
+                or (p.parent == WEBSITE_POSTS_DIR and p.suffix == ".md" and (p in snapshot) != (p in current))
+                for p in changed
+            )
+            snapshot = current
+            if export_changed:
+                posts, links, timeline, _ = load_export(export_path, workers=export_workers)
+            content_repository().refresh(changed)
+            asset_index().refresh(changed)
+            with cache_lock(CACHE_DIR), open_store(sync=False) as store:
+                generate_posts_cache(
+                    posts, incremental=True, locale_workers=locale_workers, hydrate_locales=hydrate, store=store
+                )
+                if export_changed:
+                    generate_links_cache(links)
+                    generate_timeline_cache(timeline)
+            build_ms = (time.perf_counter() - started) * 1000
+            latency_ms = max(0.0, time.time() - changed_at) * 1000
+            names = ", ".join(sorted(p.name for p in changed)[:3]) + (", ..." if len(changed) > 3 else "")
+            print(
+                f"Watch: {len(changed)} file(s) changed ({names}); built in {build_ms:.0f} ms, "
+                f"change-to-written {latency_ms:.0f} ms",
+                flush=True,
+            )
+    except KeyboardInterrupt:
+        pass
 
 
 def main() -> None:
+    pipeline_profile.start("generate_cache")
     p = argparse.ArgumentParser(description="Generate website cache from Neotoma export JSON.")
     p.add_argument(
         "--from-neotoma-json",
         type=Path,
         default=DEFAULT_NEOTOMA_EXPORT,
-        help=f"Neotoma export JSON path (default: {DEFAULT_NEOTOMA_EXPORT})",
+        help=f"Neotoma export JSON path, or a directory of *.json export shards (default: {DEFAULT_NEOTOMA_EXPORT})",
+    )
+    p.add_argument(
+        "--export-workers",
+        type=int,
+        default=None,
+        help="Processes for scanning a directory of export shards (default: CPU count)",
+    )
+    p.add_argument(
+        "--locale-workers",
+        type=int,
+        default=None,
+        help="Processes for the per-locale hero/OG hydration pass (default: CPU count)",
+    )
+    p.add_argument(
+        "--full",
+        action="store_true",
+        help=f"Ignore the incremental build manifest ({BUILD_MANIFEST_JSON.name}) and rebuild every slug",
+    )
+    p.add_argument(
+        "--watch",
+        action="store_true",
+        help="Stay resident and rebuild affected slugs whenever content, images or the export change",
+    )
+    p.add_argument(
+        "--poll-interval",
+        type=float,
+        default=0.5,
+        help="Seconds between change scans in --watch mode (default: 0.5)",
+    )
+    p.add_argument(
+        "--list-unowned-assets",
+        action="store_true",
+        help="List images under public/images/{posts,og} that no post owns",
     )
     args = p.parse_args()
 
@@ -846,10 +1369,32 @@ def main() -> None:
         export_path.parent.mkdir(parents=True, exist_ok=True)
         write_json(export_path, {"posts": [], "links": [], "timeline": []})
 
-    posts, links, timeline = load_from_neotoma_json(export_path)
-    generate_posts_cache(posts)
-    generate_links_cache(links)
-    generate_timeline_cache(timeline)
+    if args.watch:
+        watch(export_path, args.export_workers, args.locale_workers, args.poll_interval)
+        return
+
+    with pipeline_profile.stage("load_export"):
+        posts, links, timeline, post_records = load_export(export_path, workers=args.export_workers)
+    pipeline_profile.count("export_records", post_records)
+    if post_records:
+        print(f"Export: {post_records} post record(s), {len(posts)} unique slug(s)")
+    # Serialize with watch:cache / manual runs so two builds never interleave writes.
+    with cache_lock(CACHE_DIR), open_store(sync=False) as store:
+        with pipeline_profile.stage("posts_cache"):
+            all_metadata = generate_posts_cache(
+                posts, incremental=not args.full, locale_workers=args.locale_workers, store=store
+            )
+        with pipeline_profile.stage("asset_report"):
+            report_unowned_assets(all_metadata, args.list_unowned_assets)
+        with pipeline_profile.stage("links_timeline"):
+            generate_links_cache(links)
+            generate_timeline_cache(timeline)
+        # The post caches were recorded as they were written; import the sources left
+        # (translations, glossary, images, caches this run did not touch).
+        with pipeline_profile.stage("content_store"):
+            imported = store.sync()
+        if imported:
+            print(f"Content store: {imported} source(s) re-imported")
 
 
 if __name__ == "__main__":
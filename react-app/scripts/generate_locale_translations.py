@@ -1,47 +1,58 @@
 #!/usr/bin/env python3
-"""Generate/refresh post translations for all supported locales."""
+"""Generate/refresh post translations for all supported locales.
+
+Every chunk sent to a translator is kept in the persistent translation memory
+(translation_memory.py), so re-runs and repeated text cost no provider calls.
+The remaining chunks of all locales are translated concurrently under per-provider
+rate limits (translation_scheduler.py, --workers / --rate); files are assembled
+afterwards, so they do not depend on the number of workers. Code, URLs and glossary
+heading terms never reach the providers (translation_placeholders.py).
+Entries record per-paragraph source fingerprints (translation_paragraphs.py): an
+edited English paragraph is re-translated and spliced in place, the rest is kept.
+--backend pseudo runs the whole pipeline offline (translation_backends.py).
+
+A run first plans: every (slug, locale, field, segment) work item, most visible
+posts first (--priority-slug, then published listed posts, newest first), and the
+chunks the memory already has. --plan stops there and prints the plan (--plan-json
+PATH also writes each item with its character counts); it constructs no translator
+and writes nothing else. Otherwise the chunks are sent in plan order, so with
+--budget PROVIDER=CHARS the most visible posts are translated first and the rest
+wait for the next run:
+
+    python3 scripts/generate_locale_translations.py --plan --budget GoogleTranslator=500000
+"""
 
 from __future__ import annotations
 
 import argparse
+import contextlib
+import functools
 import json
 import re
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Any, Callable, Iterator
 
-from deep_translator import GoogleTranslator, MyMemoryTranslator
+import pipeline_profile
+from artifact_writer import write_json
+from translation_backends import LOCALE_TO_TRANSLATOR_LANG, make_translators, provider_names
+from translation_backends import add_arguments as add_backend_arguments
+from translation_glossary import load_glossary_for_mt
+from translation_memory import (
+    MEMORY_PATH,
+    TranslationMemory,
+    chunk_text,
+    open_memory,
+    source_chunks,
+)
+from translation_paragraphs import FINGERPRINTS_KEY, live_keys, sync_field
+from translation_scheduler import ChunkJob, ChunkResult, TranslationScheduler, budgets_from_args, rates_from_args
+from translation_scheduler import add_arguments as add_scheduler_arguments
 
 
 ROOT = Path(__file__).resolve().parents[1]
 EN_CACHE_PATH = ROOT / "cache" / "posts.en.json"
 TRANSLATIONS_DIR = ROOT / "src" / "content" / "posts"
-LOCALE_TO_TRANSLATOR_LANG = {
-    "es": "es",
-    "ca": "ca",
-    "zh": "zh-CN",
-    "hi": "hi",
-    "ar": "ar",
-    "fr": "fr",
-    "pt": "pt",
-    "ru": "ru",
-    "bn": "bn",
-    "ur": "ur",
-    "id": "id",
-    "de": "de",
-}
-LOCALE_TO_MYMEMORY_LANG = {
-    "es": "es-ES",
-    "ca": "ca-ES",
-    "zh": "zh-CN",
-    "hi": "hi-IN",
-    "ar": "ar-SA",
-    "fr": "fr-FR",
-    "pt": "pt-PT",
-    "ru": "ru-RU",
-    "bn": "bn-IN",
-    "ur": "ur-PK",
-    "id": "id-ID",
-    "de": "de-DE",
-}
 TRANSLATABLE_FIELDS = ("title", "excerpt", "summary", "body", "postscript")
 
 # Re-written every CI run; must not drop hand-curated keys (series chrome, share copy).
@@ -55,55 +66,11 @@ def _fix_markdown_link_spacing(text: str) -> str:
     return re.sub(r"]\s+\(", "](", text)
 
 
-def _chunk_text(text: str, max_chars: int = 4200) -> list[str]:
-    if len(text) <= max_chars:
-        return [text]
-    chunks: list[str] = []
-    current: list[str] = []
-    current_len = 0
-    for paragraph in text.split("\n\n"):
-        extra = len(paragraph) + (2 if current else 0)
-        if current and current_len + extra > max_chars:
-            chunks.append("\n\n".join(current))
-            current = [paragraph]
-            current_len = len(paragraph)
-        else:
-            current.append(paragraph)
-            current_len += extra
-    if current:
-        chunks.append("\n\n".join(current))
-    return chunks
-
-
-def _translate_text(
-    text: str, translators: list, cache: dict[str, str]
-) -> str:
+def _assemble_text(text: str, locale: str, chunks: dict[tuple[str, str], str]) -> str:
     source = (text or "").strip()
     if not source:
         return ""
-    if source in cache:
-        return cache[source]
-    translated_parts: list[str] = []
-    for chunk in _chunk_text(source):
-        translated_chunk = chunk
-        for translator in translators:
-            try:
-                candidate = (translator.translate(chunk) or "").strip()
-            except Exception:
-                continue
-            if not candidate:
-                continue
-            translated_chunk = candidate
-            if _norm_text(candidate) != _norm_text(chunk):
-                break
-        translated_parts.append(translated_chunk)
-    translated = "\n\n".join(translated_parts)
-    cache[source] = translated
-    return translated
-
-
-def _norm_text(value: str) -> str:
-    return " ".join(str(value or "").split()).strip().lower()
+    return "\n\n".join(chunks[(locale, chunk)] for chunk in chunk_text(source))
 
 
 def _load_postscript_source(slug: str) -> str:
@@ -123,68 +90,334 @@ def _load_postscript_source(slug: str) -> str:
     return ""
 
 
-def main() -> None:
-    parser = argparse.ArgumentParser(description="Generate locale post translation overrides.")
-    parser.parse_args()
+def _post_slug(post: dict) -> str:
+    return str(post.get("canonicalSlug") or post.get("postId") or post.get("slug") or "")
+
+
+def _source_texts(posts: list) -> Iterator[str]:
+    """Every English source value the translators may be sent."""
+    for post in posts:
+        if not isinstance(post, dict):
+            continue
+        slug = _post_slug(post)
+        if not slug:
+            continue
+        for field in TRANSLATABLE_FIELDS:
+            yield _load_postscript_source(str(slug)) if field == "postscript" else str(post.get(field) or "")
+
+
+def _by_priority(posts: list, first_slugs: list[str]) -> list[dict]:
+    """posts most visible first: first_slugs in order, then published listed posts, then the rest; newest first."""
+    first = {slug: i for i, slug in enumerate(first_slugs)}
+    newest = sorted(
+        (p for p in posts if isinstance(p, dict)),
+        key=lambda p: str(p.get("publishedDate") or p.get("updatedDate") or p.get("createdDate") or "0000-01-01"),
+        reverse=True,
+    )
+    return sorted(
+        newest,
+        key=lambda p: (
+            first.get(_post_slug(p), len(first)),
+            0 if p.get("published") and not p.get("excludeFromListing") else 1,
+        ),
+    )
 
-    posts = json.loads(EN_CACHE_PATH.read_text(encoding="utf-8"))
-    if not isinstance(posts, list):
-        raise RuntimeError(f"Expected list in {EN_CACHE_PATH}")
 
-    for locale, lang in LOCALE_TO_TRANSLATOR_LANG.items():
+def _sync_locale(
+    posts: list, existing: dict[str, dict], translate: Callable[[str, str, str], str]
+) -> dict[str, dict]:
+    """translations.<locale>.json for posts; translate(slug, field, text) is called for every text that needs MT."""
+    output: dict[str, dict] = {}
+    for post in posts:
+        if not isinstance(post, dict):
+            continue
+        slug = _post_slug(post)
+        if not slug:
+            continue
+
+        prior = existing.get(slug, {}) if isinstance(existing.get(slug), dict) else {}
+        prior_fingerprints = prior.get(FINGERPRINTS_KEY)
+        if not isinstance(prior_fingerprints, dict):
+            prior_fingerprints = {}
+        entry: dict[str, Any] = {}
+        entry_fingerprints: dict[str, list[str]] = {}
+        for field in TRANSLATABLE_FIELDS:
+            if field == "postscript":
+                source_value = _load_postscript_source(str(slug))
+            else:
+                source_value = str(post.get(field) or "").strip()
+            value, field_fingerprints = sync_field(
+                source_value,
+                str(prior.get(field) or ""),
+                prior_fingerprints.get(field),
+                functools.partial(translate, str(slug), field),
+            )
+            entry[field] = _fix_markdown_link_spacing(value)
+            if field_fingerprints:
+                entry_fingerprints[field] = field_fingerprints
+
+        if prior.get("slug"):
+            entry["slug"] = prior.get("slug")
+        if isinstance(prior.get("alternativeSlugs"), list):
+            entry["alternativeSlugs"] = prior.get("alternativeSlugs")
+        for key in PRESERVE_FROM_PRIOR:
+            if prior.get(key):
+                entry[key] = prior[key]
+        if entry_fingerprints:
+            entry[FINGERPRINTS_KEY] = entry_fingerprints
+
+        output[slug] = entry
+    return output
+
+
+def _load_existing() -> dict[str, dict[str, dict]]:
+    existing: dict[str, dict[str, dict]] = {}
+    for locale in LOCALE_TO_TRANSLATOR_LANG:
         out_path = TRANSLATIONS_DIR / f"translations.{locale}.json"
-        existing: dict[str, dict] = {}
+        existing[locale] = {}
         if out_path.exists():
             loaded = json.loads(out_path.read_text(encoding="utf-8"))
             if isinstance(loaded, dict):
-                existing = loaded
+                existing[locale] = loaded
+    return existing
 
-        translators = [GoogleTranslator(source="en", target=lang)]
-        mymemory_target = LOCALE_TO_MYMEMORY_LANG.get(locale)
-        if mymemory_target:
-            translators.append(
-                MyMemoryTranslator(source="en-GB", target=mymemory_target)
-            )
-        text_cache: dict[str, str] = {}
-        output: dict[str, dict] = {}
-
-        for post in posts:
-            if not isinstance(post, dict):
-                continue
-            slug = post.get("canonicalSlug") or post.get("postId") or post.get("slug")
-            if not slug:
-                continue
-
-            prior = existing.get(slug, {}) if isinstance(existing.get(slug), dict) else {}
-            entry: dict[str, str] = {}
-            for field in TRANSLATABLE_FIELDS:
-                if field == "postscript":
-                    source_value = _load_postscript_source(str(slug))
-                else:
-                    source_value = str(post.get(field) or "").strip()
-                prior_value = str(prior.get(field) or "").strip()
-                if prior_value and _norm_text(prior_value) != _norm_text(source_value):
-                    entry[field] = _fix_markdown_link_spacing(prior_value)
-                    continue
-                entry[field] = _fix_markdown_link_spacing(
-                    _translate_text(source_value, translators, text_cache)
-                )
-
-            if prior.get("slug"):
-                entry["slug"] = prior.get("slug")
-            if isinstance(prior.get("alternativeSlugs"), list):
-                entry["alternativeSlugs"] = prior.get("alternativeSlugs")
-            for key in PRESERVE_FROM_PRIOR:
-                if prior.get(key):
-                    entry[key] = prior[key]
-
-            output[slug] = entry
-
-        out_path.write_text(
-            json.dumps(output, ensure_ascii=False, indent=2) + "\n",
-            encoding="utf-8",
+
+@dataclass(frozen=True)
+class WorkItem:
+    """One chunk (segment) of one field of one post that one locale needs translated."""
+
+    slug: str
+    locale: str
+    field: str
+    segment: int
+    chunk: str
+
+
+@dataclass
+class Plan:
+    """items in priority order; jobs: the distinct chunks not in the translation memory, same order."""
+
+    items: list[WorkItem]
+    remembered: dict[tuple[str, str], str]
+    jobs: list[ChunkJob]
+
+
+def _plan(
+    posts: list,
+    existing: dict[str, dict[str, dict]],
+    first_slugs: list[str],
+    providers: Callable[[str], list[str]],
+    lookup: Callable[[str, list[str], str], str | None],
+) -> Plan:
+    """Work items of every locale, most visible posts first; lookup(locale, providers, chunk) asks the memory."""
+    ordered = _by_priority(posts, first_slugs)
+    items: list[WorkItem] = []
+    for locale in LOCALE_TO_TRANSLATOR_LANG:
+        segments: dict[tuple[str, str], int] = {}
+
+        def collect(slug: str, field: str, text: str, locale: str = locale, segments: dict = segments) -> str:
+            for chunk in source_chunks([text]):
+                segment = segments[(slug, field)] = segments.get((slug, field), -1) + 1
+                items.append(WorkItem(slug, locale, field, segment, chunk))
+            return text
+
+        _sync_locale(ordered, existing[locale], collect)
+    rank = {_post_slug(post): i for i, post in enumerate(ordered)}
+    items.sort(key=lambda item: rank[item.slug])
+
+    remembered: dict[tuple[str, str], str] = {}
+    jobs: dict[ChunkJob, None] = {}
+    for item in items:
+        job = ChunkJob(item.locale, item.chunk)
+        if job in jobs or (item.locale, item.chunk) in remembered:
+            continue
+        translation = lookup(item.locale, providers(item.locale), item.chunk)
+        if translation is None:
+            jobs[job] = None
+        else:
+            remembered[(item.locale, item.chunk)] = translation
+    return Plan(items, remembered, list(jobs))
+
+
+def _plan_report(plan: Plan, scheduler: TranslationScheduler, providers: Callable[[str], list[str]]) -> dict:
+    """Work items with character counts, totals per locale and post, and the chunks --budget defers.
+
+    An item's send_chars is 0 when the memory, an earlier item or placeholders (nothing left to
+    translate) cover it, so the totals are what a run sends, before batch markers and retries.
+    """
+    send_chars = {job: scheduler.send_chars(job) for job in plan.jobs}
+    rows: list[dict[str, Any]] = []
+    slugs: dict[ChunkJob, str] = {}
+    for item in plan.items:
+        job = ChunkJob(item.locale, item.chunk)
+        first = job in send_chars and job not in slugs
+        slugs.setdefault(job, item.slug)
+        rows.append(
+            {
+                "slug": item.slug,
+                "locale": item.locale,
+                "field": item.field,
+                "segment": item.segment,
+                "chars": len(item.chunk),
+                "send_chars": send_chars[job] if first else 0,
+                "memory_hit": (item.locale, item.chunk) in plan.remembered,
+            }
         )
-        print(f"Wrote {out_path} ({len(output)} posts)")
+
+    # run() resolves chunks with nothing to translate before admit(), so they never spend budget.
+    _, deferred = scheduler.admit([job for job in plan.jobs if send_chars[job]], providers)
+
+    by_locale: dict[str, dict[str, int]] = {}
+    by_post: dict[str, dict[str, int]] = {}
+    for row in rows:
+        for key, totals in ((row["locale"], by_locale), (row["slug"], by_post)):
+            entry = totals.setdefault(key, {"items": 0, "send_chunks": 0, "send_chars": 0})
+            entry["items"] += 1
+            entry["send_chunks"] += 1 if row["send_chars"] else 0
+            entry["send_chars"] += row["send_chars"]
+    return {
+        "totals": {
+            "items": len(rows),
+            "posts": len(by_post),
+            "source_chars": sum(row["chars"] for row in rows),
+            "memory_hits": sum(1 for row in rows if row["memory_hit"]),
+            "memory_hit_chars": sum(row["chars"] for row in rows if row["memory_hit"]),
+            "send_chunks": sum(1 for chars in send_chars.values() if chars),
+            "send_chars": sum(send_chars.values()),
+            "local_chunks": sum(1 for chars in send_chars.values() if not chars),
+            "deferred_chunks": len(deferred),
+            "deferred_chars": sum(send_chars[job] for job in deferred),
+        },
+        "budgets": scheduler.budgets,
+        "deferred": [{"locale": job.locale, "slug": slugs[job]} for job in deferred],
+        "by_locale": by_locale,
+        "by_post": by_post,
+        "items": rows,
+    }
+
+
+def _print_plan(report: dict, top: int = 15) -> None:
+    t = report["totals"]
+    print(f"Plan: {t['items']} work items in {t['posts']} posts, {t['source_chars']} source chars")
+    print(f"  translation memory: {t['memory_hits']} items ({t['memory_hit_chars']} chars)")
+    print(
+        f"  to send: {t['send_chunks']} chunks, {t['send_chars']} chars after placeholders"
+        f" (+{t['local_chunks']} resolved without a provider)"
+    )
+    if report["budgets"]:
+        print("  budgets: " + ", ".join(f"{name} {chars} chars" for name, chars in report["budgets"].items()))
+    if t["deferred_chunks"]:
+        first = report["deferred"][0]
+        print(
+            f"  deferred by --budget: {t['deferred_chunks']} chunks ({t['deferred_chars']} chars),"
+            f" the first in {first['slug']} ({first['locale']})"
+        )
+    print("  per locale: " + ", ".join(f"{loc} {v['send_chars']}" for loc, v in report["by_locale"].items()))
+    posts = [(slug, v) for slug, v in report["by_post"].items() if v["send_chars"]]
+    print(f"  posts to send, in priority order ({len(posts)}):")
+    for slug, v in posts[:top]:
+        print(f"    {slug}: {v['send_chunks']} chunks, {v['send_chars']} chars")
+    if len(posts) > top:
+        print(f"    ... {len(posts) - top} more")
+
+
+def _translate_locales(
+    posts: list,
+    existing: dict[str, dict[str, dict]],
+    plan: Plan,
+    memory: TranslationMemory,
+    scheduler: TranslationScheduler,
+) -> None:
+    chunks = dict(plan.remembered)
+
+    def remember(job: ChunkJob, result: ChunkResult) -> None:
+        # An echoed chunk is not memorized, so the next run asks a provider again.
+        if result.translated and result.provider is not None:
+            memory.put(job.locale, result.provider, job.chunk, result.text)
+        chunks[(job.locale, job.chunk)] = result.text
+
+    with pipeline_profile.stage("translate:providers"):
+        print(f"Translating {len(plan.jobs)} chunks ({len(chunks)} from translation memory)", flush=True)
+        scheduler.run(plan.jobs, remember)
+        for line in scheduler.report():
+            print(line)
+
+    for locale in LOCALE_TO_TRANSLATOR_LANG:
+        with pipeline_profile.stage(f"translate:{locale}"):
+            out_path = TRANSLATIONS_DIR / f"translations.{locale}.json"
+            output = _sync_locale(
+                posts, existing[locale], lambda slug, field, text: _assemble_text(text, locale, chunks)
+            )
+            status = "Wrote" if write_json(out_path, output) else "Unchanged"
+            print(f"{status} {out_path} ({len(output)} posts)")
+
+
+def _peek(memory: TranslationMemory | None, locale: str, providers: list[str], chunk: str) -> str | None:
+    found = memory.find(locale, providers, chunk) if memory is not None else None
+    return found[1] if found else None
+
+
+def main() -> None:
+    pipeline_profile.start("generate_locale_translations")
+    parser = argparse.ArgumentParser(description="Generate locale post translation overrides.")
+    parser.add_argument(
+        "--prune-memory",
+        action="store_true",
+        help=f"Afterwards drop {MEMORY_PATH.name} entries whose source is no longer in any post",
+    )
+    parser.add_argument(
+        "--plan",
+        action="store_true",
+        help="Print the work items, characters to send and memory hits; construct no translator, write nothing",
+    )
+    parser.add_argument("--plan-json", type=Path, metavar="PATH", help="Write the plan as JSON to PATH (implies --plan)")
+    parser.add_argument(
+        "--priority-slug",
+        action="append",
+        default=[],
+        metavar="SLUG",
+        help="Translate this post first (repeatable); then published listed posts, newest first",
+    )
+    add_scheduler_arguments(parser)
+    add_backend_arguments(parser)
+    args = parser.parse_args()
+
+    posts = json.loads(EN_CACHE_PATH.read_text(encoding="utf-8"))
+    if not isinstance(posts, list):
+        raise RuntimeError(f"Expected list in {EN_CACHE_PATH}")
+
+    providers = functools.partial(provider_names, args=args)
+    scheduler = TranslationScheduler(
+        functools.partial(make_translators, args=args),
+        args.workers,
+        rates_from_args(args),
+        batch_chars=args.batch_chars,
+        placeholders=args.placeholders,
+        glossary=load_glossary_for_mt(),
+        budgets=budgets_from_args(args),
+    )
+    existing = _load_existing()
+
+    if args.plan or args.plan_json:
+        # Read-only: a missing memory file is not created, hits do not refresh used_at.
+        with open_memory() if MEMORY_PATH.exists() else contextlib.nullcontext(None) as memory:
+            with pipeline_profile.stage("translate:plan"):
+                plan = _plan(posts, existing, args.priority_slug, providers, functools.partial(_peek, memory))
+                report = _plan_report(plan, scheduler, providers)
+        _print_plan(report)
+        if args.plan_json:
+            write_json(args.plan_json, report)
+            print(f"Wrote {args.plan_json}")
+        return
+
+    with open_memory() as memory:
+        with pipeline_profile.stage("translate:plan"):
+            plan = _plan(posts, existing, args.priority_slug, providers, memory.lookup)
+        _translate_locales(posts, existing, plan, memory, scheduler)
+        print(memory.summary())
+        if args.prune_memory:
+            pruned = memory.prune(live_keys(_source_texts(posts)))
+            print(f"Pruned {pruned} translation memory entries no longer used by any post")
 
 
 if __name__ == "__main__":
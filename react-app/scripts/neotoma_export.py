@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""Streaming reader for Neotoma website export JSON.
+
+The export is one object with "posts", "links" and "timeline" arrays. Posts carry
+every revision of a record, so the file grows with history rather than with live
+posts. This module walks the arrays element by element with a bounded read buffer
+and keeps only the best-ranked post per slug while it streams (same ranking and
+tie-breaking as generate_cache._post_dedupe_rank: the last record with the highest
+rank wins, slugs keep their first-seen order).
+
+A directory of export shards (*.json, each shaped like a full export) is scanned in
+a process pool and merged in filename order, which gives the same result as
+concatenating the shards into one export.
+
+Stdlib-only, like generate_cache.py.
+"""
+
+from __future__ import annotations
+
+import concurrent.futures
+import json
+import os
+from pathlib import Path
+from typing import Any, Iterator
+
+EXPORT_ARRAYS = ("posts", "links", "timeline")
+
+_DECODER = json.JSONDecoder()
+_WHITESPACE = " \t\n\r"
+
+
+def post_dedupe_rank(post: dict[str, Any]) -> tuple[int, str]:
+    """Rank duplicate post records by usefulness for website cache generation."""
+    score = 0
+    if post.get("published") is True:
+        score += 1000
+    if post.get("published_date"):
+        score += 100
+    if post.get("title"):
+        score += 10
+    if post.get("excerpt"):
+        score += 10
+    if post.get("body"):
+        score += 10
+    if post.get("summary"):
+        score += 5
+    if post.get("share_tweet"):
+        score += 5
+    recency = post.get("updated_date") or post.get("published_date") or ""
+    return score, str(recency)
+
+
+class _StreamReader:
+    """Minimal pull parser over a text file: JSON values are decoded one at a time."""
+
+    def __init__(self, fh: Any, chunk_size: int) -> None:
+        self.fh = fh
+        self.chunk_size = chunk_size
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self) -> bool:
+        if self.eof:
+            return False
+        # Grow geometrically so a single large value is not re-decoded once per chunk.
+        data = self.fh.read(max(self.chunk_size, len(self.buf) - self.pos))
+        if not data:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos :] + data
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                raise ValueError("Unexpected end of export JSON")
+
+    def take(self, expected: str) -> None:
+        ch = self.peek()
+        if ch not in expected:
+            raise ValueError(f"Expected one of {expected!r} in export JSON, got {ch!r}")
+        self.pos += 1
+
+    def value(self) -> Any:
+        self.peek()
+        while True:
+            try:
+                obj, end = _DECODER.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # A number or literal touching the end of the buffer may continue in the next chunk.
+            if end == len(self.buf) and not self.eof and self._fill():
+                continue
+            self.pos = end
+            return obj
+
+
+def iter_export(path: Path, chunk_size: int = 1 << 16) -> Iterator[tuple[str, Any]]:
+    """Yield (array name, element) for every element of the export's top-level arrays.
+
+    Only one element is held in memory at a time; other top-level keys are skipped.
+    """
+    with path.open("r", encoding="utf-8") as fh:
+        reader = _StreamReader(fh, chunk_size)
+        reader.take("{")
+        if reader.peek() == "}":
+            return
+        while True:
+            key = reader.value()
+            reader.take(":")
+            if key in EXPORT_ARRAYS and reader.peek() == "[":
+                reader.take("[")
+                if reader.peek() == "]":
+                    reader.take("]")
+                else:
+                    while True:
+                        yield key, reader.value()
+                        ch = reader.peek()
+                        reader.take(",]")
+                        if ch == "]":
+                            break
+            else:
+                reader.value()
+            ch = reader.peek()
+            reader.take(",}")
+            if ch == "}":
+                return
+
+
+def scan_export_file(path: Path) -> dict[str, Any]:
+    """Stream one export file, deduping posts on the fly.
+
+    Returns {"posts": {slug: (rank, record)}, "links": [...], "timeline": [...],
+    "post_records": n}; posts keep first-seen slug order.
+    """
+    best: dict[str, tuple[tuple[int, str], dict[str, Any]]] = {}
+    links: list[Any] = []
+    timeline: list[Any] = []
+    post_records = 0
+    for key, item in iter_export(path):
+        if key == "links":
+            links.append(item)
+            continue
+        if key == "timeline":
+            timeline.append(item)
+            continue
+        post_records += 1
+        if not isinstance(item, dict):
+            continue
+        slug = item.get("slug")
+        if not slug:
+            continue
+        rank = post_dedupe_rank(item)
+        existing = best.get(slug)
+        if existing is None or rank >= existing[0]:
+            best[slug] = (rank, item)
+    return {"posts": best, "links": links, "timeline": timeline, "post_records": post_records}
+
+
+def export_shards(path: Path) -> list[Path]:
+    if path.is_dir():
+        return sorted(p for p in path.glob("*.json") if p.is_file())
+    return [path]
+
+
+def load_export(path: Path, workers: int | None = None) -> tuple[list[dict], list[dict], list[dict], int]:
+    """Deduped posts, links, timeline and the raw post record count for a file or shard dir."""
+    shards = export_shards(path)
+    if len(shards) > 1:
+        max_workers = min(len(shards), workers or os.cpu_count() or 1)
+        with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers) as pool:
+            scans = list(pool.map(scan_export_file, shards))
+    else:
+        scans = [scan_export_file(p) for p in shards]
+
+    best: dict[str, tuple[tuple[int, str], dict[str, Any]]] = {}
+    links: list[dict] = []
+    timeline: list[dict] = []
+    post_records = 0
+    for scan in scans:
+        for slug, (rank, record) in scan["posts"].items():
+            existing = best.get(slug)
+            if existing is None or rank >= existing[0]:
+                best[slug] = (rank, record)
+        links.extend(scan["links"])
+        timeline.extend(scan["timeline"])
+        post_records += scan["post_records"]
+    return [record for _, record in best.values()], links, timeline, post_records
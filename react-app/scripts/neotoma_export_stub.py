@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""Local HTTP stand-in for the Neotoma website export endpoint.
+
+Serves an export file (or shard dir, see neotoma_export.py) under the contract
+fetch_neotoma_export.py expects, so the incremental fetch path runs offline:
+
+- ?updated_since=<w> keeps post records whose updated_date (or published_date)
+  is >= w, in export order; ?limit=<n>&cursor=<offset> pages through them.
+- links and timeline are sent in full on the first page.
+- ETag is a hash of the export bytes and Last-Modified its mtime; a matching
+  If-None-Match (or, without one, an If-Modified-Since not older than the file)
+  gets 304 Not Modified.
+- Responses are gzipped when the client accepts it. With --token, requests need
+  "Authorization: Bearer <token>".
+
+The export is re-read when the file changes. Every request is appended to
+server.log as (query, status, bytes sent) for tests. Stdlib-only.
+
+    python3 scripts/neotoma_export_stub.py data/tmp/neotoma_website_export.json --port 8765
+    NEOTOMA_EXPORT_URL=http://127.0.0.1:8765/export python3 scripts/fetch_neotoma_export.py
+"""
+
+from __future__ import annotations
+
+import argparse
+import email.utils
+import gzip
+import hashlib
+import http.server
+import json
+import sys
+import threading
+import urllib.parse
+from pathlib import Path
+from typing import Any
+
+from neotoma_export import export_shards, iter_export
+
+MAX_LIMIT = 1000
+
+
+class _Export:
+    """Export contents, reloaded when any shard's (mtime_ns, size) changes."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._key: tuple[Any, ...] | None = None
+        self.posts: list[Any] = []
+        self.links: list[Any] = []
+        self.timeline: list[Any] = []
+        self.etag = ""
+        self.mtime = 0.0
+
+    def refresh(self) -> None:
+        with self._lock:
+            shards = export_shards(self.path)
+            key = tuple((p.name, p.stat().st_mtime_ns, p.stat().st_size) for p in shards)
+            if key == self._key:
+                return
+            digest = hashlib.sha256()
+            arrays: dict[str, list[Any]] = {"posts": [], "links": [], "timeline": []}
+            for shard in shards:
+                digest.update(shard.read_bytes())
+                for name, item in iter_export(shard):
+                    arrays[name].append(item)
+            self.posts, self.links, self.timeline = arrays["posts"], arrays["links"], arrays["timeline"]
+            self.etag = f'"{digest.hexdigest()[:32]}"'
+            self.mtime = max((p.stat().st_mtime for p in shards), default=0.0)
+            self._key = key
+
+
+def _record_watermark(post: Any) -> str:
+    if not isinstance(post, dict):
+        return ""
+    return str(post.get("updated_date") or post.get("published_date") or "")
+
+
+class ExportHandler(http.server.BaseHTTPRequestHandler):
+    server: "ExportServer"
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002 - BaseHTTPRequestHandler signature
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _send(self, status: int, body: bytes = b"", headers: dict[str, str] | None = None) -> None:
+        # Logged before responding, so a client that has its answer also sees the entry.
+        self.server.log.append((urllib.parse.urlsplit(self.path).query, status, len(body)))
+        self.send_response(status)
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+    def do_GET(self) -> None:  # noqa: N802 - http.server naming
+        if self.server.token and self.headers.get("Authorization") != f"Bearer {self.server.token}":
+            self._send(401)
+            return
+        export = self.server.export
+        export.refresh()
+        validators = {
+            "ETag": export.etag,
+            "Last-Modified": email.utils.formatdate(export.mtime, usegmt=True),
+        }
+        if_none_match = self.headers.get("If-None-Match")
+        if_modified_since = self.headers.get("If-Modified-Since")
+        if if_none_match is not None:
+            if if_none_match == export.etag:
+                self._send(304, headers=validators)
+                return
+        elif if_modified_since:
+            try:
+                since = email.utils.parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                since = None
+            if since is not None and int(export.mtime) <= since:
+                self._send(304, headers=validators)
+                return
+
+        query = dict(urllib.parse.parse_qsl(urllib.parse.urlsplit(self.path).query))
+        try:
+            limit = max(1, min(MAX_LIMIT, int(query.get("limit", MAX_LIMIT))))
+            offset = int(query.get("cursor") or 0)
+        except ValueError:
+            self._send(400)
+            return
+        since = query.get("updated_since")
+        posts = export.posts if not since else [p for p in export.posts if _record_watermark(p) >= since]
+        page: dict[str, Any] = {"posts": posts[offset : offset + limit]}
+        if offset == 0:
+            page["links"] = export.links
+            page["timeline"] = export.timeline
+        page["next_cursor"] = str(offset + limit) if offset + limit < len(posts) else None
+
+        body = json.dumps(page, ensure_ascii=False).encode("utf-8")
+        headers = dict(validators, **{"Content-Type": "application/json"})
+        if "gzip" in (self.headers.get("Accept-Encoding") or ""):
+            body = gzip.compress(body, mtime=0)
+            headers["Content-Encoding"] = "gzip"
+        self._send(200, body, headers)
+
+
+class ExportServer(http.server.ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, export_path: Path, host: str = "127.0.0.1", port: int = 0, token: str | None = None) -> None:
+        super().__init__((host, port), ExportHandler)
+        self.export = _Export(export_path)
+        self.token = token
+        self.verbose = False
+        self.log: list[tuple[str, int, int]] = []
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/export"
+
+
+def main() -> int:
+    p = argparse.ArgumentParser(description="Serve a Neotoma export file as an incremental export endpoint.")
+    p.add_argument("export", type=Path, help="Export JSON file or directory of export shards")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=8765)
+    p.add_argument("--token", default=None, help="Require this bearer token")
+    args = p.parse_args()
+
+    server = ExportServer(args.export.resolve(), args.host, args.port, args.token)
+    server.verbose = True
+    print(f"Serving {args.export} at {server.url} (Ctrl-C to stop)", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
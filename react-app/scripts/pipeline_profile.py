@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""Opt-in stage timers, memory peaks and counters for the website build scripts.
+
+Scripts call start() first thing in main(); profiling is on when the command line
+has --profile (removed from sys.argv before argparse sees it) or PIPELINE_PROFILE
+is set. PIPELINE_PROFILE=memory additionally runs tracemalloc, which slows
+allocation-heavy stages, so timings from such a run are not comparable.
+
+While enabled, stage("name") times a block (repeated stages accumulate) and
+count("name", n) bumps a counter. On exit a JSON report is written to
+data/tmp/profile/<script>-<pid>.json (or $PIPELINE_PROFILE_DIR):
+
+    {"script", "argv", "wall_seconds", "peak_rss_mib", "children_peak_rss_mib",
+     "tracemalloc_peak_mib", "stages": [{"name", "seconds", "calls"}], "counters": {}}
+
+When disabled every call is a cheap no-op. Run this module directly to print one
+summary table for all reports in the directory (--markdown for $GITHUB_STEP_SUMMARY).
+Stdlib-only; counters from process-pool workers are not collected.
+"""
+
+from __future__ import annotations
+
+import argparse
+import atexit
+import contextlib
+import json
+import os
+import resource
+import sys
+import threading
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Iterator
+
+ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_REPORT_DIR = ROOT / "data" / "tmp" / "profile"
+PROFILE_ENV = "PIPELINE_PROFILE"
+PROFILE_DIR_ENV = "PIPELINE_PROFILE_DIR"
+
+
+def _peak_rss_mib() -> float:
+    try:
+        for line in Path("/proc/self/status").read_text().splitlines():
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KiB on Linux, bytes on macOS.
+    return peak / (1 << 20) if sys.platform == "darwin" else peak / 1024
+
+
+class Profile:
+    def __init__(self, script: str, trace_memory: bool) -> None:
+        self.script = script
+        self.argv = sys.argv[1:]
+        self.started = time.perf_counter()
+        self.stages: dict[str, list[float]] = {}
+        self.counters: dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.trace_memory = trace_memory
+        if trace_memory:
+            tracemalloc.start()
+
+    @contextlib.contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds, calls = self.stages.get(name, [0.0, 0])
+            self.stages[name] = [seconds + time.perf_counter() - started, calls + 1]
+
+    def count(self, name: str, n: int = 1) -> None:
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def report(self) -> dict[str, Any]:
+        children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+        return {
+            "script": self.script,
+            "argv": self.argv,
+            "wall_seconds": round(time.perf_counter() - self.started, 4),
+            "peak_rss_mib": round(_peak_rss_mib(), 1),
+            "children_peak_rss_mib": round(children / (1 << 20) if sys.platform == "darwin" else children / 1024, 1),
+            "tracemalloc_peak_mib": (
+                round(tracemalloc.get_traced_memory()[1] / (1 << 20), 1) if self.trace_memory else None
+            ),
+            "stages": [
+                {"name": name, "seconds": round(seconds, 4), "calls": int(calls)}
+                for name, (seconds, calls) in self.stages.items()
+            ],
+            "counters": dict(sorted(self.counters.items())),
+        }
+
+    def write(self) -> Path:
+        out_dir = Path(os.environ.get(PROFILE_DIR_ENV) or DEFAULT_REPORT_DIR)
+        out_dir.mkdir(parents=True, exist_ok=True)
+        path = out_dir / f"{self.script}-{os.getpid()}.json"
+        path.write_text(json.dumps(self.report(), indent=2) + "\n", encoding="utf-8")
+        return path
+
+
+_active: Profile | None = None
+
+
+def start(script: str) -> bool:
+    """Enable profiling for this process if requested; returns whether it is on."""
+    global _active
+    flag = "--profile" in sys.argv[1:]
+    if flag:
+        sys.argv = [sys.argv[0]] + [a for a in sys.argv[1:] if a != "--profile"]
+    mode = os.environ.get(PROFILE_ENV, "").strip().lower()
+    if not flag and mode in ("", "0", "false", "no"):
+        return False
+    if _active is None:
+        _active = Profile(script, trace_memory=mode == "memory")
+        atexit.register(finish)
+    return True
+
+
+def enabled() -> bool:
+    return _active is not None
+
+
+def stage(name: str) -> contextlib.AbstractContextManager[None]:
+    if _active is None:
+        return contextlib.nullcontext()
+    return _active.stage(name)
+
+
+def count(name: str, n: int = 1) -> None:
+    if _active is not None:
+        _active.count(name, n)
+
+
+def finish() -> None:
+    """Write the report (runs at exit; safe to call more than once)."""
+    global _active
+    if _active is None:
+        return
+    profile, _active = _active, None
+    path = profile.write()
+    print(f"Profile report: {path}", file=sys.stderr)
+
+
+def load_reports(report_dir: Path) -> list[dict[str, Any]]:
+    reports: list[dict[str, Any]] = []
+    for path in sorted(report_dir.glob("*.json")):
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except Exception:
+            continue
+        if isinstance(data, dict) and data.get("script"):
+            reports.append(data)
+    return reports
+
+
+def summary_rows(reports: list[dict[str, Any]]) -> list[list[str]]:
+    rows: list[list[str]] = []
+    for r in reports:
+        stages = sorted(r.get("stages") or [], key=lambda s: s.get("seconds", 0), reverse=True)
+        top = ", ".join(f"{s['name']} {s['seconds']:.2f}s" for s in stages[:3])
+        counters = ", ".join(f"{k}={v}" for k, v in (r.get("counters") or {}).items())
+        rss = f"{r.get('peak_rss_mib', 0):.0f}"
+        if r.get("tracemalloc_peak_mib") is not None:
+            rss += f" (heap {r['tracemalloc_peak_mib']:.0f})"
+        rows.append([r["script"], f"{r.get('wall_seconds', 0):.2f}", rss, top, counters])
+    return rows
+
+
+def main() -> int:
+    p = argparse.ArgumentParser(description="Summarize pipeline profile reports.")
+    p.add_argument(
+        "--dir",
+        type=Path,
+        default=Path(os.environ.get(PROFILE_DIR_ENV) or DEFAULT_REPORT_DIR),
+        help=f"Report directory (default: ${PROFILE_DIR_ENV} or {DEFAULT_REPORT_DIR})",
+    )
+    p.add_argument("--markdown", action="store_true", help="Print a GitHub-flavored markdown table")
+    args = p.parse_args()
+
+    reports = load_reports(args.dir)
+    if not reports:
+        print(f"No profile reports in {args.dir}")
+        return 0
+    header = ["script", "wall (s)", "peak RSS (MiB)", "slowest stages", "counters"]
+    rows = summary_rows(reports)
+    total = sum(float(r.get("wall_seconds") or 0) for r in reports)
+    if args.markdown:
+        print("### Pipeline profile\n")
+        print("| " + " | ".join(header) + " |")
+        print("|" + "---|" * len(header))
+        for row in rows:
+            print("| " + " | ".join(row) + " |")
+        print(f"\nTotal: {total:.2f}s across {len(reports)} script run(s).")
+        return 0
+    widths = [max(len(h), *(len(row[i]) for row in rows)) for i, h in enumerate(header[:3])]
+    for row in [header, *rows]:
+        print("  ".join(cell.ljust(widths[i]) if i < 3 else cell for i, cell in enumerate(row)).rstrip())
+    print(f"Total: {total:.2f}s across {len(reports)} script run(s).")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""Split a locale's posts into a slim listing index plus per-post body shards.
+
+Layout under cache/api (copied to public/api on deploy):
+
+- posts/<locale>/index.json   listing fields only, one entry per post
+- posts/<locale>/<slug>.json  the full post record (body, summary, share copy)
+
+Shards are named by canonical slug so a post keeps the same shard path in every
+locale; each index entry carries its shard URL. Shards for posts that are no
+longer in the locale are removed.
+
+Shared by generate_cache.py and rebuild_locale_post_caches.py. Stdlib-only.
+"""
+
+from __future__ import annotations
+
+import re
+from pathlib import Path
+from typing import Any
+
+from artifact_writer import write_json
+
+SITE_BASE = "https://markmhendrickson.com"
+INDEX_NAME = "index.json"
+
+# What listing pages, cards and feeds read; everything else lives in the shard.
+LISTING_FIELDS = (
+    "slug",
+    "canonicalSlug",
+    "locale",
+    "alternativeSlugs",
+    "title",
+    "excerpt",
+    "category",
+    "tags",
+    "published",
+    "publishedDate",
+    "updatedDate",
+    "createdDate",
+    "readTime",
+    "heroImage",
+    "heroImageSquare",
+    "heroImageStyle",
+    "ogImage",
+    "series",
+    "seriesSlug",
+    "seriesPart",
+    "seriesTotal",
+    "relatedSlugs",
+    "excludeFromListing",
+)
+
+_SHARD_NAME = re.compile(r"^[A-Za-z0-9][A-Za-z0-9._-]*$")
+
+
+def shard_slug(post: dict[str, Any]) -> str | None:
+    """Canonical slug used as the shard file name, or None if it is not a safe file name."""
+    for key in ("canonicalSlug", "postId", "slug"):
+        value = post.get(key)
+        if isinstance(value, str) and value:
+            return value if _SHARD_NAME.match(value) and f"{value}.json" != INDEX_NAME else None
+    return None
+
+
+def shard_url(locale: str, slug: str) -> str:
+    return f"{SITE_BASE}/api/posts/{locale}/{slug}.json"
+
+
+def listing_entry(post: dict[str, Any], locale: str, slug: str) -> dict[str, Any]:
+    entry = {key: post[key] for key in LISTING_FIELDS if key in post}
+    entry["url"] = shard_url(locale, slug)
+    return entry
+
+
+def write_locale_shards(api_dir: Path, locale: str, posts: list[dict[str, Any]]) -> int:
+    """Write posts/<locale>/index.json and one shard per post; returns the shard count."""
+    locale_dir = api_dir / "posts" / locale
+    listing: list[dict[str, Any]] = []
+    written: set[str] = set()
+    for post in posts:
+        if not isinstance(post, dict):
+            continue
+        slug = shard_slug(post)
+        if slug is None or slug in written:
+            continue
+        written.add(slug)
+        listing.append(listing_entry(post, locale, slug))
+        write_json(locale_dir / f"{slug}.json", {"url": shard_url(locale, slug), "post": post})
+    write_json(
+        locale_dir / INDEX_NAME,
+        {"url": f"{SITE_BASE}/api/posts/{locale}/{INDEX_NAME}", "locale": locale, "posts": listing},
+    )
+    for stale in locale_dir.glob("*.json"):
+        if stale.name != INDEX_NAME and stale.stem not in written:
+            stale.unlink()
+    return len(written)
+
+
+def has_locale_index(api_dir: Path, locale: str) -> bool:
+    return (api_dir / "posts" / locale / INDEX_NAME).exists()
@@ -4,21 +4,65 @@
 Used in CI when Neotoma cache regen is skipped: auto-translate updates
 src/content/posts/translations.*.json; this script materializes them into
 cache files so validate_post_translations.py passes.
+
+API consumers get cache/api/posts/<locale>/index.json (listing fields) plus one
+body shard per post (see post_shards.py) and the search index
+cache/api/search.<locale>.json (see search_index.py). The monolithic
+api/posts.<locale>.json is only written with --monolithic-api.
+
+Rebuilds are incremental: data/tmp/locale_rebuild_manifest.json records, per
+(slug, locale), a fingerprint of the English record, the translation override
+entry and the glossary version. Only entries whose fingerprint changed are
+rebuilt and spliced into the previous cache; relatedSlugs and the API outputs
+are regenerated only for locales with a change. --full ignores the manifest and
+--verify also does a full rebuild and fails if the two differ.
+
+Locales are built in a process pool (--jobs, default CPU count) with the English
+base handed to each worker once; --jobs 1 builds them serially. Both paths write
+identical files.
 """
 
 from __future__ import annotations
 
+import argparse
+import concurrent.futures
+import functools
+import hashlib
+import itertools
 import json
+import os
 import re
+from dataclasses import dataclass
 from pathlib import Path
 
-ROOT = Path(__file__).resolve().parents[1]
+import pipeline_profile
+from artifact_writer import cache_lock, write_json, write_json_pair
+from content_store import ContentStore, open_store
+from post_shards import has_locale_index, write_locale_shards
+from related_posts import add_related_slugs
+from search_index import posts_tokens, search_index_path, write_search_index
+from translation_glossary import GLOSSARY_PATH, Glossary, load_glossary
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+ROOT = SCRIPT_DIR.parent
 CACHE_DIR = ROOT / "cache"
 CACHE_API_DIR = CACHE_DIR / "api"
 WEBSITE_POSTS_DIR = ROOT / "src" / "content" / "posts"
 EN_CACHE = CACHE_DIR / "posts.en.json"
 SITE_BASE = "https://markmhendrickson.com"
 
+# Per-(slug, locale) fingerprints of the previous run (incremental rebuilds).
+REBUILD_MANIFEST_JSON = ROOT / "data" / "tmp" / "locale_rebuild_manifest.json"
+REBUILD_MANIFEST_VERSION = 1
+CODE_DEPENDENCIES = (
+    "rebuild_locale_post_caches.py",
+    "translation_glossary.py",
+    "related_posts.py",
+    "search_index.py",
+    "post_shards.py",
+    "artifact_writer.py",
+)
+
 SUPPORTED_LOCALES = (
     "en",
     "es",
@@ -35,22 +79,15 @@ SUPPORTED_LOCALES = (
     "de",
 )
 
-GLOSSARY_PATH = WEBSITE_POSTS_DIR / "translation_glossary.json"
-
 
-def write_json(path: Path, payload: list | dict) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    path.write_text(json.dumps(payload, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
-
-
-def _load_glossary() -> dict:
-    if not GLOSSARY_PATH.exists():
-        return {}
+# Once per run, so a broken glossary warns once rather than per post field.
+@functools.lru_cache(maxsize=None)
+def _load_glossary() -> Glossary:
     try:
-        return json.loads(GLOSSARY_PATH.read_text(encoding="utf-8"))
-    except Exception as exc:
-        print(f"WARNING: Failed to load glossary {GLOSSARY_PATH}: {exc}")
-        return {}
+        return load_glossary(GLOSSARY_PATH)
+    except ValueError as exc:
+        print(f"WARNING: {exc}")
+        return Glossary()
 
 
 def fix_translation_markdown(text: str) -> str:
@@ -60,50 +97,20 @@ def fix_translation_markdown(text: str) -> str:
 
 
 def apply_glossary_heading_corrections(text: str, locale: str) -> str:
-    if locale == "en" or not text or not isinstance(text, str):
-        return text
-    glossary = _load_glossary()
-    forbidden = glossary.get("forbidden_senses", {})
-    overrides = glossary.get("heading_overrides", {})
-    if not forbidden or not overrides:
+    if not text or not isinstance(text, str):
         return text
+    return _load_glossary().correct_headings(text, locale)
 
-    lines = text.split("\n")
-    out: list[str] = []
-    for line in lines:
-        stripped = line.lstrip()
-        if not stripped.startswith("#"):
-            out.append(line)
-            continue
-        fixed = line
-        for en_term, locale_map in forbidden.items():
-            if not isinstance(locale_map, dict) or locale not in locale_map:
-                continue
-            repl_map = overrides.get(en_term)
-            if not isinstance(repl_map, dict) or locale not in repl_map:
-                continue
-            replacement = repl_map[locale]
-            for bad in sorted(locale_map[locale], key=len, reverse=True):
-                pattern = re.compile(r"\b" + re.escape(bad) + r"\b", re.IGNORECASE)
-                fixed = pattern.sub(replacement, fixed)
-        out.append(fixed)
-    return "\n".join(out)
-
-
-def load_locale_overrides(locale: str) -> dict[str, dict]:
-    path = WEBSITE_POSTS_DIR / f"translations.{locale}.json"
-    if not path.exists():
-        return {}
+
+def load_locale_overrides(store: ContentStore, locale: str) -> dict[str, dict]:
     try:
-        data = json.loads(path.read_text(encoding="utf-8"))
-        return data if isinstance(data, dict) else {}
-    except Exception as e:
-        print(f"WARNING: Failed to parse {path}: {e}")
+        return store.overrides(locale)
+    except ValueError as e:
+        print(f"WARNING: {e}")
         return {}
 
 
-def build_locale_posts(base_posts: list[dict], locale: str) -> list[dict]:
-    overrides = load_locale_overrides(locale)
+def build_locale_posts(base_posts: list[dict], locale: str, overrides: dict[str, dict]) -> list[dict]:
     localized: list[dict] = []
     for post in base_posts:
         slug = post.get("slug", "")
@@ -153,23 +160,283 @@ def build_locale_posts(base_posts: list[dict], locale: str) -> list[dict]:
     return localized
 
 
+def _digest(value: object) -> str:
+    raw = json.dumps(value, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _file_digest(path: Path) -> str | None:
+    try:
+        return hashlib.sha256(path.read_bytes()).hexdigest()
+    except OSError:
+        return None
+
+
+def _code_digest() -> str:
+    """Scripts that shape a locale cache; editing any of them invalidates the manifest."""
+    digest = hashlib.sha256()
+    for name in CODE_DEPENDENCIES:
+        digest.update((SCRIPT_DIR / name).read_bytes())
+    return digest.hexdigest()
+
+
+def entry_fingerprint(en_digest: str, override: object, glossary_digest: str) -> str:
+    """Fingerprint of one (slug, locale) entry: English record, override entry, glossary version."""
+    return _digest([en_digest, override, glossary_digest])
+
+
+def load_rebuild_manifest() -> dict[str, dict]:
+    """Per-locale entries of the previous run, or {} when missing/stale (different code or format)."""
+    try:
+        data = json.loads(REBUILD_MANIFEST_JSON.read_text(encoding="utf-8"))
+    except Exception:
+        return {}
+    if not isinstance(data, dict):
+        return {}
+    if data.get("version") != REBUILD_MANIFEST_VERSION or data.get("code") != _code_digest():
+        return {}
+    locales = data.get("locales")
+    return locales if isinstance(locales, dict) else {}
+
+
+@dataclass
+class LocaleJob:
+    locale: str
+    overrides: dict[str, dict]
+    monolithic_api: bool
+    verify: bool = False
+    # Previous cache/posts.<locale>.json and its manifest fingerprints, when still trustworthy.
+    previous_posts: list[dict] | None = None
+    previous_entries: dict[str, str] | None = None
+
+
+@dataclass
+class LocaleBuild:
+    posts: list[dict]
+    written: bool
+    targets: str
+    shards: int | None
+    entries: dict[str, str]
+    output: str | None
+    rebuilt: int
+    reused: int
+    mismatches: list[str]
+
+
+# English base of a worker process, set once by _init_worker instead of per task.
+_EN_POSTS: list[dict] = []
+_EN_DIGESTS: list[str] = []
+_GLOSSARY_DIGEST = ""
+
+
+def _init_worker(en_posts: list[dict], en_digests: list[str], glossary_digest: str) -> None:
+    global _EN_POSTS, _EN_DIGESTS, _GLOSSARY_DIGEST
+    _EN_POSTS, _EN_DIGESTS, _GLOSSARY_DIGEST = en_posts, en_digests, glossary_digest
+
+
+def _splice_locale_posts(job: LocaleJob) -> tuple[list[dict], dict[str, str], int]:
+    """Localized posts in English order, rebuilding only entries whose fingerprint changed."""
+    previous = {p.get("canonicalSlug"): p for p in job.previous_posts or [] if isinstance(p, dict)}
+    localized: list[dict] = []
+    entries: dict[str, str] = {}
+    rebuilt = 0
+    for post, en_digest in zip(_EN_POSTS, _EN_DIGESTS):
+        slug = post.get("slug", "")
+        fingerprint = entries[slug] = entry_fingerprint(en_digest, job.overrides.get(slug, {}), _GLOSSARY_DIGEST)
+        old = previous.get(slug)
+        if old is not None and (job.previous_entries or {}).get(slug) == fingerprint:
+            localized.append(old)
+        else:
+            localized.extend(build_locale_posts([post], job.locale, job.overrides))
+            rebuilt += 1
+    return localized, entries, rebuilt
+
+
+def _outputs_exist(job: LocaleJob) -> bool:
+    return (
+        has_locale_index(CACHE_API_DIR, job.locale)
+        and search_index_path(CACHE_API_DIR, job.locale).exists()
+        and (not job.monolithic_api or (CACHE_API_DIR / f"posts.{job.locale}.json").exists())
+    )
+
+
+def build_locale_cache(job: LocaleJob) -> LocaleBuild:
+    """Build and write one locale's cache, shards and search index."""
+    locale = job.locale
+    out_path = CACHE_DIR / f"posts.{locale}.json"
+    api_path = CACHE_API_DIR / f"posts.{locale}.json"
+    with pipeline_profile.stage("build_locale_posts"):
+        localized, entries, rebuilt = _splice_locale_posts(job)
+        # relatedSlugs depend on every post of the locale, so any change recomputes them all.
+        unchanged = (
+            rebuilt == 0
+            and job.previous_posts is not None
+            and [p.get("canonicalSlug") for p in job.previous_posts] == list(entries)
+            and _outputs_exist(job)
+        )
+        tokens = None
+        if not unchanged:
+            # Tokenized once for both related posts and the search index.
+            tokens = posts_tokens(localized)
+            add_related_slugs(localized, tokens=tokens)
+
+    mismatches: list[str] = []
+    if job.verify:
+        with pipeline_profile.stage("verify_locale_posts"):
+            full = build_locale_posts(_EN_POSTS, locale, job.overrides)
+            add_related_slugs(full)
+        if full != localized:
+            mismatches = [
+                str(b.get("canonicalSlug") or a.get("canonicalSlug"))
+                for a, b in itertools.zip_longest(full, localized, fillvalue={})
+                if a != b
+            ]
+            # Ship the full build; the caller reports the mismatch and fails.
+            localized, unchanged, tokens = full, False, None
+
+    written = False
+    shards: int | None = None
+    targets = f"{out_path.name}, api/{out_path.name}" if job.monolithic_api else out_path.name
+    if not unchanged:
+        with pipeline_profile.stage("write_locale_caches"):
+            if job.monolithic_api:
+                written = any(
+                    write_json_pair(
+                        out_path, api_path, localized, {"url": f"{SITE_BASE}/api/posts.{locale}.json"}, "posts"
+                    )
+                )
+            else:
+                written = write_json(out_path, localized)
+            shards = write_locale_shards(CACHE_API_DIR, locale, localized)
+            write_search_index(CACHE_API_DIR, locale, localized, tokens)
+    return LocaleBuild(
+        posts=localized,
+        written=written,
+        targets=targets,
+        shards=shards,
+        entries=entries,
+        output=_file_digest(out_path),
+        rebuilt=rebuilt,
+        reused=len(entries) - rebuilt,
+        mismatches=mismatches,
+    )
+
+
 def main() -> None:
-    if not EN_CACHE.exists():
-        raise SystemExit(f"Missing {EN_CACHE}; cannot rebuild locale caches.")
-    en_posts = json.loads(EN_CACHE.read_text(encoding="utf-8"))
-    if not isinstance(en_posts, list):
-        raise SystemExit(f"Expected list in {EN_CACHE}")
-
-    for locale in SUPPORTED_LOCALES:
-        out_path = CACHE_DIR / f"posts.{locale}.json"
-        api_path = CACHE_API_DIR / f"posts.{locale}.json"
-        localized = build_locale_posts(en_posts, locale)
-        write_json(out_path, localized)
+    pipeline_profile.start("rebuild_locale_post_caches")
+    p = argparse.ArgumentParser(description="Rebuild locale post caches from posts.en.json and translations.")
+    p.add_argument(
+        "--monolithic-api",
+        action="store_true",
+        help="Also write the full cache/api/posts.<locale>.json files (compatibility output)",
+    )
+    p.add_argument(
+        "--jobs",
+        type=int,
+        default=None,
+        help="Locales built in parallel processes (default: CPU count; 1 = serial)",
+    )
+    p.add_argument(
+        "--full",
+        action="store_true",
+        help=f"Ignore the rebuild manifest ({REBUILD_MANIFEST_JSON.name}) and rebuild every entry",
+    )
+    p.add_argument(
+        "--verify",
+        action="store_true",
+        help="Also do a full rebuild of each locale and fail if it differs from the incremental output",
+    )
+    args = p.parse_args()
+
+    with cache_lock(CACHE_DIR), open_store(sync=False) as store:
+        manifest = {} if args.full else load_rebuild_manifest()
+        # Only splice into a cache this script wrote; anything else rewrote it since.
+        reusable = {
+            loc
+            for loc in SUPPORTED_LOCALES
+            if isinstance(manifest.get(loc), dict)
+            and manifest[loc].get("output") == _file_digest(CACHE_DIR / f"posts.{loc}.json")
+        }
+        # The other locale caches are rebuilt in full and put back below, so they are not imported first.
+        store.sync(
+            only=[
+                EN_CACHE,
+                *(CACHE_DIR / f"posts.{loc}.json" for loc in sorted(reusable) if loc != "en"),
+                *(WEBSITE_POSTS_DIR / f"translations.{loc}.json" for loc in SUPPORTED_LOCALES),
+            ]
+        )
+        try:
+            en_posts = store.posts("en")
+        except ValueError:
+            raise SystemExit(f"Expected list in {EN_CACHE}")
+        if en_posts is None:
+            raise SystemExit(f"Missing {EN_CACHE}; cannot rebuild locale caches.")
+        en_digests = [_digest(post) for post in en_posts]
+        glossary_digest = _file_digest(GLOSSARY_PATH) or ""
+
+        jobs: list[LocaleJob] = []
+        for locale in SUPPORTED_LOCALES:
+            job = LocaleJob(locale, load_locale_overrides(store, locale), args.monolithic_api, args.verify)
+            if locale in reusable:
+                try:
+                    job.previous_posts = store.posts(locale)
+                except ValueError:
+                    job.previous_posts = None
+                if job.previous_posts is not None:
+                    job.previous_entries = dict(manifest[locale].get("entries") or {})
+            jobs.append(job)
+
+        # Locales are independent; results are consumed in SUPPORTED_LOCALES order either way,
+        # so output and log lines match the serial path.
+        max_workers = min(len(jobs), args.jobs or os.cpu_count() or 1)
+        init_args = (en_posts, en_digests, glossary_digest)
+        with pipeline_profile.stage("build_locales"):
+            if max_workers > 1:
+                with concurrent.futures.ProcessPoolExecutor(
+                    max_workers=max_workers, initializer=_init_worker, initargs=init_args
+                ) as pool:
+                    results = list(pool.map(build_locale_cache, jobs))
+            else:
+                _init_worker(*init_args)
+                results = [build_locale_cache(job) for job in jobs]
+
+        mismatched: list[str] = []
+        for job, result in zip(jobs, results):
+            locale = job.locale
+            pipeline_profile.count("posts_localized", len(result.posts))
+            pipeline_profile.count("entries_rebuilt", result.rebuilt)
+            pipeline_profile.count("entries_reused", result.reused)
+            if result.shards is not None:
+                store.put_posts(locale, CACHE_DIR / f"posts.{locale}.json", result.posts)
+            status = "Wrote" if result.written else "Unchanged"
+            shards = f"{result.shards} shards" if result.shards is not None else "outputs reused"
+            print(
+                f"{status} {result.targets}, api/posts/{locale}/ and api/search.{locale}.json "
+                f"({len(result.posts)} posts, {shards}; {result.rebuilt} rebuilt, {result.reused} reused)"
+            )
+            if result.mismatches:
+                mismatched.append(f"{locale}: {', '.join(result.mismatches[:10])}")
+
+        total_rebuilt = sum(r.rebuilt for r in results)
+        print(f"Locale entries: {total_rebuilt} rebuilt, {sum(r.reused for r in results)} reused")
         write_json(
-            api_path,
-            {"url": f"{SITE_BASE}/api/posts.{locale}.json", "posts": localized},
+            REBUILD_MANIFEST_JSON,
+            {
+                "version": REBUILD_MANIFEST_VERSION,
+                "code": _code_digest(),
+                "locales": {
+                    job.locale: {"output": result.output, "entries": result.entries}
+                    for job, result in zip(jobs, results)
+                },
+            },
         )
-        print(f"Wrote {out_path.name} and api/{out_path.name} ({len(localized)} posts)")
+    if mismatched:
+        print("Incremental rebuild differs from a full rebuild (full output written):")
+        for line in mismatched:
+            print(f"- {line}")
+        raise SystemExit(1)
+    if args.verify:
+        print("Verified: incremental output matches a full rebuild.")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""Precompute "related posts" for a locale's published posts (relatedSlugs).
+
+Each published post becomes a TF-IDF vector over the tokens of its title, tags,
+excerpt/summary and the start of its body (search_index.post_tokens, so zh / hi /
+bn / ar / ur get script-aware tokens and callers that also build the search index
+tokenize each post once), with sublinear tf and L2 normalization.
+Cosine neighbours for all posts come from one pass over an inverted index, i.e.
+a sparse X @ X.T accumulated per shared term, and the top RELATED_K per post are
+written to post["relatedSlugs"] as slugs of the same locale.
+
+To keep that pass sub-quadratic, terms found in more than MAX_DF of the posts
+carry no signal and are dropped, each vector keeps only its MAX_TERMS heaviest
+terms, and each term's postings keep only the MAX_POSTINGS posts that weigh it
+most (impact-ordered pruning). A post then scores at most MAX_TERMS *
+MAX_POSTINGS candidates, so the pass is linear in the number of posts instead of
+n^2 pairs. Body tokens are capped at BODY_TOKENS for the same reason.
+
+Posts marked excludeFromListing get neighbours but are never suggested.
+Shared by generate_cache.py and rebuild_locale_post_caches.py. Stdlib-only.
+"""
+
+from __future__ import annotations
+
+import heapq
+import math
+from collections import Counter
+from typing import Any
+
+import pipeline_profile
+from search_index import posts_tokens
+
+RELATED_K = 4
+MAX_DF = 0.5
+MAX_TERMS = 32
+MAX_POSTINGS = 64
+BODY_TOKENS = 600
+# Title and tags say more about a post's topic than any one body paragraph.
+FIELD_BOOST = {"title": 3.0, "tags": 3.0, "excerpt": 2.0, "summary": 1.5, "body": 1.0}
+
+
+def _term_counts(fields: dict[str, list[str]]) -> dict[str, float]:
+    counts: dict[str, float] = {}
+    for field, boost in FIELD_BOOST.items():
+        tokens = fields.get(field, [])
+        if field == "body":
+            tokens = tokens[:BODY_TOKENS]
+        for token, tf in Counter(tokens).items():
+            if len(token) > 1:
+                counts[token] = counts.get(token, 0.0) + tf * boost
+    return counts
+
+
+def _vectors(docs: list[dict[str, float]]) -> list[dict[str, float]]:
+    """TF-IDF weights (sublinear tf), pruned to MAX_TERMS and L2-normalized."""
+    n = len(docs)
+    df: dict[str, int] = {}
+    for counts in docs:
+        for term in counts:
+            df[term] = df.get(term, 0) + 1
+    max_df = max(2, int(n * MAX_DF))
+    vectors: list[dict[str, float]] = []
+    for counts in docs:
+        weights = {
+            term: (1.0 + math.log(tf)) * math.log((1 + n) / (1 + df[term]))
+            for term, tf in counts.items()
+            if 1 < df[term] <= max_df
+        }
+        top = heapq.nlargest(MAX_TERMS, weights.items(), key=lambda kv: kv[1])
+        norm = math.sqrt(sum(w * w for _, w in top)) or 1.0
+        vectors.append({term: w / norm for term, w in top})
+    return vectors
+
+
+def related_slugs(
+    posts: list[dict[str, Any]], k: int = RELATED_K, tokens: list[dict[str, list[str]]] | None = None
+) -> dict[str, list[str]]:
+    """{slug: up to k most similar published slugs} for the published posts in posts.
+
+    tokens: search_index.posts_tokens(posts), if the caller already has it.
+    """
+    if tokens is None:
+        tokens = posts_tokens(posts)
+    indexed = [
+        (p, fields)
+        for p, fields in zip(posts, tokens)
+        if isinstance(p, dict) and p.get("published") and isinstance(p.get("slug"), str)
+    ]
+    candidates = [p for p, _ in indexed]
+    slugs = [p["slug"] for p in candidates]
+    vectors = _vectors([_term_counts(fields) for _, fields in indexed])
+    suggestible = [not p.get("excludeFromListing") for p in candidates]
+
+    postings: dict[str, list[tuple[int, float]]] = {}
+    for doc, vector in enumerate(vectors):
+        for term, w in vector.items():
+            postings.setdefault(term, []).append((doc, w))
+    for term, plist in postings.items():
+        if len(plist) > MAX_POSTINGS:
+            postings[term] = heapq.nlargest(MAX_POSTINGS, plist, key=lambda dw: (dw[1], -dw[0]))
+
+    out: dict[str, list[str]] = {}
+    for doc, vector in enumerate(vectors):
+        scores: dict[int, float] = {}
+        for term, w in vector.items():
+            for other, ow in postings[term]:
+                if other != doc and suggestible[other]:
+                    scores[other] = scores.get(other, 0.0) + w * ow
+        # Ties broken by slug so reruns are byte-identical.
+        best = heapq.nsmallest(k, scores.items(), key=lambda kv: (-kv[1], slugs[kv[0]]))
+        out[slugs[doc]] = [slugs[other] for other, _ in best]
+    pipeline_profile.count("related_posts", len(out))
+    return out
+
+
+def add_related_slugs(
+    posts: list[dict[str, Any]], k: int = RELATED_K, tokens: list[dict[str, list[str]]] | None = None
+) -> None:
+    """Set post["relatedSlugs"] on published posts (removed where there are no neighbours)."""
+    with pipeline_profile.stage("related_posts"):
+        related = related_slugs(posts, k, tokens)
+    for post in posts:
+        if not isinstance(post, dict):
+            continue
+        neighbours = related.get(post.get("slug")) if post.get("published") else None
+        if neighbours:
+            post["relatedSlugs"] = neighbours
+        else:
+            post.pop("relatedSlugs", None)
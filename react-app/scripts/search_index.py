@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""Precomputed per-locale full-text search index (cache/api/search.<locale>.json).
+
+src/lib/postSearch.ts tokenizes every field of every post on each query, so the
+client needs full bodies loaded. This builds the same information once per locale
+at cache time as a compact inverted index:
+
+    {
+      "url", "locale", "version",
+      "fields": [{"name": "title", "weight": 140}, ...],   # FIELD_WEIGHTS order
+      "docs": ["<slug>", ...],                             # doc id = position
+      "terms": ["<token>", ...],                           # sorted by code point
+      "postings": [[doc, field, tf, doc, field, tf, ...], ...],  # parallel to terms
+      "prefixes": {"<first char>": [start, end], ...}      # terms[start:end]
+    }
+
+Because terms are sorted, every prefix is a contiguous slice; "prefixes" maps each
+first character to its slice, so the client's prefix match (query >= 4 chars) is a
+binary search inside one bucket and its typo match only compares terms that share
+the query's first character. tf is the token count in that field, capped at MAX_TF.
+
+Tokenization follows postSearch.normalizeText (NFKD, Latin combining accents
+dropped, lowercase, "_"/"-" as separators) and is script-aware where a plain
+letters-and-digits split is not:
+
+- Devanagari / Bengali (hi, bn): vowel signs and virama are combining marks and
+  stay inside the word instead of splitting it into consonant fragments.
+- Arabic script (ar, ur): harakat and tatweel are removed, alef variants folded.
+- Han / kana (zh): no spaces between words, so each run is indexed as overlapping
+  character bigrams (a single character stays a unigram).
+
+Only published posts are indexed (the search pool in Posts.tsx). Shared by
+generate_cache.py and rebuild_locale_post_caches.py. Stdlib-only.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+import unicodedata
+from collections import Counter
+from pathlib import Path
+from typing import Any, Iterable
+
+import pipeline_profile
+from artifact_writer import write_text
+
+SITE_BASE = "https://markmhendrickson.com"
+INDEX_VERSION = 1
+MAX_TF = 99
+
+# Mirrors FIELD_WEIGHTS in src/lib/postSearch.ts.
+FIELD_WEIGHTS: dict[str, int] = {
+    "title": 140,
+    "slug": 110,
+    "canonicalSlug": 110,
+    "postId": 100,
+    "tags": 95,
+    "series": 85,
+    "seriesSlug": 80,
+    "category": 65,
+    "excerpt": 55,
+    "summary": 50,
+    "shareTweet": 40,
+    "linkedTweetUrl": 30,
+    "body": 18,
+}
+FIELDS = tuple(FIELD_WEIGHTS)
+
+_LATIN_ACCENTS = re.compile("[\u0300-\u036f]")
+_ARABIC_MARKS = re.compile("[\u0610-\u061a\u064b-\u065f\u0670\u06d6-\u06ed\u0640]")
+# A regex sub, not str.translate: with nothing to replace it is a plain scan, and most text is not Arabic.
+_ALEF_VARIANTS = re.compile("[\u0622\u0623\u0625\u0671]")
+_URL = re.compile(r"https?://\S+")
+# Letters/digits plus Devanagari and Bengali combining marks; tokenize() turns "_" into a separator first.
+_WORD = re.compile(r"[\w\u0900-\u0903\u093a-\u094f\u0951-\u0957\u0962\u0963\u0981-\u0983\u09bc-\u09d7\u09e2\u09e3]+")
+_CJK = re.compile("[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff]+")
+
+
+def normalize_text(value: str) -> str:
+    text = unicodedata.normalize("NFKD", value)
+    text = _LATIN_ACCENTS.sub("", text).lower()
+    text = _ALEF_VARIANTS.sub("\u0627", _ARABIC_MARKS.sub("", text))
+    # NFKD splits Indic nukta forms; recompose so index and query agree on code points.
+    return unicodedata.normalize("NFC", text)
+
+
+def tokenize(value: str) -> list[str]:
+    """Script-aware tokens for one field value (query text uses the same function)."""
+    text = normalize_text(value).replace("_", " ")
+    if not _CJK.search(text):
+        return _WORD.findall(text)
+    tokens: list[str] = []
+    for word in _WORD.findall(text):
+        if not _CJK.search(word):
+            tokens.append(word)
+            continue
+        pos = 0
+        for run in _CJK.finditer(word):
+            if run.start() > pos:
+                tokens.append(word[pos : run.start()])
+            chars = run.group()
+            if len(chars) == 1:
+                tokens.append(chars)
+            else:
+                tokens.extend(chars[i : i + 2] for i in range(len(chars) - 1))
+            pos = run.end()
+        if pos < len(word):
+            tokens.append(word[pos:])
+    return tokens
+
+
+def _field_texts(value: Any) -> Iterable[str]:
+    """Flatten a field value the way postSearch.collectSearchFields does."""
+    if value is None:
+        return
+    if isinstance(value, (str, int, float, bool)):
+        yield str(value)
+    elif isinstance(value, list):
+        for item in value:
+            yield from _field_texts(item)
+    elif isinstance(value, dict):
+        for item in value.values():
+            yield from _field_texts(item)
+
+
+def post_tokens(post: dict[str, Any]) -> dict[str, list[str]]:
+    """{field: tokens} for the FIELDS of one post (body without URLs); fields without tokens are left out."""
+    out: dict[str, list[str]] = {}
+    for key in FIELDS:
+        tokens: list[str] = []
+        for text in _field_texts(post.get(key)):
+            if key == "body":
+                text = _URL.sub(" ", text)
+            tokens.extend(tokenize(text))
+        if tokens:
+            out[key] = tokens
+    return out
+
+
+def posts_tokens(posts: list[dict[str, Any]]) -> list[dict[str, list[str]]]:
+    """post_tokens for each published post, {} for the rest; parallel to posts.
+
+    Tokenizing is most of the cost of the search index and related posts, so callers
+    that build both tokenize once and pass the result to each.
+    """
+    return [post_tokens(p) if isinstance(p, dict) and p.get("published") else {} for p in posts]
+
+
+def build_search_index(
+    locale: str, posts: list[dict[str, Any]], tokens: list[dict[str, list[str]]] | None = None
+) -> dict[str, Any]:
+    if tokens is None:
+        tokens = posts_tokens(posts)
+    docs: list[str] = []
+    # Docs and fields are visited in order, so each term's postings come out sorted.
+    postings_by_term: dict[str, list[int]] = {}
+    for post, fields in zip(posts, tokens):
+        if not isinstance(post, dict) or not post.get("published"):
+            continue
+        slug = post.get("slug")
+        if not isinstance(slug, str) or not slug:
+            continue
+        doc = len(docs)
+        docs.append(slug)
+        for field, key in enumerate(FIELDS):
+            if key not in fields:
+                continue
+            for token, tf in Counter(fields[key]).items():
+                flat = postings_by_term.get(token)
+                if flat is None:
+                    flat = postings_by_term[token] = []
+                flat.extend((doc, field, tf if tf < MAX_TF else MAX_TF))
+
+    terms = sorted(postings_by_term)
+    postings: list[list[int]] = []
+    prefixes: dict[str, list[int]] = {}
+    for i, term in enumerate(terms):
+        postings.append(postings_by_term[term])
+        bucket = prefixes.setdefault(term[0], [i, i])
+        bucket[1] = i + 1
+    pipeline_profile.count("search_terms", len(terms))
+    return {
+        "url": f"{SITE_BASE}/api/search.{locale}.json",
+        "locale": locale,
+        "version": INDEX_VERSION,
+        "fields": [{"name": key, "weight": FIELD_WEIGHTS[key]} for key in FIELDS],
+        "docs": docs,
+        "terms": terms,
+        "postings": postings,
+        "prefixes": prefixes,
+    }
+
+
+def search_index_path(api_dir: Path, locale: str) -> Path:
+    return api_dir / f"search.{locale}.json"
+
+
+def write_search_index(
+    api_dir: Path, locale: str, posts: list[dict[str, Any]], tokens: list[dict[str, list[str]]] | None = None
+) -> bool:
+    """Build and write search.<locale>.json; returns True if the file changed.
+
+    Written compact (one line): the postings arrays would be mostly indentation at indent=2.
+    tokens: posts_tokens(posts), if the caller already has it.
+    """
+    with pipeline_profile.stage("search_index"):
+        index = build_search_index(locale, posts, tokens)
+        text = json.dumps(index, ensure_ascii=False, separators=(",", ":")) + "\n"
+        return write_text(search_index_path(api_dir, locale), text)
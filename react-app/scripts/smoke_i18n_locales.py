@@ -1,17 +1,18 @@
 #!/usr/bin/env python3
-"""Basic smoke checks for multi-locale website artifacts."""
+"""Basic smoke checks for multi-locale website artifacts (read via content_store.py)."""
 
 from __future__ import annotations
 
-import json
-import re
 import sys
 from pathlib import Path
 
+import pipeline_profile
+from content_store import ContentStore, open_store
+from translation_glossary import Glossary
+
 
 ROOT = Path(__file__).resolve().parents[1]
 CACHE_DIR = ROOT / "cache"
-GLOSSARY_PATH = ROOT / "src" / "content" / "posts" / "translation_glossary.json"
 SUPPORTED_LOCALES = (
     "en",
     "es",
@@ -39,23 +40,29 @@ STATIC_ROUTE_SUFFIXES = (
 )
 
 
-def _read_json(path: Path):
-    return json.loads(path.read_text(encoding="utf-8"))
+def main() -> int:
+    pipeline_profile.start("smoke_i18n_locales")
+    with open_store() as store:
+        return _smoke(store)
 
 
-def main() -> int:
+def _smoke(store: ContentStore) -> int:
     failures: list[str] = []
+    caches: dict[str, list[dict]] = {}
 
     for locale in SUPPORTED_LOCALES:
         path = CACHE_DIR / f"posts.{locale}.json"
-        if not path.exists():
-            failures.append(f"Missing locale cache: {path}")
+        try:
+            with pipeline_profile.stage("load_locale_caches"):
+                data = store.posts(locale)
+        except ValueError as exc:
+            failures.append(f"Invalid locale cache: {exc}")
             continue
-        data = _read_json(path)
-        if not isinstance(data, list):
-            failures.append(f"Invalid locale cache (expected list): {path}")
+        if data is None:
+            failures.append(f"Missing locale cache: {path}")
             continue
-        published = [p for p in data if isinstance(p, dict) and p.get("published") is not False]
+        caches[locale] = data
+        published = [p for p in data if p.get("published") is not False]
         if not published:
             failures.append(f"No published posts in locale cache: {path}")
 
@@ -66,50 +73,24 @@ def main() -> int:
                 failures.append(f"Invalid route format: {route}")
 
     # Glossary forbidden-sense check on locale caches
-    glossary = {}
-    if GLOSSARY_PATH.exists():
-        try:
-            glossary = json.loads(GLOSSARY_PATH.read_text(encoding="utf-8"))
-        except Exception:
-            pass
-    forbidden = glossary.get("forbidden_senses", {})
-    for locale in SUPPORTED_LOCALES:
-        if locale == "en" or locale not in {
-            loc for terms in forbidden.values() for loc in terms if loc != "_comment"
-        }:
-            continue
-        path = CACHE_DIR / f"posts.{locale}.json"
-        if not path.exists():
-            continue
-        try:
-            posts = _read_json(path)
-        except Exception:
-            continue
-        if not isinstance(posts, list):
-            continue
-        for post in posts:
-            slug = post.get("canonicalSlug") or post.get("slug") or "?"
-            for field in ("title", "body"):
-                text = post.get(field) or ""
-                if not text:
-                    continue
-                heading_lines = [
-                    ln for ln in text.split("\n") if ln.lstrip().startswith("#")
-                ]
-                for hl in heading_lines:
-                    for en_term, locale_map in forbidden.items():
-                        if not isinstance(locale_map, dict) or locale not in locale_map:
-                            continue
-                        for bad in locale_map[locale]:
-                            pattern = re.compile(
-                                r"\b" + re.escape(bad) + r"\b", re.IGNORECASE
-                            )
-                            if pattern.search(hl):
-                                failures.append(
-                                    f"[{locale}] Forbidden sense '{bad}' for "
-                                    f"'{en_term}' in {slug}/{field}: "
-                                    f"{hl.strip()[:80]}"
-                                )
+    try:
+        glossary = Glossary(store.glossary())
+    except ValueError:
+        glossary = Glossary()
+    with pipeline_profile.stage("forbidden_senses"):
+        checked = glossary.forbidden_locales() - {"en"}
+        for locale in SUPPORTED_LOCALES:
+            if locale not in checked:
+                continue
+            for post in caches.get(locale, []):
+                slug = post.get("canonicalSlug") or post.get("slug") or "?"
+                for field in ("title", "body"):
+                    for en_term, bad, hl in glossary.forbidden_in_headings(post.get(field) or "", locale):
+                        failures.append(
+                            f"[{locale}] Forbidden sense '{bad}' for "
+                            f"'{en_term}' in {slug}/{field}: "
+                            f"{hl.strip()[:80]}"
+                        )
 
     if failures:
         print("i18n smoke checks failed:")
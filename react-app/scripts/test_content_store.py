@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""Regression tests for the SQLite content store (content_store.py).
+
+Validates that, on a small synthetic react-app tree:
+1. A first open imports every source and answers slug / canonical-slug / override /
+   glossary / asset queries; a second open re-imports nothing.
+2. Editing, breaking or deleting a source file is picked up by the next open.
+3. put_posts() records a written cache so the next sync does not re-parse it.
+4. generate_cache.py records posts.json and the locale caches as it writes them:
+   its closing sync imports only the other sources, and readers import nothing.
+
+Self-contained: copies the scripts into a temp tree and queries the store from a
+subprocess there, so the real data/tmp/ is never touched.
+"""
+
+from __future__ import annotations
+
+import json
+import shutil
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+
+# Runs inside the temp tree; prints one JSON line per query.
+QUERY = """
+import json, sys
+from content_store import BASE, open_store
+with open_store() as s:
+    print(json.dumps({
+        "imported": s.sync(),
+        "locales": s.post_locales(),
+        "published": s.published_slugs(BASE),
+        "by_slug": (s.post("es", "hola") or {}).get("title"),
+        "by_canonical": (s.post_by_canonical("es", "hello") or {}).get("title"),
+        "override": (s.override("es", "hello") or {}).get("title"),
+        "glossary": sorted(s.glossary()),
+        "assets": s.assets("hello"),
+    }))
+"""
+
+
+def _write(path: Path, data: object) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(data), encoding="utf-8")
+
+
+def _make_tree(root: Path) -> Path:
+    app = root / "react-app"
+    scripts = app / "scripts"
+    scripts.mkdir(parents=True)
+    for py in SCRIPT_DIR.glob("*.py"):
+        shutil.copy2(py, scripts / py.name)
+    _write(
+        app / "cache" / "posts.json",
+        [
+            {"slug": "hello", "title": "Hello", "published": True},
+            {"slug": "draft", "title": "Draft", "published": False},
+        ],
+    )
+    _write(app / "cache" / "posts.es.json", [{"slug": "hola", "canonicalSlug": "hello", "title": "Hola"}])
+    posts_dir = app / "src" / "content" / "posts"
+    _write(posts_dir / "translations.es.json", {"hello": {"title": "Hola"}})
+    _write(posts_dir / "translation_glossary.json", {"heading_overrides": {}, "forbidden_senses": {}})
+    for name in ("hello-hero.png", "hello-hero-square.png", "unrelated.png"):
+        _write(app / "public" / "images" / "posts" / name, "")
+    _write(app / "public" / "images" / "og" / "hello-1200x630.jpg", "")
+    return app
+
+
+def _query(app: Path, code: str = QUERY) -> dict:
+    proc = subprocess.run(
+        [sys.executable, "-c", code], cwd=app / "scripts", capture_output=True, text=True, timeout=60
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip())
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def test_first_open_imports_and_queries() -> list[str]:
+    failures: list[str] = []
+    with tempfile.TemporaryDirectory() as tmp:
+        app = _make_tree(Path(tmp))
+        first = _query(app)
+        expected = {
+            "imported": 0,
+            "locales": ["es"],
+            "published": ["hello"],
+            "by_slug": "Hola",
+            "by_canonical": "Hola",
+            "override": "Hola",
+            "glossary": ["forbidden_senses", "heading_overrides"],
+            "assets": {"hero": ["hello-hero.png"], "hero_square": ["hello-hero-square.png"], "og": ["hello-1200x630.jpg"]},
+        }
+        for key, value in expected.items():
+            if first.get(key) != value:
+                failures.append(f"{key}: got {first.get(key)!r}, expected {value!r}")
+        if not (app / "data" / "tmp" / "content_store.sqlite").exists():
+            failures.append("store file was not created under data/tmp/")
+    return failures
+
+
+def test_changed_sources_are_reimported() -> list[str]:
+    failures: list[str] = []
+    with tempfile.TemporaryDirectory() as tmp:
+        app = _make_tree(Path(tmp))
+        _query(app)
+        _write(app / "cache" / "posts.es.json", [{"slug": "hola", "canonicalSlug": "hello", "title": "Hola de nuevo"}])
+        if _query(app).get("by_canonical") != "Hola de nuevo":
+            failures.append("edited posts.es.json was not re-imported")
+        (app / "cache" / "posts.es.json").write_text("[", encoding="utf-8")
+        broken = _query(app, "from content_store import open_store\nimport json\nwith open_store() as s:\n"
+                        "    try:\n        s.posts('es')\n        print(json.dumps('no error'))\n"
+                        "    except ValueError as e:\n        print(json.dumps(str(e)))\n")
+        if "Failed to load" not in str(broken):
+            failures.append(f"broken posts.es.json did not raise on query: {broken!r}")
+        (app / "cache" / "posts.es.json").unlink()
+        after = _query(app)
+        if after.get("locales") != [] or after.get("by_slug") is not None:
+            failures.append(f"deleted posts.es.json still has rows: {after.get('locales')}")
+    return failures
+
+
+def test_put_posts_skips_reparse() -> list[str]:
+    failures: list[str] = []
+    with tempfile.TemporaryDirectory() as tmp:
+        app = _make_tree(Path(tmp))
+        _query(app)
+        code = (
+            "import json\nfrom pathlib import Path\nfrom artifact_writer import write_json\n"
+            "from content_store import CACHE_DIR, open_store\n"
+            "posts = [{'slug': 'hola', 'canonicalSlug': 'hello', 'title': 'Escrito'}]\n"
+            "with open_store() as s:\n"
+            "    path = CACHE_DIR / 'posts.es.json'\n"
+            "    write_json(path, posts)\n"
+            "    s.put_posts('es', path, posts)\n"
+            "    print(json.dumps({'imported': s.sync(), 'title': s.post('es', 'hola')['title']}))\n"
+        )
+        got = _query(app, code)
+        if got != {"imported": 0, "title": "Escrito"}:
+            failures.append(f"after put_posts: {got}")
+    return failures
+
+
+def test_generate_cache_fills_store() -> list[str]:
+    failures: list[str] = []
+    with tempfile.TemporaryDirectory() as tmp:
+        app = _make_tree(Path(tmp))
+        export = {
+            "posts": [{"slug": "hello", "title": "Hello again", "body": "Hi.", "published": True}],
+            "links": [],
+            "timeline": [],
+        }
+        _write(app / "data" / "export.json", export)
+        proc = subprocess.run(
+            [sys.executable, "scripts/generate_cache.py", "--from-neotoma-json", "data/export.json"],
+            cwd=app,
+            capture_output=True,
+            text=True,
+            timeout=120,
+        )
+        if proc.returncode != 0:
+            return [f"generate_cache.py failed: {proc.stderr.strip()[-500:]}"]
+        # translations.es.json, the glossary and the two image dirs; not posts.json / posts.es.json.
+        if "Content store: 4 source(s) re-imported" not in proc.stdout:
+            failures.append(f"post caches were re-parsed instead of recorded:\n{proc.stdout}")
+        got = _query(app)
+        if got.get("imported") != 0 or got.get("published") != ["hello"] or got.get("by_slug") != "Hola":
+            failures.append(f"store after generate_cache: {got}")
+    return failures
+
+
+def main() -> int:
+    all_failures: list[str] = []
+
+    tests = [
+        ("first_open_imports_and_queries", test_first_open_imports_and_queries),
+        ("changed_sources_are_reimported", test_changed_sources_are_reimported),
+        ("put_posts_skips_reparse", test_put_posts_skips_reparse),
+        ("generate_cache_fills_store", test_generate_cache_fills_store),
+    ]
+
+    for name, test_fn in tests:
+        failures = test_fn()
+        if failures:
+            print(f"FAIL: {name}")
+            for f in failures:
+                print(f"  - {f}")
+            all_failures.extend(failures)
+        else:
+            print(f"PASS: {name}")
+
+    if all_failures:
+        print(f"\n{len(all_failures)} failure(s) total.")
+        return 1
+
+    print(f"\nAll {len(tests)} tests passed.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
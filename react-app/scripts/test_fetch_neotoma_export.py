@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""Regression tests for the incremental Neotoma export fetch (fetch_neotoma_export.py).
+
+Runs the fetcher against the local stand-in (neotoma_export_stub.py) and validates:
+1. A first fetch pages through everything and the snapshot dedupes to the same
+   posts, links and timeline as loading the full export.
+2. A second fetch with nothing changed is a single 304 and leaves the snapshot alone.
+3. After new revisions and a new slug are appended to the export, only records at
+   or past the watermark are transferred and the snapshot still matches the full load.
+4. Tombstones remove a slug, and a bearer token is sent when configured.
+
+Self-contained: synthetic export and snapshot in a temp dir, server on a free port.
+"""
+
+from __future__ import annotations
+
+import json
+import sys
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, Callable
+
+from fetch_neotoma_export import fetch
+from neotoma_export import load_export
+from neotoma_export_stub import ExportServer
+
+
+def _record(slug: str, rev: int, **extra: Any) -> dict[str, Any]:
+    return {
+        "slug": slug,
+        "title": f"{slug} r{rev}",
+        "body": f"Body of {slug} revision {rev}. " * 20,
+        "published": True,
+        "published_date": "2025-01-01",
+        "updated_date": f"2025-02-{rev:02d}",
+        **extra,
+    }
+
+
+def _export(path: Path, posts: list[dict[str, Any]]) -> None:
+    links = [{"name": "GitHub", "url": "https://github.com/example"}]
+    timeline = [{"role": "Founder", "company": "Example"}]
+    path.write_text(json.dumps({"posts": posts, "links": links, "timeline": timeline}), encoding="utf-8")
+
+
+def _base_posts() -> list[dict[str, Any]]:
+    posts = []
+    for i in range(25):
+        for rev in range(1, 4):
+            posts.append(_record(f"post-{i:02d}", rev))
+    # A lower-ranked later revision must not replace the published one.
+    posts.append(_record("post-00", 5, published=False))
+    return posts
+
+
+def _same_as_full(export: Path, snapshot: Path) -> list[str]:
+    full_posts, full_links, full_timeline, _ = load_export(export)
+    snap_posts, snap_links, snap_timeline, _ = load_export(snapshot)
+    failures: list[str] = []
+    if [p["slug"] for p in full_posts] != [p["slug"] for p in snap_posts]:
+        failures.append("snapshot slug order differs from the full export")
+    if full_posts != snap_posts:
+        diff = [a["slug"] for a, b in zip(full_posts, snap_posts) if a != b]
+        failures.append(f"snapshot posts differ from the full export: {diff[:5]}")
+    if (full_links, full_timeline) != (snap_links, snap_timeline):
+        failures.append("snapshot links/timeline differ from the full export")
+    return failures
+
+
+def _with_server(fn: Callable[[Path, ExportServer], list[str]], token: str | None = None) -> list[str]:
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        export = root / "export.json"
+        _export(export, _base_posts())
+        server = ExportServer(export, token=token)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            return fn(root, server)
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+def test_first_fetch_matches_full_export() -> list[str]:
+    def run(root: Path, server: ExportServer) -> list[str]:
+        snapshot, state = root / "snapshot.json", root / "state.json"
+        result = fetch(server.url, snapshot, state, page_size=20)
+        failures = _same_as_full(root / "export.json", snapshot)
+        if result.not_modified or result.pages != 4 or result.post_records != 76:
+            failures.append(f"first fetch: {result}")
+        if json.loads(state.read_text())["watermark"] != "2025-02-05":
+            failures.append(f"watermark not stored: {state.read_text()}")
+        return failures
+
+    return _with_server(run)
+
+
+def test_unchanged_export_is_not_modified() -> list[str]:
+    def run(root: Path, server: ExportServer) -> list[str]:
+        snapshot, state = root / "snapshot.json", root / "state.json"
+        fetch(server.url, snapshot, state, page_size=20)
+        before = snapshot.read_bytes()
+        server.log.clear()
+        result = fetch(server.url, snapshot, state, page_size=20)
+        failures: list[str] = []
+        if not result.not_modified:
+            failures.append(f"second fetch was not a 304: {result}")
+        if [status for _, status, _ in server.log] != [304]:
+            failures.append(f"expected one 304 request, got {server.log}")
+        if snapshot.read_bytes() != before:
+            failures.append("snapshot changed on a 304")
+        return failures
+
+    return _with_server(run)
+
+
+def test_delta_fetch_transfers_only_changes() -> list[str]:
+    def run(root: Path, server: ExportServer) -> list[str]:
+        export, snapshot, state = root / "export.json", root / "snapshot.json", root / "state.json"
+        first = fetch(server.url, snapshot, state, page_size=20)
+        posts = _base_posts() + [_record("post-03", 7), _record("post-99", 6), _record("post-04", 8, title="")]
+        _export(export, posts)
+        result = fetch(server.url, snapshot, state, page_size=20)
+        failures = _same_as_full(export, snapshot)
+        # Watermark 2025-02-05 is inclusive: the unpublished post-00 r5 comes back too.
+        if result.post_records != 4 or result.pages != 1:
+            failures.append(f"delta fetch transferred {result.post_records} record(s) in {result.pages} page(s)")
+        if result.bytes_received * 5 > first.bytes_received:
+            failures.append(f"delta fetch moved {result.bytes_received} B vs {first.bytes_received} B for the full pull")
+        return failures
+
+    return _with_server(run)
+
+
+def test_tombstone_and_token() -> list[str]:
+    def run(root: Path, server: ExportServer) -> list[str]:
+        export, snapshot, state = root / "export.json", root / "snapshot.json", root / "state.json"
+        failures: list[str] = []
+        try:
+            fetch(server.url, snapshot, state)
+            failures.append("fetch without the token was accepted")
+        except OSError:
+            pass
+        fetch(server.url, snapshot, state, token="secret")
+        _export(export, _base_posts() + [{"slug": "post-07", "deleted": True, "updated_date": "2025-03-01"}])
+        fetch(server.url, snapshot, state, token="secret")
+        slugs = {p["slug"] for p in json.loads(snapshot.read_text())["posts"]}
+        if "post-07" in slugs or len(slugs) != 24:
+            failures.append(f"tombstone not applied: {len(slugs)} slugs, post-07 present={'post-07' in slugs}")
+        return failures
+
+    return _with_server(run, token="secret")
+
+
+def main() -> int:
+    all_failures: list[str] = []
+
+    tests = [
+        ("first_fetch_matches_full_export", test_first_fetch_matches_full_export),
+        ("unchanged_export_is_not_modified", test_unchanged_export_is_not_modified),
+        ("delta_fetch_transfers_only_changes", test_delta_fetch_transfers_only_changes),
+        ("tombstone_and_token", test_tombstone_and_token),
+    ]
+
+    for name, test_fn in tests:
+        failures = test_fn()
+        if failures:
+            print(f"FAIL: {name}")
+            for f in failures:
+                print(f"  - {f}")
+            all_failures.extend(failures)
+        else:
+            print(f"PASS: {name}")
+
+    if all_failures:
+        print(f"\n{len(all_failures)} failure(s) total.")
+        return 1
+
+    print(f"\nAll {len(tests)} tests passed.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""Regression tests for incremental generate_cache.py builds.
+
+Validates that, on a small synthetic react-app tree:
+1. An incremental run with nothing changed reuses every slug.
+2. After each kind of input edit (export record, markdown body, sidecars, hero
+   assets, new/removed drafts) the incremental output is byte-identical to a
+   --full build of the same tree.
+3. A resident --watch process picks up the same edits and its output is
+   byte-identical to a --full build after each cycle.
+
+Self-contained: copies the scripts into a temp tree and runs them as subprocesses,
+so the real cache/ and data/tmp/ are never touched.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import IO, Callable
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+
+
+def _write(path: Path, text: str) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding="utf-8")
+
+
+def _make_tree(root: Path) -> Path:
+    """Create a minimal react-app tree under root; returns the react-app dir."""
+    app = root / "react-app"
+    scripts = app / "scripts"
+    scripts.mkdir(parents=True)
+    for py in SCRIPT_DIR.glob("*.py"):
+        shutil.copy2(py, scripts / py.name)
+
+    posts_dir = app / "src" / "content" / "posts"
+    images = app / "public" / "images" / "posts"
+    og = app / "public" / "images" / "og"
+    for d in (posts_dir / "drafts", images, og, app / "cache" / "api"):
+        d.mkdir(parents=True, exist_ok=True)
+
+    export_posts = []
+    for i in range(6):
+        slug = f"post-{i}"
+        export_posts.append(
+            {
+                "slug": slug,
+                "title": f"Post {i}",
+                "excerpt": f"Excerpt {i}",
+                "body": f"Export body {i}",
+                "published": i != 5,
+                "published_date": f"2025-0{i + 1}-01",
+                "category": "essay",
+                "tags": json.dumps(["a", "b"]),
+                "share_tweet": f"tweet {i}",
+            }
+        )
+        _write(
+            posts_dir / f"{slug}.md",
+            f"---\ntitle: Post {i} from markdown\n---\n\nMarkdown body {i}.\n",
+        )
+    # Revision duplicate that must lose the dedupe ranking.
+    export_posts.append(dict(export_posts[0], body="stale", updated_date="2000-01-01", published=False))
+    _write(posts_dir / "post-1.summary.md", "Summary one\n")
+    _write(images / "post-2-hero.png", "png")
+    _write(images / "post-2-hero-style.txt", "float-right\n")
+    _write(og / "post-3-1200x630.jpg", "jpg")
+    _write(posts_dir / "drafts" / "draft-a.md", "---\ntitle: Draft A\npublished: true\npublished_date: 2025-09-09\n---\n\nDraft body.\n")
+    _write(posts_dir / "drafts" / "draft-a.tweet.md", "draft tweet\n")
+    _write(posts_dir / "content-draft.md", "## Content draft\n\nBody.\n")
+    _write(
+        posts_dir / "posts.json",
+        json.dumps([{"slug": "content-draft", "published": False, "updatedDate": "2025-01-02"}]),
+    )
+    _write(posts_dir / "listing_overrides.json", json.dumps({"exclude_from_listing": ["post-4"]}))
+    _write(posts_dir / "alternative_slugs.json", json.dumps({"post-1": ["post-one"]}))
+    _write(
+        app / "cache" / "posts.es.json",
+        json.dumps([{"slug": "post-2", "title": "Entrada 2"}], ensure_ascii=False),
+    )
+    _write(
+        app / "data" / "export.json",
+        json.dumps({"posts": export_posts, "links": [], "timeline": []}),
+    )
+    return app
+
+
+def _run(app: Path, *extra: str) -> str:
+    proc = subprocess.run(
+        [sys.executable, str(app / "scripts" / "generate_cache.py"), "--from-neotoma-json", str(app / "data" / "export.json"), *extra],
+        cwd=app,
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"generate_cache.py failed: {proc.stderr.strip()}")
+    return proc.stdout
+
+
+def _snapshot(app: Path) -> dict[str, bytes]:
+    cache = app / "cache"
+    return {p.relative_to(cache).as_posix(): p.read_bytes() for p in sorted(cache.rglob("*.json"))}
+
+
+def _reused_count(stdout: str) -> int:
+    match = re.search(r"(\d+) reused", stdout)
+    return int(match.group(1)) if match else -1
+
+
+def _edit_export(app: Path) -> None:
+    path = app / "data" / "export.json"
+    data = json.loads(path.read_text(encoding="utf-8"))
+    data["posts"][1]["excerpt"] = "Edited excerpt"
+    path.write_text(json.dumps(data), encoding="utf-8")
+
+
+def _edit_markdown(app: Path) -> None:
+    path = app / "src" / "content" / "posts" / "post-0.md"
+    path.write_text(path.read_text(encoding="utf-8") + "\nAnother paragraph.\n", encoding="utf-8")
+
+
+def _add_summary(app: Path) -> None:
+    _write(app / "src" / "content" / "posts" / "post-3.summary.md", "New summary\n")
+
+
+def _add_hero(app: Path) -> None:
+    images = app / "public" / "images" / "posts"
+    _write(images / "post-0-hero.png", "png")
+    _write(images / "post-0-hero-square.png", "png")
+
+
+def _change_hero_style(app: Path) -> None:
+    _write(app / "public" / "images" / "posts" / "post-2-hero-style.txt", "keep-proportions\n")
+
+
+def _add_draft(app: Path) -> None:
+    _write(app / "src" / "content" / "posts" / "drafts" / "draft-b.md", "Untitled draft body\n")
+
+
+def _remove_draft(app: Path) -> None:
+    (app / "src" / "content" / "posts" / "drafts" / "draft-a.md").unlink()
+
+
+def _edit_listing_overrides(app: Path) -> None:
+    _write(
+        app / "src" / "content" / "posts" / "listing_overrides.json",
+        json.dumps({"exclude_from_listing": ["post-1"]}),
+    )
+
+
+EDITS: list[tuple[str, Callable[[Path], None]]] = [
+    ("export record", _edit_export),
+    ("markdown body", _edit_markdown),
+    ("summary sidecar", _add_summary),
+    ("hero assets", _add_hero),
+    ("hero style", _change_hero_style),
+    ("new draft", _add_draft),
+    ("removed draft", _remove_draft),
+    ("listing overrides", _edit_listing_overrides),
+]
+
+
+def test_noop_incremental_reuses_everything() -> list[str]:
+    failures: list[str] = []
+    with tempfile.TemporaryDirectory() as tmp:
+        app = _make_tree(Path(tmp))
+        _run(app, "--full")
+        before = _snapshot(app)
+        out = _run(app)
+        if "0 slug(s) rebuilt" not in out:
+            failures.append(f"No-op incremental run rebuilt slugs: {out.strip()}")
+        if _snapshot(app) != before:
+            failures.append("No-op incremental run changed cache output")
+    return failures
+
+
+def test_incremental_matches_full_after_edits() -> list[str]:
+    failures: list[str] = []
+    with tempfile.TemporaryDirectory() as tmp:
+        app = _make_tree(Path(tmp) / "incremental")
+        _run(app, "--full")
+        for label, edit in EDITS:
+            edit(app)
+            out = _run(app)
+            if _reused_count(out) <= 0:
+                failures.append(f"[{label}] incremental run reused nothing: {out.strip()}")
+            full_root = Path(tmp) / f"full-{label.replace(' ', '-')}"
+            shutil.copytree(app.parent, full_root)
+            full_app = full_root / "react-app"
+            _run(full_app, "--full")
+            got, want = _snapshot(app), _snapshot(full_app)
+            if got != want:
+                differing = sorted(k for k in set(got) | set(want) if got.get(k) != want.get(k))
+                failures.append(f"[{label}] incremental output differs from --full: {', '.join(differing)}")
+    return failures
+
+
+def _wait_for_line(stream: IO[str], prefix: str, timeout: float = 30.0) -> str:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        line = stream.readline()
+        if not line:
+            break
+        if line.startswith(prefix):
+            return line
+    raise RuntimeError(f"watch process did not print {prefix!r}")
+
+
+def test_watch_matches_full_after_edits() -> list[str]:
+    failures: list[str] = []
+    with tempfile.TemporaryDirectory() as tmp:
+        app = _make_tree(Path(tmp) / "watch")
+        proc = subprocess.Popen(
+            [
+                sys.executable,
+                str(app / "scripts" / "generate_cache.py"),
+                "--from-neotoma-json",
+                str(app / "data" / "export.json"),
+                "--watch",
+                "--poll-interval",
+                "0.1",
+            ],
+            cwd=app,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+        )
+        try:
+            assert proc.stdout is not None
+            _wait_for_line(proc.stdout, "Watching")
+            for label, edit in EDITS:
+                # Keep mtimes distinct on filesystems with coarse timestamps.
+                time.sleep(0.05)
+                edit(app)
+                _wait_for_line(proc.stdout, "Watch:")
+                full_root = Path(tmp) / f"full-{label.replace(' ', '-')}"
+                shutil.copytree(app.parent, full_root)
+                full_app = full_root / "react-app"
+                _run(full_app, "--full")
+                got, want = _snapshot(app), _snapshot(full_app)
+                if got != want:
+                    differing = sorted(k for k in set(got) | set(want) if got.get(k) != want.get(k))
+                    failures.append(f"[{label}] watch output differs from --full: {', '.join(differing)}")
+        except RuntimeError as exc:
+            failures.append(str(exc))
+        finally:
+            proc.send_signal(signal.SIGINT)
+            try:
+                proc.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+    return failures
+
+
+def main() -> int:
+    all_failures: list[str] = []
+
+    tests = [
+        ("noop_incremental_reuses_everything", test_noop_incremental_reuses_everything),
+        ("incremental_matches_full_after_edits", test_incremental_matches_full_after_edits),
+        ("watch_matches_full_after_edits", test_watch_matches_full_after_edits),
+    ]
+
+    for name, test_fn in tests:
+        failures = test_fn()
+        if failures:
+            print(f"FAIL: {name}")
+            for f in failures:
+                print(f"  - {f}")
+            all_failures.extend(failures)
+        else:
+            print(f"PASS: {name}")
+
+    if all_failures:
+        print(f"\n{len(all_failures)} failure(s) total.")
+        return 1
+
+    print(f"\nAll {len(tests)} tests passed.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""Regression tests for incremental rebuild_locale_post_caches.py runs.
+
+Validates that, on a small synthetic react-app tree:
+1. A rerun with nothing changed reuses every (slug, locale) entry and rewrites nothing.
+2. After editing one translation entry, the English record or the glossary, only the
+   affected entries are rebuilt, --verify passes, and the output is byte-identical to
+   a --full rebuild of the same tree.
+3. A locale cache rewritten by something else is rebuilt from scratch.
+
+Self-contained: copies the scripts into a temp tree and runs them as subprocesses,
+so the real cache/ and data/tmp/ are never touched.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+LOCALES = ("en", "es", "ca", "zh", "hi", "ar", "fr", "pt", "ru", "bn", "ur", "id", "de")
+
+
+def _write(path: Path, data: object) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
+
+
+def _make_tree(root: Path) -> Path:
+    app = root / "react-app"
+    scripts = app / "scripts"
+    scripts.mkdir(parents=True)
+    for py in SCRIPT_DIR.glob("*.py"):
+        shutil.copy2(py, scripts / py.name)
+    en = [
+        {
+            "slug": f"post-{i}",
+            "title": f"Post {i} about agents and memory",
+            "excerpt": f"Excerpt {i}",
+            "body": f"# Post {i}\n\nAgents, memory and provenance, part {i}.",
+            "published": True,
+            "tags": ["agents", "memory"],
+        }
+        for i in range(5)
+    ]
+    _write(app / "cache" / "posts.en.json", en)
+    posts_dir = app / "src" / "content" / "posts"
+    _write(
+        posts_dir / "translations.es.json",
+        {f"post-{i}": {"title": f"Entrada {i}", "body": f"## La caída {i}\n\nCuerpo {i}."} for i in range(5)},
+    )
+    _write(posts_dir / "translations.ca.json", {"post-0": {"title": "Entrada 0", "body": "## La tardor\n\nCos."}})
+    _write(
+        posts_dir / "translation_glossary.json",
+        {
+            "heading_overrides": {"the fall": {"ca": "la caiguda", "es": "la caída"}},
+            "forbidden_senses": {"the fall": {"ca": ["la tardor", "tardor"], "es": ["el otoño", "otoño"]}},
+        },
+    )
+    return app
+
+
+def _run(app: Path, *args: str) -> tuple[dict[str, tuple[int, int]], str]:
+    """Per-locale (rebuilt, reused) of one run, plus its stdout."""
+    env = dict(os.environ, PIPELINE_PROFILE="0")
+    proc = subprocess.run(
+        [sys.executable, "scripts/rebuild_locale_post_caches.py", "--jobs", "2", *args],
+        cwd=app,
+        capture_output=True,
+        text=True,
+        timeout=300,
+        env=env,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"rebuild {' '.join(args)} failed:\n{proc.stdout}\n{proc.stderr}")
+    counts = {
+        m.group(1): (int(m.group(2)), int(m.group(3)))
+        for m in re.finditer(r"api/search\.(\w+)\.json \(.*?(\d+) rebuilt, (\d+) reused\)", proc.stdout)
+    }
+    return counts, proc.stdout
+
+
+def _snapshot(app: Path) -> dict[str, bytes]:
+    cache = app / "cache"
+    return {
+        p.relative_to(cache).as_posix(): p.read_bytes()
+        for p in sorted(cache.rglob("*"))
+        if p.is_file() and p.name != ".build.lock"
+    }
+
+
+def _matches_full(app: Path, label: str) -> list[str]:
+    incremental = _snapshot(app)
+    _run(app, "--full")
+    full = _snapshot(app)
+    if incremental != full:
+        diff = sorted(k for k in set(incremental) | set(full) if incremental.get(k) != full.get(k))
+        return [f"{label}: incremental output differs from --full: {diff[:5]}"]
+    return []
+
+
+def test_unchanged_rerun_reuses_everything() -> list[str]:
+    failures: list[str] = []
+    with tempfile.TemporaryDirectory() as tmp:
+        app = _make_tree(Path(tmp))
+        _run(app)
+        _run(app)  # posts.en.json is also rewritten by the first run
+        before = _snapshot(app)
+        counts, out = _run(app)
+        if any(rebuilt for rebuilt, _ in counts.values()) or len(counts) != len(LOCALES):
+            failures.append(f"unchanged rerun rebuilt entries: {counts}")
+        if "Wrote" in out or _snapshot(app) != before:
+            failures.append("unchanged rerun rewrote outputs")
+    return failures
+
+
+def test_edits_rebuild_only_affected_entries() -> list[str]:
+    failures: list[str] = []
+    with tempfile.TemporaryDirectory() as tmp:
+        app = _make_tree(Path(tmp))
+        _run(app)
+        _run(app)
+        posts_dir = app / "src" / "content" / "posts"
+
+        translations = json.loads((posts_dir / "translations.es.json").read_text(encoding="utf-8"))
+        translations["post-2"]["title"] = "Entrada dos, revisada"
+        _write(posts_dir / "translations.es.json", translations)
+        counts, out = _run(app, "--verify")
+        if counts.get("es") != (1, 4) or any(c[0] for loc, c in counts.items() if loc != "es"):
+            failures.append(f"translation edit: {counts}")
+        if "Verified" not in out:
+            failures.append("translation edit: --verify did not confirm")
+        failures.extend(_matches_full(app, "translation edit"))
+
+        glossary = json.loads((posts_dir / "translation_glossary.json").read_text(encoding="utf-8"))
+        glossary["forbidden_senses"]["the fall"]["ca"].append("caiguda de fulla")
+        _write(posts_dir / "translation_glossary.json", glossary)
+        counts, _ = _run(app, "--verify")
+        if any(rebuilt != 5 for rebuilt, _ in counts.values()):
+            failures.append(f"glossary edit did not rebuild every entry: {counts}")
+    return failures
+
+
+def test_foreign_rewrite_rebuilds_locale() -> list[str]:
+    failures: list[str] = []
+    with tempfile.TemporaryDirectory() as tmp:
+        app = _make_tree(Path(tmp))
+        _run(app)
+        _run(app)
+        path = app / "cache" / "posts.fr.json"
+        posts = json.loads(path.read_text(encoding="utf-8"))
+        posts[0]["title"] = "Hand edited"
+        _write(path, posts)
+        counts, _ = _run(app)
+        if counts.get("fr") != (5, 0) or counts.get("de") != (0, 5):
+            failures.append(f"rewritten posts.fr.json: {counts}")
+        if json.loads(path.read_text(encoding="utf-8"))[0]["title"] == "Hand edited":
+            failures.append("hand edit survived the rebuild")
+    return failures
+
+
+def main() -> int:
+    all_failures: list[str] = []
+
+    tests = [
+        ("unchanged_rerun_reuses_everything", test_unchanged_rerun_reuses_everything),
+        ("edits_rebuild_only_affected_entries", test_edits_rebuild_only_affected_entries),
+        ("foreign_rewrite_rebuilds_locale", test_foreign_rewrite_rebuilds_locale),
+    ]
+
+    for name, test_fn in tests:
+        failures = test_fn()
+        if failures:
+            print(f"FAIL: {name}")
+            for f in failures:
+                print(f"  - {f}")
+            all_failures.extend(failures)
+        else:
+            print(f"PASS: {name}")
+
+    if all_failures:
+        print(f"\n{len(all_failures)} failure(s) total.")
+        return 1
+
+    print(f"\nAll {len(tests)} tests passed.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""Regression tests for precomputed related posts (related_posts.py).
+
+Validates that:
+1. Posts on the same topic are each other's neighbours, never themselves, and a
+   word found in every post (above MAX_DF) does not link other topics.
+2. An excludeFromListing post gets neighbours but is never suggested.
+3. Unpublished posts get no relatedSlugs and are never suggested; a stale value is
+   removed, also from a published post that no longer has neighbours.
+4. Tied scores are broken by slug, so the output is byte-identical across runs and
+   input orders.
+5. MAX_DF / MAX_TERMS / MAX_POSTINGS pruning still fills k neighbours per post, all
+   from the post's own topic.
+
+Self-contained: synthetic posts in memory; never reads or writes cache/.
+"""
+
+from __future__ import annotations
+
+import json
+import random
+import sys
+
+import pipeline_profile
+from related_posts import MAX_DF, MAX_POSTINGS, MAX_TERMS, RELATED_K, add_related_slugs, related_slugs
+
+TOPICS = {
+    "memory": "memory ledger provenance timeline",
+    "deploy": "deploy pipeline artifact runner",
+    "garden": "garden compost seedling harvest",
+}
+
+
+def _topic_posts() -> list[dict]:
+    """Three posts per topic; "notes" is in every title and each post has a word of its own."""
+    return [
+        {
+            "slug": f"{topic}-{i}",
+            "title": f"{topic.title()} notes {i}",
+            "tags": words.split()[:2],
+            "body": f"{words} unique{topic}{i}",
+            "published": True,
+        }
+        for topic, words in TOPICS.items()
+        for i in range(3)
+    ]
+
+
+def test_similar_posts_are_neighbours() -> list[str]:
+    failures: list[str] = []
+    related = related_slugs(_topic_posts())
+    for slug, neighbours in related.items():
+        topic = slug.rsplit("-", 1)[0]
+        expected = sorted(f"{topic}-{i}" for i in range(3) if f"{topic}-{i}" != slug)
+        if sorted(neighbours) != expected:
+            failures.append(f"{slug}: {neighbours}, expected {expected}")
+    if len(related) != 9:
+        failures.append(f"{len(related)} posts got neighbours, expected 9")
+    return failures
+
+
+def test_excluded_post_is_never_suggested() -> list[str]:
+    failures: list[str] = []
+    posts = _topic_posts()
+    posts[0]["excludeFromListing"] = True  # memory-0
+    add_related_slugs(posts)
+    if not posts[0].get("relatedSlugs"):
+        failures.append("excluded post got no neighbours")
+    for post in posts:
+        if "memory-0" in post.get("relatedSlugs", []):
+            failures.append(f"{post['slug']} suggests the excluded post")
+    return failures
+
+
+def test_unpublished_posts_and_stale_values() -> list[str]:
+    failures: list[str] = []
+    posts = _topic_posts()
+    posts[1]["published"] = False  # memory-1
+    posts[1]["relatedSlugs"] = ["memory-2"]
+    loner = {"slug": "loner", "title": "Quantum", "body": "quantum", "published": True, "relatedSlugs": ["memory-0"]}
+    posts.append(loner)
+    add_related_slugs(posts)
+    if "relatedSlugs" in posts[1]:
+        failures.append(f"unpublished post kept relatedSlugs: {posts[1]['relatedSlugs']}")
+    if "relatedSlugs" in loner:
+        failures.append(f"post without neighbours kept a stale value: {loner['relatedSlugs']}")
+    for post in posts:
+        if "memory-1" in post.get("relatedSlugs", []):
+            failures.append(f"{post['slug']} suggests the unpublished post")
+    if posts[0].get("relatedSlugs") != ["memory-2"]:
+        failures.append(f"memory-0: {posts[0].get('relatedSlugs')}, expected ['memory-2']")
+    return failures
+
+
+def test_ties_are_deterministic() -> list[str]:
+    failures: list[str] = []
+    # Six identical posts: every pair scores the same, so only the slug decides.
+    posts = [{"slug": f"twin-{c}", "title": "Lantern beacon", "body": "lantern beacon", "published": True} for c in "fbdaec"]
+    posts += _topic_posts()
+    outputs = set()
+    rng = random.Random(3)
+    for _ in range(5):
+        shuffled = [dict(p) for p in posts]
+        rng.shuffle(shuffled)
+        add_related_slugs(shuffled)
+        outputs.add(json.dumps(sorted(shuffled, key=lambda p: p["slug"]), sort_keys=True))
+        related = {p["slug"]: p.get("relatedSlugs") for p in shuffled}
+        if related["twin-a"] != ["twin-b", "twin-c", "twin-d", "twin-e"]:
+            failures.append(f"twin-a: {related['twin-a']}, expected the next four slugs")
+            break
+    if len(outputs) != 1:
+        failures.append(f"{len(outputs)} different outputs across input orders")
+    return failures
+
+
+def test_pruning_keeps_k_neighbours() -> list[str]:
+    failures: list[str] = []
+    groups, per_group = 10, 20
+    posts = []
+    for i in range(groups * per_group):
+        group = i % groups
+        # More terms than MAX_TERMS per post, a term in half the posts (more postings than
+        # MAX_POSTINGS) and one in all of them (above MAX_DF).
+        words = [f"g{group}w{j}" for j in range(MAX_TERMS + 8)] + [f"half{i % 2}", "everywhere"]
+        posts.append({"slug": f"post-{i:03d}", "title": f"Post {i}", "body": " ".join(words), "published": True})
+    if not (MAX_POSTINGS < len(posts) // 2 <= len(posts) * MAX_DF):
+        failures.append("corpus no longer exercises MAX_POSTINGS; adjust the test")
+    related = related_slugs(posts)
+    for post in posts:
+        neighbours = related.get(post["slug"], [])
+        group = int(post["slug"].split("-")[1]) % groups
+        if len(neighbours) != RELATED_K or post["slug"] in neighbours:
+            failures.append(f"{post['slug']}: {neighbours}")
+        elif any(int(n.split("-")[1]) % groups != group for n in neighbours):
+            failures.append(f"{post['slug']}: neighbours outside its group {neighbours}")
+    return failures
+
+
+def main() -> int:
+    pipeline_profile.start("test_related_posts")
+    all_failures: list[str] = []
+
+    tests = [
+        ("similar_posts_are_neighbours", test_similar_posts_are_neighbours),
+        ("excluded_post_is_never_suggested", test_excluded_post_is_never_suggested),
+        ("unpublished_posts_and_stale_values", test_unpublished_posts_and_stale_values),
+        ("ties_are_deterministic", test_ties_are_deterministic),
+        ("pruning_keeps_k_neighbours", test_pruning_keeps_k_neighbours),
+    ]
+
+    for name, test_fn in tests:
+        with pipeline_profile.stage(name):
+            failures = test_fn()
+        if failures:
+            print(f"FAIL: {name}")
+            for f in failures:
+                print(f"  - {f}")
+            all_failures.extend(failures)
+        else:
+            print(f"PASS: {name}")
+
+    if all_failures:
+        print(f"\n{len(all_failures)} failure(s) total.")
+        return 1
+
+    print(f"\nAll {len(tests)} tests passed.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""Regression tests for the precomputed search index (search_index.py).
+
+Validates that:
+1. Tokenization is script-aware: accents folded, Devanagari/Bengali words kept
+   whole, Arabic diacritics removed, Han runs split into bigrams.
+2. The index layout is consistent: sorted terms, parallel postings, prefix
+   buckets covering exactly the terms that start with their character.
+3. Postings carry the field of each occurrence, and unpublished posts are skipped.
+4. Locale caches (when present) produce an index whose docs are their published posts.
+
+Self-contained: builds indexes in memory and never writes cache/.
+"""
+
+from __future__ import annotations
+
+import json
+import sys
+from pathlib import Path
+
+import pipeline_profile
+from search_index import FIELDS, build_search_index, tokenize
+
+ROOT = Path(__file__).resolve().parents[1]
+CACHE_DIR = ROOT / "cache"
+
+SAMPLE_POSTS = [
+    {
+        "slug": "truth-layer",
+        "title": "The truth layer",
+        "tags": ["memory", "agents"],
+        "body": "Agent memory needs a café-grade truth layer. See https://example.com/memory-docs",
+        "published": True,
+    },
+    {"slug": "draft-post", "title": "Unpublished memory draft", "published": False},
+    {"slug": "agent-ledger", "title": "Ledger", "excerpt": "Memory for agents", "published": True},
+]
+
+
+def test_tokenize_scripts() -> list[str]:
+    failures: list[str] = []
+    cases = [
+        ("Café_local-first", ["cafe", "local", "first"]),
+        ("हिन्दी भाषा", ["हिन्दी", "भाषा"]),
+        ("আমার সোনার বাংলা", ["আমার", "সোনার", "বাংলা"]),
+        ("الذَّاكِرَة", ["الذاكرة"]),
+        ("أحمد", ["احمد"]),
+        ("记忆系统", ["记忆", "忆系", "系统"]),
+        ("API记忆", ["api", "记忆"]),
+        ("中", ["中"]),
+    ]
+    for text, expected in cases:
+        got = tokenize(text)
+        if got != expected:
+            failures.append(f"tokenize({text!r}) = {got}, expected {expected}")
+    return failures
+
+
+def test_index_layout() -> list[str]:
+    failures: list[str] = []
+    index = build_search_index("en", SAMPLE_POSTS)
+    terms = index["terms"]
+    if terms != sorted(terms):
+        failures.append("terms are not sorted")
+    if len(index["postings"]) != len(terms):
+        failures.append(f"{len(index['postings'])} postings lists for {len(terms)} terms")
+    if [f["name"] for f in index["fields"]] != list(FIELDS):
+        failures.append("fields do not follow FIELD_WEIGHTS order")
+    for postings in index["postings"]:
+        if not postings or len(postings) % 3:
+            failures.append(f"postings not (doc, field, tf) triples: {postings}")
+            break
+    covered = 0
+    for char, (start, end) in index["prefixes"].items():
+        covered += end - start
+        if not all(t.startswith(char) for t in terms[start:end]):
+            failures.append(f"bucket {char!r} holds terms with another first character")
+    if covered != len(terms):
+        failures.append(f"prefix buckets cover {covered} of {len(terms)} terms")
+    return failures
+
+
+def test_postings_fields_and_published() -> list[str]:
+    failures: list[str] = []
+    index = build_search_index("en", SAMPLE_POSTS)
+    if index["docs"] != ["truth-layer", "agent-ledger"]:
+        failures.append(f"docs = {index['docs']}, expected only published posts")
+    terms = index["terms"]
+    postings = dict(zip(terms, index["postings"]))
+    if "draft" in postings:
+        failures.append("unpublished post was indexed")
+    if "example" in postings:
+        failures.append("body URL was indexed")
+    memory = postings.get("memory", [])
+    hits = {(memory[i], FIELDS[memory[i + 1]]): memory[i + 2] for i in range(0, len(memory), 3)}
+    expected = {(0, "tags"): 1, (0, "body"): 1, (1, "excerpt"): 1}
+    if hits != expected:
+        failures.append(f"'memory' postings = {hits}, expected {expected}")
+    return failures
+
+
+def test_locale_caches_index() -> list[str]:
+    failures: list[str] = []
+    for path in sorted(CACHE_DIR.glob("posts.*.json")):
+        locale = path.name.split(".")[1]
+        if len(locale) != 2:
+            continue
+        posts = json.loads(path.read_text(encoding="utf-8"))
+        pipeline_profile.count("files_read")
+        index = build_search_index(locale, posts)
+        published = [p["slug"] for p in posts if isinstance(p, dict) and p.get("published") and p.get("slug")]
+        if index["docs"] != published:
+            failures.append(f"{locale}: {len(index['docs'])} docs for {len(published)} published posts")
+        if published and not index["terms"]:
+            failures.append(f"{locale}: no terms")
+    return failures
+
+
+def main() -> int:
+    pipeline_profile.start("test_search_index")
+    all_failures: list[str] = []
+
+    tests = [
+        ("tokenize_scripts", test_tokenize_scripts),
+        ("index_layout", test_index_layout),
+        ("postings_fields_and_published", test_postings_fields_and_published),
+        ("locale_caches_index", test_locale_caches_index),
+    ]
+
+    for name, test_fn in tests:
+        with pipeline_profile.stage(name):
+            failures = test_fn()
+        if failures:
+            print(f"FAIL: {name}")
+            for f in failures:
+                print(f"  - {f}")
+            all_failures.extend(failures)
+        else:
+            print(f"PASS: {name}")
+
+    if all_failures:
+        print(f"\n{len(all_failures)} failure(s) total.")
+        return 1
+
+    print(f"\nAll {len(tests)} tests passed.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""Regression tests for translator backends and the circuit breaker.
+
+Validates that:
+1. PseudoBackend is deterministic (output and injected errors), changes the text,
+   and leaves placeholders and batch markers intact.
+2. A provider that keeps failing trips its breaker: after BREAKER_FAILURES errors
+   its calls are skipped and chunks go straight to the fallback; after the
+   cool-down one trial call decides whether it reopens or closes.
+3. generate_locale_translations.py --backend pseudo runs end to end offline, writes
+   the same files for --workers 1 and 4, and a rerun translates nothing.
+
+Self-contained: scheduler tests use a fake clock; the end-to-end test copies the
+scripts into a temp tree and runs them as subprocesses.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from translation_backends import PseudoBackend
+from translation_batching import pack_segments, unpack_segments
+from translation_placeholders import protect, restore
+from translation_scheduler import BREAKER_COOLDOWN_S, BREAKER_FAILURES, ChunkJob, CircuitBreaker, TokenBucket, TranslationScheduler
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+GLOSSARY_PATH = SCRIPT_DIR.parent / "src" / "content" / "posts" / "translation_glossary.json"
+
+
+class _FakeClock:
+    def __init__(self) -> None:
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.now += seconds
+
+
+def test_pseudo_backend() -> list[str]:
+    failures: list[str] = []
+    text = "Read [the docs](https://example.com) before `make test`."
+    masked = protect(text, "es")
+    out = PseudoBackend("PseudoPrimary", "es").translate(masked.text)
+    restored = restore(out, masked)
+    if restored != "Réád [thé dócs](https://example.com) béfóré `make test`.":
+        failures.append(f"pseudo round trip: {restored!r}")
+    packed = pack_segments(["one", "two"])
+    if unpack_segments(PseudoBackend("PseudoPrimary", "es").translate(packed), 2) != ["óné", "twó"]:
+        failures.append("batch markers did not survive")
+
+    def outcomes(seed: int) -> list[bool]:
+        backend = PseudoBackend("PseudoPrimary", "es", error_rate=0.5, seed=seed)
+        results = []
+        for i in range(40):
+            try:
+                backend.translate(f"chunk {i % 10}")
+                results.append(True)
+            except RuntimeError:
+                results.append(False)
+        return results
+
+    if outcomes(1) != outcomes(1):
+        failures.append("error injection is not deterministic")
+    if outcomes(1) == outcomes(2) or not 8 < outcomes(1).count(False) < 32:
+        failures.append(f"error injection ignores seed or rate: {outcomes(1).count(False)} of 40 failed")
+    return failures
+
+
+def test_breaker_skips_failing_provider() -> list[str]:
+    failures: list[str] = []
+    clock = _FakeClock()
+    primary = PseudoBackend("PseudoPrimary", "es", error_rate=1.0)
+    fallback = PseudoBackend("PseudoFallback", "es")
+    scheduler = TranslationScheduler(
+        lambda locale: [primary, fallback],
+        1,
+        {},
+        bucket_factory=lambda rate: TokenBucket(rate, clock=clock, sleep=clock.sleep),
+        breaker_factory=lambda: CircuitBreaker(clock=clock),
+        batch_chars=0,
+    )
+    results = scheduler.run([ChunkJob("es", f"post title {i}") for i in range(20)])
+    stats = scheduler.stats["PseudoPrimary"]
+    if stats.calls != BREAKER_FAILURES or scheduler.breakers["PseudoPrimary"].state != "open":
+        failures.append(f"breaker did not open after {BREAKER_FAILURES} errors: {stats.calls} calls")
+    if {r.provider for r in results.values()} != {"PseudoFallback"} or stats.skipped < 18:
+        failures.append(f"chunks not sent straight to the fallback: {stats.skipped} skipped")
+
+    clock.now += BREAKER_COOLDOWN_S
+    scheduler.run([ChunkJob("es", "after cool-down")])
+    if stats.calls != BREAKER_FAILURES + 1 or scheduler.breakers["PseudoPrimary"].opens != 2:
+        failures.append("failed trial call did not reopen the breaker")
+
+    primary.error_rate = 0.0
+    clock.now += BREAKER_COOLDOWN_S
+    result = scheduler.run([ChunkJob("es", "recovered")])[ChunkJob("es", "recovered")]
+    if result.provider != "PseudoPrimary" or scheduler.breakers["PseudoPrimary"].state != "closed":
+        failures.append("successful trial call did not close the breaker")
+    if not any("breaker closed (opened 2x" in line for line in scheduler.report()):
+        failures.append("health line missing from report")
+    return failures
+
+
+def _make_tree(root: Path) -> Path:
+    app = root / "react-app"
+    scripts = app / "scripts"
+    scripts.mkdir(parents=True)
+    for py in SCRIPT_DIR.glob("*.py"):
+        shutil.copy2(py, scripts / py.name)
+    posts = [
+        {
+            "slug": f"post-{i}",
+            "title": f"Post {i} about agents",
+            "excerpt": f"Excerpt {i}.",
+            "body": f"## The state of memory {i}\n\nSee [docs](https://example.com/{i}).\n\n```\ncode {i}\n```\n\nLast paragraph.",
+        }
+        for i in range(6)
+    ]
+    (app / "cache").mkdir()
+    (app / "cache" / "posts.en.json").write_text(json.dumps(posts), encoding="utf-8")
+    (app / "src" / "content" / "posts").mkdir(parents=True)
+    shutil.copy2(GLOSSARY_PATH, app / "src" / "content" / "posts" / GLOSSARY_PATH.name)
+    return app
+
+
+def _generate(app: Path, *args: str) -> str:
+    proc = subprocess.run(
+        [sys.executable, "scripts/generate_locale_translations.py", "--backend", "pseudo", *args],
+        cwd=app,
+        capture_output=True,
+        text=True,
+        timeout=300,
+        env=dict(os.environ, PIPELINE_PROFILE="0"),
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"generate {' '.join(args)} failed:\n{proc.stdout}\n{proc.stderr}")
+    return proc.stdout
+
+
+def _translations(app: Path) -> dict[str, bytes]:
+    return {p.name: p.read_bytes() for p in sorted((app / "src" / "content" / "posts").glob("translations.*.json"))}
+
+
+def test_offline_end_to_end() -> list[str]:
+    failures: list[str] = []
+    with tempfile.TemporaryDirectory() as tmp:
+        serial = _make_tree(Path(tmp) / "serial")
+        concurrent = _make_tree(Path(tmp) / "concurrent")
+        _generate(serial, "--workers", "1")
+        _generate(concurrent, "--workers", "4", "--pseudo-latency-ms", "5")
+        files = _translations(serial)
+        if len(files) != 12 or files != _translations(concurrent):
+            failures.append(f"--workers 1 and 4 wrote different files ({len(files)} locales)")
+        es = json.loads(files["translations.es.json"])["post-1"]
+        if es["title"] != "Póst 1 ábóút ágénts" or "https://example.com/1" not in es["body"]:
+            failures.append(f"unexpected es entry: {es}")
+        if not es["body"].startswith("## El Estado"):
+            failures.append(f"glossary heading term not applied: {es['body'][:40]!r}")
+        out = _generate(serial)
+        if "Translating 0 chunks" not in out or _translations(serial) != files:
+            failures.append("rerun translated again or changed the files")
+    return failures
+
+
+def main() -> int:
+    all_failures: list[str] = []
+
+    tests = [
+        ("pseudo_backend", test_pseudo_backend),
+        ("breaker_skips_failing_provider", test_breaker_skips_failing_provider),
+        ("offline_end_to_end", test_offline_end_to_end),
+    ]
+
+    for name, test_fn in tests:
+        failures = test_fn()
+        if failures:
+            print(f"FAIL: {name}")
+            for f in failures:
+                print(f"  - {f}")
+            all_failures.extend(failures)
+        else:
+            print(f"PASS: {name}")
+
+    if all_failures:
+        print(f"\n{len(all_failures)} failure(s) total.")
+        return 1
+
+    print(f"\nAll {len(tests)} tests passed.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""Regression tests for packing small chunks into one request (translation_batching.py).
+
+Validates that:
+1. Packed segments unpack to the same list, also after MT-style spacing changes,
+   and a batch with a lost, repeated or emptied marker is rejected.
+2. Small chunks of one locale share requests up to --batch-chars; long chunks and
+   other locales are kept apart; the result does not depend on --workers.
+3. A misaligned batch falls back to one call per chunk, and a segment that came back
+   untranslated is retried alone.
+
+Self-contained: translators are small local classes.
+"""
+
+from __future__ import annotations
+
+import re
+import sys
+
+from translation_batching import SEGMENT_CHARS, batch_jobs, pack_segments, unpack_segments
+from translation_scheduler import ChunkJob, TranslationScheduler
+
+
+def _reversed_words(text: str) -> str:
+    return re.sub(r"[a-z]+", lambda m: m.group(0)[::-1], text)
+
+
+class Reverser:
+    """Reverses every word and leaves the batch markers alone, as MT does."""
+
+    def __init__(self) -> None:
+        self.calls: list[str] = []
+
+    def translate(self, text: str) -> str:
+        self.calls.append(text)
+        return _reversed_words(text).replace("\n\n", "\n \n")
+
+
+class DropsMarker(Reverser):
+    def translate(self, text: str) -> str:
+        out = super().translate(text)
+        return out.replace("⟦1⟧", "") if "⟦1⟧" in out else out
+
+
+class KeepsNames(Reverser):
+    def translate(self, text: str) -> str:
+        return super().translate(text).replace("ianepo", "openai")
+
+
+def _scheduler(translator: Reverser, workers: int = 1, batch_chars: int = 4200) -> TranslationScheduler:
+    return TranslationScheduler(lambda locale: [translator], workers, {}, batch_chars=batch_chars)
+
+
+def test_pack_round_trip() -> list[str]:
+    failures: list[str] = []
+    segments = ["A title", "An excerpt\nover two lines", "Summary: [link](https://x.test)"]
+    packed = pack_segments(segments)
+    if unpack_segments(packed, 3) != segments:
+        failures.append(f"round trip: {unpack_segments(packed, 3)}")
+    mangled = packed.replace("⟦1⟧\n", "⟦ 1 ⟧ ").replace("⟦2⟧", "[[2]]")
+    if unpack_segments(mangled, 3) != segments:
+        failures.append("spacing/bracket variants not accepted")
+    for label, bad in (
+        ("lost marker", packed.replace("⟦1⟧", "")),
+        ("repeated marker", packed.replace("⟦2⟧", "⟦1⟧")),
+        ("emptied segment", packed.replace("A title", "")),
+        ("wrong count", packed + "\n\n⟦3⟧\nextra"),
+        ("leading text", "Note: " + packed),
+    ):
+        if unpack_segments(bad, 3) is not None:
+            failures.append(f"{label} accepted")
+    return failures
+
+
+def test_packing_cuts_requests() -> list[str]:
+    failures: list[str] = []
+    jobs = [ChunkJob(locale, f"title number {i}") for locale in ("es", "de") for i in range(60)]
+    jobs.append(ChunkJob("es", "long body " * (SEGMENT_CHARS // 9)))
+    batches, singles = batch_jobs(jobs, lambda j: j.chunk, lambda j: j.locale, 400)
+    if any(len({j.locale for j in batch}) != 1 or len(pack_segments([j.chunk for j in batch])) > 400 for batch in batches):
+        failures.append("batch mixes locales or exceeds --batch-chars")
+    if [j for j in singles] != [jobs[-1]]:
+        failures.append(f"unexpected single jobs: {len(singles)}")
+
+    runs = []
+    for workers in (1, 4):
+        translator = Reverser()
+        results = _scheduler(translator, workers).run(jobs)
+        if len(translator.calls) > len(jobs) // 10:
+            failures.append(f"workers={workers}: {len(translator.calls)} requests for {len(jobs)} chunks")
+        runs.append({job: result.text for job, result in results.items()})
+    if runs[0] != runs[1] or runs[0][ChunkJob("de", "title number 7")] != "eltit rebmun 7":
+        failures.append("batched results differ between worker counts or from the chunks")
+    return failures
+
+
+def test_misaligned_and_untranslated_fallback() -> list[str]:
+    failures: list[str] = []
+    jobs = [ChunkJob("es", f"excerpt {i}") for i in range(5)]
+    translator = DropsMarker()
+    scheduler = _scheduler(translator)
+    results = scheduler.run(jobs)
+    if len(translator.calls) != 6 or any(results[j].text != _reversed_words(j.chunk) for j in jobs):
+        failures.append(f"misaligned batch: {len(translator.calls)} calls")
+    if scheduler.stats["DropsMarker"].misaligned != 1:
+        failures.append("misaligned batch not counted")
+
+    jobs = [ChunkJob("es", "openai"), ChunkJob("es", "hello there")]
+    translator = KeepsNames()
+    results = _scheduler(translator).run(jobs)
+    if translator.calls[1:] != ["openai"] or results[jobs[1]].text != "olleh ereht":
+        failures.append(f"untranslated segment retry: {translator.calls}")
+    if results[jobs[0]].translated:
+        failures.append("unchanged segment marked translated")
+    return failures
+
+
+def main() -> int:
+    all_failures: list[str] = []
+
+    tests = [
+        ("pack_round_trip", test_pack_round_trip),
+        ("packing_cuts_requests", test_packing_cuts_requests),
+        ("misaligned_and_untranslated_fallback", test_misaligned_and_untranslated_fallback),
+    ]
+
+    for name, test_fn in tests:
+        failures = test_fn()
+        if failures:
+            print(f"FAIL: {name}")
+            for f in failures:
+                print(f"  - {f}")
+            all_failures.extend(failures)
+        else:
+            print(f"PASS: {name}")
+
+    if all_failures:
+        print(f"\n{len(all_failures)} failure(s) total.")
+        return 1
+
+    print(f"\nAll {len(tests)} tests passed.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
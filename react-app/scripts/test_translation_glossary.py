@@ -4,68 +4,33 @@
 Validates that:
 1. The glossary file loads and has the expected structure.
 2. Heading overrides replace ambiguous terms correctly before MT.
-3. Forbidden-sense validation catches known mistranslations.
-4. Locale cache files (when present) don't contain forbidden-sense headings.
+3. Forbidden-sense validation catches known mistranslations, and post-MT heading
+   corrections replace them.
+4. Locale cache files (when present) don't contain forbidden-sense headings
+   (only the locales with forbidden senses are read, straight from the JSON).
 
-Self-contained: does not import generate_locale_translations (avoids deep_translator dependency).
+Exercises the shared matcher in translation_glossary.py (stdlib-only, so no
+deep_translator dependency).
 """
 
 from __future__ import annotations
 
 import json
-import re
 import sys
 from pathlib import Path
 
+import pipeline_profile
+from translation_glossary import GLOSSARY_PATH, load_glossary
+
 ROOT = Path(__file__).resolve().parents[1]
 CACHE_DIR = ROOT / "cache"
-GLOSSARY_PATH = ROOT / "src" / "content" / "posts" / "translation_glossary.json"
 
 
-def _load_glossary() -> dict:
-    if not GLOSSARY_PATH.exists():
-        return {}
-    return json.loads(GLOSSARY_PATH.read_text(encoding="utf-8"))
-
-
-def _apply_heading_overrides(text: str, locale: str) -> str:
-    """Mirror of the function in generate_locale_translations.py."""
-    glossary = _load_glossary()
-    overrides = glossary.get("heading_overrides", {})
-    if not overrides:
-        return text
-    lines = text.split("\n")
-    result: list[str] = []
-    for line in lines:
-        stripped = line.lstrip()
-        if stripped.startswith("#"):
-            heading_text = stripped.lstrip("#").strip()
-            heading_lower = heading_text.lower()
-            for en_phrase, locale_map in overrides.items():
-                if en_phrase.lower() in heading_lower and locale in locale_map:
-                    pattern = re.compile(re.escape(en_phrase), re.IGNORECASE)
-                    line = pattern.sub(locale_map[locale], line)
-        result.append(line)
-    return "\n".join(result)
-
-
-def _validate_forbidden_senses(translated: str, locale: str, context: str = "") -> list[str]:
-    """Mirror of the function in generate_locale_translations.py."""
-    glossary = _load_glossary()
-    forbidden = glossary.get("forbidden_senses", {})
-    warnings: list[str] = []
-    for en_term, locale_map in forbidden.items():
-        if not isinstance(locale_map, dict) or locale not in locale_map:
-            continue
-        for bad_translation in locale_map[locale]:
-            pattern = re.compile(r"\b" + re.escape(bad_translation) + r"\b", re.IGNORECASE)
-            if pattern.search(translated):
-                ctx = f" (in: {context})" if context else ""
-                warnings.append(
-                    f"[{locale}] Possible wrong-sense translation for '{en_term}': "
-                    f"found '{bad_translation}' in heading{ctx}"
-                )
-    return warnings
+def _validate_forbidden_senses(translated: str, locale: str) -> list[str]:
+    return [
+        f"[{locale}] Possible wrong-sense translation for '{en_term}': found '{bad}'"
+        for en_term, bad in load_glossary(GLOSSARY_PATH).forbidden_in(translated, locale)
+    ]
 
 
 def test_glossary_loads() -> list[str]:
@@ -104,7 +69,7 @@ def test_heading_override_rousseau() -> list[str]:
         ("## The Fall", "fr", "chute", "automne"),
     ]
     for source, locale, expected_fragment, forbidden_fragment in test_cases:
-        result = _apply_heading_overrides(source, locale)
+        result = load_glossary(GLOSSARY_PATH).override_headings(source, locale)
         if expected_fragment.lower() not in result.lower():
             failures.append(
                 f"Heading override failed for [{locale}] '{source}': "
@@ -128,7 +93,7 @@ def test_heading_override_preserves_non_glossary() -> list[str]:
         "## The Rise of Technology",
     ]
     for source in unchanged_cases:
-        result = _apply_heading_overrides(source, "ca")
+        result = load_glossary(GLOSSARY_PATH).override_headings(source, "ca")
         if result != source:
             failures.append(
                 f"Non-glossary text was modified: '{source}' -> '{result}'"
@@ -166,51 +131,53 @@ def test_forbidden_sense_detection() -> list[str]:
     return failures
 
 
+def test_heading_corrections() -> list[str]:
+    """Forbidden senses in translated headings are replaced; other lines are left alone."""
+    failures: list[str] = []
+    glossary = load_glossary(GLOSSARY_PATH)
+    cases = [
+        ("## Rousseau: la tardor", "ca", "## Rousseau: la caiguda"),
+        ("## El Otoño de la humanidad", "es", "## la caída de la humanidad"),
+        ("### Herbst\nDer Herbst kommt.", "de", "### der Sündenfall\nDer Herbst kommt."),
+        ("## Rousseau: la tardor", "en", "## Rousseau: la tardor"),
+        ("## Introducción", "es", "## Introducción"),
+    ]
+    for source, locale, expected in cases:
+        result = glossary.correct_headings(source, locale)
+        if result != expected:
+            failures.append(f"[{locale}] correct_headings({source!r}) -> {result!r}, expected {expected!r}")
+    return failures
+
+
 def test_locale_caches_no_forbidden_headings() -> list[str]:
     """If locale cache files exist, scan headings for forbidden-sense translations."""
     failures: list[str] = []
-    glossary = _load_glossary()
-    forbidden = glossary.get("forbidden_senses", {})
-    if not forbidden:
+    glossary = load_glossary(GLOSSARY_PATH)
+    if not glossary.forbidden_senses:
         return failures
 
-    for locale_file in sorted(CACHE_DIR.glob("posts.*.json")):
-        locale = locale_file.stem.split(".")[-1]
-        if locale == "en" or locale == "json":
-            continue
-        try:
-            posts = json.loads(locale_file.read_text(encoding="utf-8"))
-        except Exception:
-            continue
-        if not isinstance(posts, list):
+    for locale in sorted(glossary.forbidden_locales()):
+        locale_file = CACHE_DIR / f"posts.{locale}.json"
+        if not locale_file.exists():
             continue
-        for post in posts:
+        posts = json.loads(locale_file.read_text(encoding="utf-8"))
+        pipeline_profile.count("files_read")
+        for post in posts if isinstance(posts, list) else []:
+            if not isinstance(post, dict):
+                continue
             slug = post.get("canonicalSlug") or post.get("slug") or "?"
             for field in ("title", "body"):
-                text = post.get(field) or ""
-                if not text:
-                    continue
-                heading_lines = [
-                    ln for ln in text.split("\n") if ln.lstrip().startswith("#")
-                ]
-                for hl in heading_lines:
-                    for en_term, locale_map in forbidden.items():
-                        if not isinstance(locale_map, dict) or locale not in locale_map:
-                            continue
-                        for bad in locale_map[locale]:
-                            pattern = re.compile(
-                                r"\b" + re.escape(bad) + r"\b", re.IGNORECASE
-                            )
-                            if pattern.search(hl):
-                                failures.append(
-                                    f"[{locale}] Cache {locale_file.name}: "
-                                    f"'{en_term}' wrong-sense '{bad}' in "
-                                    f"{slug}/{field}: {hl.strip()[:80]}"
-                                )
+                for en_term, bad, hl in glossary.forbidden_in_headings(post.get(field) or "", locale):
+                    failures.append(
+                        f"[{locale}] Cache {locale_file.name}: "
+                        f"'{en_term}' wrong-sense '{bad}' in "
+                        f"{slug}/{field}: {hl.strip()[:80]}"
+                    )
     return failures
 
 
 def main() -> int:
+    pipeline_profile.start("test_translation_glossary")
     all_failures: list[str] = []
 
     tests = [
@@ -218,11 +185,13 @@ def main() -> int:
         ("heading_override_rousseau", test_heading_override_rousseau),
         ("heading_override_preserves_non_glossary", test_heading_override_preserves_non_glossary),
         ("forbidden_sense_detection", test_forbidden_sense_detection),
+        ("heading_corrections", test_heading_corrections),
         ("locale_caches_no_forbidden_headings", test_locale_caches_no_forbidden_headings),
     ]
 
     for name, test_fn in tests:
-        failures = test_fn()
+        with pipeline_profile.stage(name):
+            failures = test_fn()
         if failures:
             print(f"FAIL: {name}")
             for f in failures:
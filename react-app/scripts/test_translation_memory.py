@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""Regression tests for the persistent translation memory (translation_memory.py).
+
+Validates that:
+1. A stored chunk survives reopening the file, and whitespace/normalization-only
+   differences in the source hit the same entry.
+2. Lookups try providers in fallback order and count hits and misses.
+3. prune() keeps entries whose source is still a chunk of a current post, or a
+   paragraph of one that was re-translated on its own after an edit, and drops the
+   rest.
+
+Self-contained: the memory lives in a temp dir; no translator is constructed.
+"""
+
+from __future__ import annotations
+
+import sys
+import tempfile
+from pathlib import Path
+
+from translation_memory import chunk_text, open_memory, source_keys
+from translation_paragraphs import live_keys, sync_field
+
+PROVIDERS = ["GoogleTranslator", "MyMemoryTranslator"]
+
+
+def test_entries_persist_and_normalize() -> list[str]:
+    failures: list[str] = []
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "tm.sqlite"
+        with open_memory(path) as memory:
+            memory.put("es", "GoogleTranslator", "Hello world.\nSecond line.", "Hola mundo.\nSegunda línea.")
+        with open_memory(path) as memory:
+            for variant in ("Hello world.\nSecond line.", "Hello world.  \r\nSecond line.\n", "\nHello world.\nSecond line."):
+                if memory.lookup("es", PROVIDERS, variant) != "Hola mundo.\nSegunda línea.":
+                    failures.append(f"no hit after reopen for {variant!r}")
+            if memory.lookup("ca", PROVIDERS, "Hello world.\nSecond line.") is not None:
+                failures.append("entry leaked across locales")
+            # Decomposed é must hit the composed entry.
+            memory.put("fr", "GoogleTranslator", "café", "café")
+            if memory.lookup("fr", PROVIDERS, "café") is None:
+                failures.append("NFD source missed the NFC entry")
+    return failures
+
+
+def test_provider_order_and_counters() -> list[str]:
+    failures: list[str] = []
+    with tempfile.TemporaryDirectory() as tmp:
+        with open_memory(Path(tmp) / "tm.sqlite") as memory:
+            memory.put("de", "MyMemoryTranslator", "The fall", "Der Fall")
+            if memory.lookup("de", PROVIDERS, "The fall") != "Der Fall":
+                failures.append("fallback provider entry not found")
+            memory.put("de", "GoogleTranslator", "The fall", "Der Sündenfall")
+            if memory.lookup("de", PROVIDERS, "The fall") != "Der Sündenfall":
+                failures.append("first provider did not win")
+            memory.lookup("de", PROVIDERS, "Unseen text")
+            if (memory.hits, memory.misses) != (2, 1):
+                failures.append(f"counters: {memory.hits} hits, {memory.misses} misses")
+            stats = memory.stats()
+            if stats != {
+                "GoogleTranslator": {"entries": 1, "source_chars": 8},
+                "MyMemoryTranslator": {"entries": 1, "source_chars": 8},
+            }:
+                failures.append(f"stats: {stats}")
+    return failures
+
+
+def test_prune_keeps_live_chunks() -> list[str]:
+    failures: list[str] = []
+    long_body = "\n\n".join(f"Paragraph {i}. " + "word " * 300 for i in range(6))
+    chunks = chunk_text(long_body)
+    if len(chunks) < 2:
+        return [f"expected a multi-chunk body, got {len(chunks)} chunk(s)"]
+    with tempfile.TemporaryDirectory() as tmp:
+        with open_memory(Path(tmp) / "tm.sqlite") as memory:
+            for chunk in chunks:
+                memory.put("es", "GoogleTranslator", chunk, chunk.upper())
+            memory.put("es", "GoogleTranslator", "Old title", "Título viejo")
+            memory.put("ca", "GoogleTranslator", "Old title", "Títol vell")
+            pruned = memory.prune(source_keys([long_body, "New title", ""]))
+            if pruned != 2:
+                failures.append(f"pruned {pruned} entries, expected 2")
+            if memory.lookup("es", PROVIDERS, "Old title") is not None:
+                failures.append("stale entry survived prune")
+            if any(memory.lookup("es", PROVIDERS, chunk) is None for chunk in chunks):
+                failures.append("live chunk was pruned")
+
+        # An edited paragraph is sent (and stored) on its own, not as part of the body.
+        with open_memory(Path(tmp) / "edit.sqlite") as memory:
+            old_body, new_body = "First paragraph.\n\nSecond paragraph.", "First paragraph.\n\nSecond, edited."
+
+            def translate(text: str) -> str:
+                memory.put("es", "GoogleTranslator", text, f"[es] {text}")
+                return f"[es] {text}"
+
+            prior, prior_fps = sync_field(old_body, "", None, translate)
+            sync_field(new_body, prior, prior_fps, translate)
+            pruned = memory.prune(live_keys([new_body]))
+            if pruned != 1:
+                failures.append(f"pruned {pruned} entries after a paragraph edit, expected 1 (the old body)")
+            if memory.lookup("es", PROVIDERS, "Second, edited.") is None:
+                failures.append("re-translated paragraph was pruned")
+    return failures
+
+
+def main() -> int:
+    all_failures: list[str] = []
+
+    tests = [
+        ("entries_persist_and_normalize", test_entries_persist_and_normalize),
+        ("provider_order_and_counters", test_provider_order_and_counters),
+        ("prune_keeps_live_chunks", test_prune_keeps_live_chunks),
+    ]
+
+    for name, test_fn in tests:
+        failures = test_fn()
+        if failures:
+            print(f"FAIL: {name}")
+            for f in failures:
+                print(f"  - {f}")
+            all_failures.extend(failures)
+        else:
+            print(f"PASS: {name}")
+
+    if all_failures:
+        print(f"\n{len(all_failures)} failure(s) total.")
+        return 1
+
+    print(f"\nAll {len(tests)} tests passed.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
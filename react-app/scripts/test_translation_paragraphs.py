@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""Regression tests for paragraph-level re-translation (translation_paragraphs.py).
+
+Validates that:
+1. Editing one English paragraph re-sends only that paragraph; the other
+   paragraphs keep their (possibly hand-edited) translation.
+2. Inserted paragraphs are translated and spliced in place; removed ones are dropped.
+3. Entries without fingerprints keep the old rule (prior translation kept) and are
+   adopted when their paragraph count matches the source.
+4. A paragraph that came back untranslated is retried on the next run.
+
+Self-contained: "translation" prefixes each paragraph with [es] and records its inputs.
+"""
+
+from __future__ import annotations
+
+import sys
+
+from translation_paragraphs import fingerprints, sync_field
+
+
+class _Recorder:
+    def __init__(self, untranslated: tuple[str, ...] = ()) -> None:
+        self.sent: list[str] = []
+        self.untranslated = untranslated
+
+    def __call__(self, text: str) -> str:
+        self.sent.append(text)
+        if text in self.untranslated:
+            return text
+        return "\n\n".join(f"[es] {p}" for p in text.split("\n\n"))
+
+
+SOURCE = "First paragraph.\n\nSecond paragraph.\n\nThird paragraph."
+
+
+def test_edit_resends_one_paragraph() -> list[str]:
+    failures: list[str] = []
+    translate = _Recorder()
+    value, fps = sync_field(SOURCE, "", None, translate)
+    if translate.sent != [SOURCE] or fps != fingerprints(SOURCE):
+        failures.append(f"initial translation: sent {translate.sent}, fingerprints {fps}")
+    hand_edited = value.replace("First", "First (reviewed)")
+
+    edited = SOURCE.replace("Second paragraph.", "Second paragraph, revised.")
+    translate = _Recorder()
+    value, fps = sync_field(edited, hand_edited, fps, translate)
+    if translate.sent != ["Second paragraph, revised."]:
+        failures.append(f"edit re-sent {translate.sent}")
+    if value != "[es] First (reviewed) paragraph.\n\n[es] Second paragraph, revised.\n\n[es] Third paragraph.":
+        failures.append(f"spliced value: {value!r}")
+    if fps != fingerprints(edited):
+        failures.append("fingerprints not updated to the edited source")
+
+    translate = _Recorder()
+    if sync_field(edited, value, fps, translate) != (value, fps) or translate.sent:
+        failures.append("unchanged source was re-sent")
+    return failures
+
+
+def test_insert_and_delete_splice() -> list[str]:
+    failures: list[str] = []
+    prior, fps = sync_field(SOURCE, "", None, _Recorder())
+    changed = "New opening.\n\nFirst paragraph.\n\nThird paragraph."
+    translate = _Recorder()
+    value, new_fps = sync_field(changed, prior, fps, translate)
+    if translate.sent != ["New opening."]:
+        failures.append(f"insert/delete re-sent {translate.sent}")
+    if value != "[es] New opening.\n\n[es] First paragraph.\n\n[es] Third paragraph." or new_fps != fingerprints(changed):
+        failures.append(f"insert/delete result: {value!r}")
+    # A translated paragraph must not introduce a paragraph break of its own.
+    value, _ = sync_field("Two\n\nlines.\n\nEnd.", "A\n\nB", fingerprints("Two\n\nthings."), lambda t: "X\n\nY")
+    if value.count("\n\n") != 2:
+        failures.append(f"paragraph break leaked from translation: {value!r}")
+    return failures
+
+
+def test_legacy_entries() -> list[str]:
+    failures: list[str] = []
+    translate = _Recorder()
+    value, fps = sync_field(SOURCE, "Primer.\n\nSegundo.\n\nTercero.", None, translate)
+    if translate.sent or value != "Primer.\n\nSegundo.\n\nTercero." or fps != fingerprints(SOURCE):
+        failures.append(f"aligned legacy entry: sent {translate.sent}, fingerprints {fps}")
+    value, fps = sync_field(SOURCE, "Todo en un párrafo.", None, translate)
+    if translate.sent or value != "Todo en un párrafo." or fps is not None:
+        failures.append("misaligned legacy entry was not kept as-is")
+    value, fps = sync_field("", "Posdata manual.", None, translate)
+    if translate.sent or value != "Posdata manual.":
+        failures.append("prior translation of an empty source was dropped")
+    return failures
+
+
+def test_untranslated_paragraph_is_retried() -> list[str]:
+    failures: list[str] = []
+    value, fps = sync_field(SOURCE, "", None, _Recorder(untranslated=(SOURCE,)))
+    if value != SOURCE:
+        failures.append("expected the untranslated source back")
+    # Nothing translated yet: the next run sends the whole field again.
+    translate = _Recorder()
+    value, fps = sync_field(SOURCE, value, fps, translate)
+    if translate.sent != [SOURCE]:
+        failures.append(f"untranslated field not retried: {translate.sent}")
+
+    partial = "PRIMERO.\n\nSecond paragraph.\n\nTERCERO."
+    _, fps = sync_field(SOURCE, partial, None, _Recorder())
+    if not fps or fps[1] != "" or "" in (fps[0], fps[2]):
+        failures.append(f"untranslated paragraph not marked: {fps}")
+    translate = _Recorder()
+    value, fps = sync_field(SOURCE, partial, fps, translate)
+    if translate.sent != ["Second paragraph."] or value != "PRIMERO.\n\n[es] Second paragraph.\n\nTERCERO.":
+        failures.append(f"untranslated paragraph retry: sent {translate.sent}, value {value!r}")
+    if fps != fingerprints(SOURCE):
+        failures.append("retried paragraph not fingerprinted")
+    return failures
+
+
+def main() -> int:
+    all_failures: list[str] = []
+
+    tests = [
+        ("edit_resends_one_paragraph", test_edit_resends_one_paragraph),
+        ("insert_and_delete_splice", test_insert_and_delete_splice),
+        ("legacy_entries", test_legacy_entries),
+        ("untranslated_paragraph_is_retried", test_untranslated_paragraph_is_retried),
+    ]
+
+    for name, test_fn in tests:
+        failures = test_fn()
+        if failures:
+            print(f"FAIL: {name}")
+            for f in failures:
+                print(f"  - {f}")
+            all_failures.extend(failures)
+        else:
+            print(f"PASS: {name}")
+
+    if all_failures:
+        print(f"\n{len(all_failures)} failure(s) total.")
+        return 1
+
+    print(f"\nAll {len(tests)} tests passed.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""Regression tests for Markdown placeholder protection (translation_placeholders.py).
+
+Validates that:
+1. Code, images, link targets, URLs and HTML are masked and restored byte for byte,
+   also after MT adds spaces inside placeholders or between "]" and a link target.
+2. A lost, repeated or invented placeholder fails the round trip.
+3. Glossary heading phrases restore to the locale's canonical translation, only as
+   whole words and only on heading lines.
+4. The scheduler sends masked text, falls back to the raw chunk when a provider
+   breaks a placeholder, and does not send chunks with nothing to translate.
+
+Self-contained: translators are small local classes; the glossary is inline.
+"""
+
+from __future__ import annotations
+
+import re
+import sys
+
+from translation_glossary import Glossary
+from translation_placeholders import needs_translation, protect, restore
+from translation_scheduler import ChunkJob, TranslationScheduler
+
+BODY = """## Setup
+
+Run `npm install` first, then see [the docs](https://example.com/docs "Docs") or <https://x.test/a>.
+
+![Diagram of the loop](/images/loop.png)
+
+```python
+print("do not translate me")
+```
+
+More at https://github.com/org/repo/issues/12. Line<br>break.
+
+[ref]: https://example.com/ref"""
+
+GLOSSARY = Glossary({"heading_overrides": {"the state": {"es": "el Estado"}, "the fall": {"es": "la caída"}}})
+
+
+def _words_upper(text: str) -> str:
+    return re.sub(r"[a-z]+", lambda m: m.group(0).upper(), text)
+
+
+class Careless:
+    """Upper-cases words, spaces out placeholders and detaches link targets, as MT does."""
+
+    def __init__(self) -> None:
+        self.sent: list[str] = []
+
+    def translate(self, text: str) -> str:
+        self.sent.append(text)
+        return re.sub(r"\{\{(\d+)\}\}", r"{{ \1 }}", _words_upper(text)).replace("]{{", "] {{")
+
+
+class DropsPlaceholders(Careless):
+    def translate(self, text: str) -> str:
+        return re.sub(r"\{\{\s*\d+\s*\}\}", "", super().translate(text))
+
+
+def test_round_trip() -> list[str]:
+    failures: list[str] = []
+    masked = protect(BODY, "es")
+    for fragment in ("npm install", "https://", "/images/loop.png", "do not translate", "<br>", "[ref]:"):
+        if fragment in masked.text:
+            failures.append(f"{fragment!r} was sent to MT")
+    if "[the docs]" not in masked.text or "Setup" not in masked.text:
+        failures.append("translatable text was masked")
+    if len(masked.text) > len(BODY) / 2:
+        failures.append(f"masked text is {len(masked.text)} of {len(BODY)} chars")
+    if restore(masked.text, masked) != BODY:
+        failures.append("identity round trip changed the text")
+    restored = restore(Careless().translate(masked.text), masked)
+    if restored != _words_upper_outside(BODY, masked):
+        failures.append(f"MT-style round trip: {restored!r}")
+    return failures
+
+
+def _words_upper_outside(text: str, masked) -> str:
+    """What a perfect round trip of Careless gives: only unmasked words upper-cased."""
+    return restore(_words_upper(masked.text), masked) or ""
+
+
+def test_broken_placeholders_rejected() -> list[str]:
+    failures: list[str] = []
+    masked = protect("See `a` and `b`.", "es")
+    for label, bad in (
+        ("lost", "Ver {{0}}."),
+        ("repeated", "Ver {{0}} y {{0}}."),
+        ("invented", "Ver {{0}} y {{1}} {{2}}."),
+    ):
+        if restore(bad, masked) is not None:
+            failures.append(f"{label} placeholder accepted")
+    if restore("{{0}}", protect("plain text", "es")) is not None:
+        failures.append("placeholder invented in unmasked text accepted")
+    return failures
+
+
+def test_glossary_heading_terms() -> list[str]:
+    failures: list[str] = []
+    text = "## The State and the fall\n\nThe state of the art.\n\n## The statement"
+    masked = protect(text, "es", GLOSSARY)
+    if masked.spans != ("El Estado", "la caída"):
+        failures.append(f"glossary spans: {masked.spans}")
+    if restore(masked.text, masked) != "## El Estado and la caída\n\nThe state of the art.\n\n## The statement":
+        failures.append(f"glossary restore: {restore(masked.text, masked)!r}")
+    if protect(text, "ca", GLOSSARY).spans:
+        failures.append("phrase without an override for the locale was masked")
+    return failures
+
+
+def test_scheduler_masks_and_falls_back() -> list[str]:
+    failures: list[str] = []
+    translator = Careless()
+    jobs = [ChunkJob("es", BODY), ChunkJob("es", "```\ncode only\n```"), ChunkJob("es", "## The Fall")]
+    results = TranslationScheduler(lambda locale: [translator], 1, {}, glossary=GLOSSARY).run(jobs)
+    if len(translator.sent) != 1 or "https://" in translator.sent[0]:
+        failures.append(f"sent: {translator.sent}")
+    if results[jobs[0]].text != restore(_words_upper(protect(BODY, "es").text), protect(BODY, "es")):
+        failures.append("body not restored")
+    if results[jobs[1]].text != jobs[1].chunk or results[jobs[1]].provider is not None:
+        failures.append("code-only chunk was translated")
+    if (results[jobs[2]].text, results[jobs[2]].translated) != ("## La caída", True):
+        failures.append(f"glossary-only heading: {results[jobs[2]]}")
+
+    translator = DropsPlaceholders()
+    scheduler = TranslationScheduler(lambda locale: [translator], 1, {}, batch_chars=0)
+    result = scheduler.run([ChunkJob("es", "Open [docs](https://x.test) now")])[ChunkJob("es", "Open [docs](https://x.test) now")]
+    if translator.sent[1:] != ["Open [docs](https://x.test) now"] or scheduler.stats["DropsPlaceholders"].placeholder_mismatches != 1:
+        failures.append(f"fallback to the raw chunk: {translator.sent}")
+    if result.text != "OPEN [DOCS](HTTPS://X.TEST) NOW":
+        failures.append(f"fallback result: {result.text!r}")
+    if needs_translation(protect("![x](/a.png) `b` — 42", "es")):
+        failures.append("placeholder-only text needs translation")
+    return failures
+
+
+def main() -> int:
+    all_failures: list[str] = []
+
+    tests = [
+        ("round_trip", test_round_trip),
+        ("broken_placeholders_rejected", test_broken_placeholders_rejected),
+        ("glossary_heading_terms", test_glossary_heading_terms),
+        ("scheduler_masks_and_falls_back", test_scheduler_masks_and_falls_back),
+    ]
+
+    for name, test_fn in tests:
+        failures = test_fn()
+        if failures:
+            print(f"FAIL: {name}")
+            for f in failures:
+                print(f"  - {f}")
+            all_failures.extend(failures)
+        else:
+            print(f"PASS: {name}")
+
+    if all_failures:
+        print(f"\n{len(all_failures)} failure(s) total.")
+        return 1
+
+    print(f"\nAll {len(tests)} tests passed.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
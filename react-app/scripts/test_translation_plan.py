@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""Regression tests for translation planning and character budgets.
+
+Validates that:
+1. TranslationScheduler.admit() funds jobs in order (first provider with budget
+   left), run() defers the rest without calling anyone, and no provider is ever
+   sent more than its --budget, including retries; --plan does not charge chunks
+   that need no provider (a code block) to the budget, like run().
+2. generate_locale_translations.py --plan is read-only (no translation files, no
+   memory file), orders posts by --priority-slug, then published listed posts
+   newest first, and its JSON totals match what a run then sends.
+3. With a tight --budget a run translates the plan's funded chunks, most visible
+   post first, defers exactly the chunks the plan said, and the next --plan
+   shows only the deferred chunks as remaining work.
+4. A chunk every provider echoes back in English is not stored in the translation
+   memory, so the next run sends it to a provider again.
+
+Self-contained: the scheduler test uses local translators; the script tests copy
+the scripts into a temp tree and run them with --backend pseudo.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from translation_scheduler import ChunkJob, TranslationScheduler
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+
+
+class Tagger:
+    def __init__(self, name: str, fail: bool = False) -> None:
+        self.name = name
+        self.fail = fail
+        self.sent = 0
+
+    def translate(self, text: str) -> str:
+        self.sent += len(text)
+        if self.fail:
+            raise ConnectionError("503")
+        return f"[{self.name}] {text}"
+
+
+def test_budget_admission_and_cap() -> list[str]:
+    failures: list[str] = []
+    primary, fallback = Tagger("Primary"), Tagger("Fallback")
+    jobs = [ChunkJob("es", f"paragraph number {i}") for i in range(10)]  # 18 chars each
+    scheduler = TranslationScheduler(
+        lambda locale: [primary, fallback], 1, {}, batch_chars=0, budgets={"Primary": 60, "Fallback": 40}
+    )
+    funded, deferred = scheduler.admit(jobs, lambda locale: ["Primary", "Fallback"])
+    if funded != jobs[:5] or deferred != jobs[5:]:
+        failures.append(f"admit: {len(funded)} funded, {len(deferred)} deferred")
+    results = scheduler.run(jobs)
+    if [results[j].provider for j in jobs] != ["Primary"] * 3 + ["Fallback"] * 2 + [None] * 5:
+        failures.append(f"providers: {[results[j].provider for j in jobs]}")
+    if results[jobs[9]].text != jobs[9].chunk or scheduler.deferred != 5 or scheduler.untranslated != 5:
+        failures.append("deferred chunk was not left as English or not counted")
+    if not any("budget: 54 of 60 chars used" in line for line in scheduler.report()):
+        failures.append(f"budget line missing: {scheduler.report()}")
+
+    failing = Tagger("Primary", fail=True)
+    scheduler = TranslationScheduler(
+        lambda locale: [failing, Tagger("Fallback")], 1, {"Primary": 0}, batch_chars=0, budgets={"Primary": 25}
+    )
+    result = scheduler.run([ChunkJob("es", "short text")])[ChunkJob("es", "short text")]  # 10 chars: admitted
+    if failing.sent != 20 or scheduler.stats["Primary"].calls != 2 or result.provider != "Fallback":
+        failures.append(f"retries: {failing.sent} chars sent on a 25-char budget")
+    return failures
+
+
+def test_plan_budget_ignores_local_chunks() -> list[str]:
+    """A code-only chunk is resolved without a provider, so the plan must not charge it to the budget."""
+    failures: list[str] = []
+    with tempfile.TemporaryDirectory() as tmp:
+        app = _make_tree(Path(tmp))
+        posts = [
+            {"slug": "only", "title": "Agents", "body": "```\nprint('code only')\n```", "published": True}
+        ]
+        (app / "cache" / "posts.en.json").write_text(json.dumps(posts), encoding="utf-8")
+        # 12 titles of 6 chars, each plus its batch marker; the code blocks need no budget.
+        budget = ("--budget", f"PseudoPrimary={12 * (len('Agents') + 8)}", "--budget", "PseudoFallback=0")
+        plan = _plan(app, *budget)
+        if plan["totals"]["local_chunks"] != 12 or plan["totals"]["deferred_chunks"]:
+            failures.append(f"plan charged local chunks to the budget: {plan['totals']}")
+        out = _generate(app, *budget)
+        if "deferred by --budget" in out or "PseudoPrimary: 12 chunks" not in out:
+            failures.append(f"run does not match the plan:\n{out}")
+    return failures
+
+
+def _make_tree(root: Path) -> Path:
+    app = root / "react-app"
+    scripts = app / "scripts"
+    scripts.mkdir(parents=True)
+    for py in SCRIPT_DIR.glob("*.py"):
+        shutil.copy2(py, scripts / py.name)
+    posts = [
+        {
+            "slug": f"post-{i}",
+            "title": f"Post {i} about agents",
+            "excerpt": f"Excerpt {i}.",
+            "body": f"Memory paragraph {i}.\n\nSee [docs](https://example.com/{i}).\n\n```\ncode {i}\n```",
+            "published": i != 3,
+            "publishedDate": f"2026-0{i + 1}-01",
+        }
+        for i in range(5)
+    ]
+    posts[4]["excludeFromListing"] = True
+    (app / "cache").mkdir()
+    (app / "cache" / "posts.en.json").write_text(json.dumps(posts), encoding="utf-8")
+    (app / "src" / "content" / "posts").mkdir(parents=True)
+    return app
+
+
+def _generate(app: Path, *args: str) -> str:
+    proc = subprocess.run(
+        [sys.executable, "scripts/generate_locale_translations.py", "--backend", "pseudo", *args],
+        cwd=app,
+        capture_output=True,
+        text=True,
+        timeout=300,
+        env=dict(os.environ, PIPELINE_PROFILE="0"),
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"generate {' '.join(args)} failed:\n{proc.stdout}\n{proc.stderr}")
+    return proc.stdout
+
+
+def _plan(app: Path, *args: str) -> dict:
+    _generate(app, "--plan-json", str(app / "plan.json"), *args)
+    return json.loads((app / "plan.json").read_text(encoding="utf-8"))
+
+
+def test_plan_is_read_only_and_ordered() -> list[str]:
+    failures: list[str] = []
+    with tempfile.TemporaryDirectory() as tmp:
+        app = _make_tree(Path(tmp))
+        plan = _plan(app, "--priority-slug", "post-0")
+        posts = app / "src" / "content" / "posts"
+        if list(posts.glob("translations.*.json")) or (app / "data").exists():
+            failures.append("--plan wrote translations or created the memory")
+        order = list(plan["by_post"])
+        if order != ["post-0", "post-2", "post-1", "post-4", "post-3"]:
+            failures.append(f"priority order: {order}")
+        totals = plan["totals"]
+        # Per post and locale: title, excerpt, 3 body paragraphs in one chunk; the code block is masked.
+        if (totals["items"], totals["send_chunks"], totals["memory_hits"]) != (180, 180, 0):
+            failures.append(f"totals: {totals}")
+        item = plan["items"][0]
+        if (item["slug"], item["locale"], item["field"], item["segment"]) != ("post-0", "es", "title", 0):
+            failures.append(f"first item: {item}")
+        if totals["send_chars"] != sum(i["send_chars"] for i in plan["items"]):
+            failures.append("item send_chars do not add up to the total")
+
+        out = _generate(app, "--workers", "3")
+        if f"PseudoPrimary: {totals['send_chunks']} chunks, " not in out:
+            failures.append(f"run sent a different number of chunks than planned:\n{out}")
+        plan = _plan(app)
+        if plan["totals"]["send_chunks"] != 0 or plan["totals"]["memory_hits"] != 0:
+            failures.append(f"plan after a full run: {plan['totals']}")
+    return failures
+
+
+def test_budget_translates_most_visible_first() -> list[str]:
+    failures: list[str] = []
+    with tempfile.TemporaryDirectory() as tmp:
+        app = _make_tree(Path(tmp))
+        budget = ("--budget", "PseudoPrimary=1200", "--budget", "PseudoFallback=300")
+        plan = _plan(app, *budget)
+        deferred = plan["totals"]["deferred_chunks"]
+        if not 0 < deferred < plan["totals"]["send_chunks"]:
+            failures.append(f"budget does not bite: {plan['totals']}")
+        out = _generate(app, "--workers", "4", *budget)
+        if f"({deferred} deferred by --budget)" not in out:
+            failures.append(f"run deferred a different number of chunks than the plan's {deferred}:\n{out}")
+
+        es = json.loads((app / "src" / "content" / "posts" / "translations.es.json").read_text(encoding="utf-8"))
+        if es["post-2"]["title"] != "Póst 2 ábóút ágénts" or es["post-3"]["title"] != "Post 3 about agents":
+            failures.append("budget was not spent on the newest listed post first")
+
+        after = _plan(app)
+        if after["totals"]["send_chunks"] != deferred or after["totals"]["memory_hits"]:
+            failures.append(f"next plan: {after['totals']} (expected {deferred} chunks left)")
+        if "post-2" in after["by_post"]:
+            failures.append("newest listed post still has work left")
+    return failures
+
+
+def test_echoed_chunk_not_memorized() -> list[str]:
+    failures: list[str] = []
+    with tempfile.TemporaryDirectory() as tmp:
+        app = _make_tree(Path(tmp))
+        posts = json.loads((app / "cache" / "posts.en.json").read_text(encoding="utf-8"))
+        posts[0]["title"] = "Rhythm myths"  # no vowel for the pseudo backend to accent
+        (app / "cache" / "posts.en.json").write_text(json.dumps(posts), encoding="utf-8")
+        _generate(app)
+        plan = _plan(app)
+        titles = [i for i in plan["items"] if (i["slug"], i["field"]) == ("post-0", "title")]
+        if len(titles) != 12 or any(i["memory_hit"] or not i["send_chars"] for i in titles):
+            failures.append(f"echoed title was memorized or not retried: {titles[:2]}")
+        if plan["totals"]["send_chunks"] != 12:
+            failures.append(f"expected only the echoed title left, got {plan['totals']}")
+    return failures
+
+
+def main() -> int:
+    all_failures: list[str] = []
+
+    tests = [
+        ("budget_admission_and_cap", test_budget_admission_and_cap),
+        ("plan_budget_ignores_local_chunks", test_plan_budget_ignores_local_chunks),
+        ("plan_is_read_only_and_ordered", test_plan_is_read_only_and_ordered),
+        ("budget_translates_most_visible_first", test_budget_translates_most_visible_first),
+        ("echoed_chunk_not_memorized", test_echoed_chunk_not_memorized),
+    ]
+
+    for name, test_fn in tests:
+        failures = test_fn()
+        if failures:
+            print(f"FAIL: {name}")
+            for f in failures:
+                print(f"  - {f}")
+            all_failures.extend(failures)
+        else:
+            print(f"PASS: {name}")
+
+    if all_failures:
+        print(f"\n{len(all_failures)} failure(s) total.")
+        return 1
+
+    print(f"\nAll {len(tests)} tests passed.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
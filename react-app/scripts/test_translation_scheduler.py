@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""Regression tests for the concurrent translation scheduler (translation_scheduler.py).
+
+Validates that:
+1. TokenBucket spaces calls at its rate after the burst, and an error pauses the
+   provider for a backoff that doubles per error and halves per success.
+2. Results do not depend on --workers: 1 worker and 6 workers give the same
+   (locale, chunk) translations, and on_result always runs in the calling thread.
+3. Errors are retried on the same provider before falling back to the next one,
+   and an unchanged candidate is not counted as translated.
+
+Self-contained: translators are small local classes; time is a fake clock.
+"""
+
+from __future__ import annotations
+
+import random
+import sys
+import threading
+import time
+
+from translation_scheduler import ChunkJob, TokenBucket, TranslationScheduler
+
+
+class _FakeClock:
+    def __init__(self) -> None:
+        self.now = 100.0
+        self.lock = threading.Lock()
+
+    def __call__(self) -> float:
+        with self.lock:
+            return self.now
+
+    def sleep(self, seconds: float) -> None:
+        with self.lock:
+            self.now += seconds
+
+
+def _buckets(clock: _FakeClock):
+    return lambda rate: TokenBucket(rate, burst=1, clock=clock, sleep=clock.sleep)
+
+
+class Reverser:
+    def __init__(self, locale: str) -> None:
+        self.locale = locale
+
+    def translate(self, text: str) -> str:
+        time.sleep(random.random() / 500)
+        return f"{self.locale}:{text[::-1]}"
+
+
+class Flaky:
+    def __init__(self, failures: int) -> None:
+        self.failures = failures
+
+    def translate(self, text: str) -> str:
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("429 Too Many Requests")
+        return f"flaky:{text}"
+
+
+class Echo:
+    def translate(self, text: str) -> str:
+        return text
+
+
+def test_token_bucket_rate_and_backoff() -> list[str]:
+    failures: list[str] = []
+    clock = _FakeClock()
+    bucket = TokenBucket(2.0, burst=1, clock=clock, sleep=clock.sleep)
+    waits = [round(bucket.acquire(), 3) for _ in range(3)]
+    if waits != [0.0, 0.5, 0.5]:
+        failures.append(f"rate 2/s waits: {waits}")
+    bucket.penalize()
+    bucket.penalize()
+    if bucket.backoff_s != 2.0:
+        failures.append(f"backoff after two errors: {bucket.backoff_s}")
+    if round(bucket.acquire(), 3) != 2.0:
+        failures.append("penalized bucket did not pause")
+    bucket.relax()
+    bucket.relax()
+    if bucket.backoff_s != 0.0:
+        failures.append(f"backoff after two successes: {bucket.backoff_s}")
+    unlimited = TokenBucket(0.0, clock=clock, sleep=clock.sleep)
+    if any(unlimited.acquire() for _ in range(50)):
+        failures.append("rate 0 was limited")
+    return failures
+
+
+def test_results_independent_of_workers() -> list[str]:
+    failures: list[str] = []
+    jobs = [ChunkJob(locale, f"chunk {i}") for locale in ("es", "de", "fr") for i in range(40)]
+    jobs += jobs[:10]  # duplicates are translated once
+    runs = []
+    for workers in (1, 6):
+        caller = threading.get_ident()
+        threads: set[int] = set()
+        scheduler = TranslationScheduler(
+            lambda locale: [Reverser(locale)], workers, {"Reverser": 0}, batch_chars=0
+        )
+        results = scheduler.run(jobs, lambda job, result: threads.add(threading.get_ident()))
+        if threads != {caller}:
+            failures.append(f"workers={workers}: on_result ran outside the calling thread")
+        stats = scheduler.stats["Reverser"]
+        if (stats.calls, stats.chunks) != (120, 120):
+            failures.append(f"workers={workers}: {stats.calls} calls, {stats.chunks} chunks")
+        runs.append(results)
+    if runs[0] != runs[1]:
+        failures.append("concurrent results differ from the serial run")
+    if runs[0][ChunkJob("de", "chunk 7")].text != "de:7 knuhc":
+        failures.append("result assigned to the wrong job")
+    return failures
+
+
+def test_retry_and_fallback() -> list[str]:
+    failures: list[str] = []
+    clock = _FakeClock()
+    scheduler = TranslationScheduler(lambda locale: [Flaky(2), Reverser(locale)], 1, {}, _buckets(clock))
+    result = scheduler.run([ChunkJob("es", "hola")])[ChunkJob("es", "hola")]
+    if (result.text, result.provider, result.translated) != ("flaky:hola", "Flaky", True):
+        failures.append(f"retry: {result}")
+    if scheduler.stats["Flaky"].errors != 2 or clock.now - 100.0 != 3.0:
+        failures.append(f"retry backoff: {scheduler.stats['Flaky'].errors} errors, {clock.now - 100.0}s paused")
+
+    scheduler = TranslationScheduler(lambda locale: [Flaky(99), Reverser(locale)], 1, {}, _buckets(_FakeClock()))
+    result = scheduler.run([ChunkJob("es", "hola")])[ChunkJob("es", "hola")]
+    if result.provider != "Reverser" or scheduler.stats["Flaky"].calls != 3:
+        failures.append(f"fallback after repeated errors: {result}")
+
+    scheduler = TranslationScheduler(lambda locale: [Echo()], 1, {}, _buckets(_FakeClock()))
+    result = scheduler.run([ChunkJob("es", "OpenAI")])[ChunkJob("es", "OpenAI")]
+    if (result.text, result.provider, result.translated) != ("OpenAI", "Echo", False):
+        failures.append(f"unchanged candidate: {result}")
+    if scheduler.stats["Echo"].chunks or "Echo: 0 chunks" not in scheduler.report()[0]:
+        failures.append("unchanged candidate counted as translated")
+    return failures
+
+
+def main() -> int:
+    all_failures: list[str] = []
+
+    tests = [
+        ("token_bucket_rate_and_backoff", test_token_bucket_rate_and_backoff),
+        ("results_independent_of_workers", test_results_independent_of_workers),
+        ("retry_and_fallback", test_retry_and_fallback),
+    ]
+
+    for name, test_fn in tests:
+        failures = test_fn()
+        if failures:
+            print(f"FAIL: {name}")
+            for f in failures:
+                print(f"  - {f}")
+            all_failures.extend(failures)
+        else:
+            print(f"PASS: {name}")
+
+    if all_failures:
+        print(f"\n{len(all_failures)} failure(s) total.")
+        return 1
+
+    print(f"\nAll {len(tests)} tests passed.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,48 +1,36 @@
 #!/usr/bin/env python3
-"""Translate a single post slug into selected locales; merge into translations.<locale>.json."""
+"""Translate a single post slug into selected locales; merge into translations.<locale>.json.
+
+Chunk translations are shared with generate_locale_translations.py through the
+persistent translation memory (translation_memory.py); like there, only English
+paragraphs edited since the last run are re-translated (translation_paragraphs.py),
+and the chunks of all selected locales go through the same rate-limited concurrent
+scheduler (translation_scheduler.py).
+"""
 from __future__ import annotations
 
 import argparse
+import functools
 import json
 import re
 import sys
-import time
 from pathlib import Path
-
-from deep_translator import GoogleTranslator, MyMemoryTranslator
+from typing import Any, Callable
+
+import pipeline_profile
+from artifact_writer import write_json
+from translation_backends import LOCALE_TO_TRANSLATOR_LANG, make_translators
+from translation_backends import add_arguments as add_backend_arguments
+from translation_glossary import load_glossary_for_mt
+from translation_memory import TranslationMemory, chunk_text, open_memory, provider_name, source_chunks
+from translation_paragraphs import FINGERPRINTS_KEY, sync_field
+from translation_scheduler import ChunkJob, ChunkResult, TranslationScheduler, budgets_from_args, rates_from_args
+from translation_scheduler import add_arguments as add_scheduler_arguments
 
 ROOT = Path(__file__).resolve().parents[1]
 EN_CACHE_PATH = ROOT / "cache" / "posts.en.json"
 TRANSLATIONS_DIR = ROOT / "src" / "content" / "posts"
 
-LOCALE_TO_TRANSLATOR_LANG = {
-    "es": "es",
-    "ca": "ca",
-    "zh": "zh-CN",
-    "hi": "hi",
-    "ar": "ar",
-    "fr": "fr",
-    "pt": "pt",
-    "ru": "ru",
-    "bn": "bn",
-    "ur": "ur",
-    "id": "id",
-    "de": "de",
-}
-LOCALE_TO_MYMEMORY_LANG = {
-    "es": "es-ES",
-    "ca": "ca-ES",
-    "zh": "zh-CN",
-    "hi": "hi-IN",
-    "ar": "ar-SA",
-    "fr": "fr-FR",
-    "pt": "pt-PT",
-    "ru": "ru-RU",
-    "bn": "bn-IN",
-    "ur": "ur-PK",
-    "id": "id-ID",
-    "de": "de-DE",
-}
 FIELDS = ("title", "excerpt", "summary", "body", "postscript")
 
 
@@ -52,59 +40,88 @@ def fix_links(text: str) -> str:
     return re.sub(r"]\s+\(", "](", text)
 
 
-def chunk_text(text: str, max_chars: int = 4200) -> list[str]:
-    if len(text) <= max_chars:
-        return [text]
-    chunks: list[str] = []
-    current: list[str] = []
-    current_len = 0
-    for paragraph in text.split("\n\n"):
-        extra = len(paragraph) + (2 if current else 0)
-        if current and current_len + extra > max_chars:
-            chunks.append("\n\n".join(current))
-            current = [paragraph]
-            current_len = len(paragraph)
+def _sync_entry(post: dict, prior: dict, translate: Callable[[str], str]) -> dict[str, Any]:
+    prior_fingerprints = prior.get(FINGERPRINTS_KEY)
+    if not isinstance(prior_fingerprints, dict):
+        prior_fingerprints = {}
+    entry: dict[str, Any] = {}
+    entry_fingerprints: dict[str, list[str]] = {}
+    for field in FIELDS:
+        if field == "postscript":
+            source_value = ""
         else:
-            current.append(paragraph)
-            current_len += extra
-    if current:
-        chunks.append("\n\n".join(current))
-    return chunks
-
-
-def norm(value: str) -> str:
-    return " ".join(str(value or "").split()).strip().lower()
-
-
-def translate_text(
-    text: str, translators: list, cache: dict[str, str], delay_s: float
-) -> str:
-    source = (text or "").strip()
-    if not source:
-        return ""
-    if source in cache:
-        return cache[source]
-    translated_parts: list[str] = []
-    for chunk in chunk_text(source):
-        translated_chunk = chunk
-        for translator in translators:
-            if delay_s > 0:
-                time.sleep(delay_s)
-            try:
-                candidate = (translator.translate(chunk) or "").strip()
-            except Exception as exc:
-                print(f"  chunk translate err: {exc}", file=sys.stderr)
-                continue
-            if candidate and norm(candidate) != norm(chunk):
-                translated_chunk = candidate
-                break
-        translated_parts.append(translated_chunk)
-    translated = "\n\n".join(translated_parts)
-    cache[source] = translated
-    return translated
+            source_value = str(post.get(field) or "").strip()
+        value, field_fingerprints = sync_field(
+            source_value, str(prior.get(field) or ""), prior_fingerprints.get(field), translate
+        )
+        entry[field] = fix_links(value)
+        if field_fingerprints:
+            entry_fingerprints[field] = field_fingerprints
+    if prior.get("slug"):
+        entry["slug"] = prior.get("slug")
+    if isinstance(prior.get("alternativeSlugs"), list):
+        entry["alternativeSlugs"] = prior["alternativeSlugs"]
+    if entry_fingerprints:
+        entry[FINGERPRINTS_KEY] = entry_fingerprints
+    return entry
+
+
+def _translate_locales(
+    post: dict, slug: str, locales: list[str], memory: TranslationMemory, scheduler: TranslationScheduler
+) -> None:
+    existing: dict[str, dict[str, dict]] = {}
+    jobs: list[ChunkJob] = []
+    chunks: dict[tuple[str, str], str] = {}
+    for locale in locales:
+        out_path = TRANSLATIONS_DIR / f"translations.{locale}.json"
+        existing[locale] = {}
+        if out_path.exists():
+            loaded = json.loads(out_path.read_text(encoding="utf-8"))
+            if isinstance(loaded, dict):
+                existing[locale] = loaded
+        prior = existing[locale].get(slug)
+        texts: list[str] = []
+
+        def collect(text: str) -> str:
+            texts.append(text)
+            return text
+
+        _sync_entry(post, prior if isinstance(prior, dict) else {}, collect)
+        providers = [provider_name(t) for t in scheduler.make_translators(locale)]
+        for chunk in source_chunks(texts):
+            remembered = memory.lookup(locale, providers, chunk)
+            if remembered is None:
+                jobs.append(ChunkJob(locale, chunk))
+            else:
+                chunks[(locale, chunk)] = remembered
+
+    def remember(job: ChunkJob, result: ChunkResult) -> None:
+        text = result.text if result.translated else job.chunk
+        if result.translated and result.provider is not None:
+            memory.put(job.locale, result.provider, job.chunk, text)
+        chunks[(job.locale, job.chunk)] = text
+        print(f"{job.locale} chunk {len(chunks)}/{total} …", flush=True)
+
+    total = len(chunks) + len(jobs)
+    print(f"Translating {len(jobs)} chunks ({len(chunks)} from translation memory)", flush=True)
+    scheduler.run(jobs, remember)
+    for line in scheduler.report():
+        print(line)
+
+    for locale in locales:
+        out_path = TRANSLATIONS_DIR / f"translations.{locale}.json"
+        prior = existing[locale].get(slug)
+        existing[locale][slug] = _sync_entry(
+            post,
+            prior if isinstance(prior, dict) else {},
+            lambda text: "\n\n".join(chunks[(locale, c)] for c in chunk_text(text.strip())) if text.strip() else "",
+        )
+        status = "Wrote" if write_json(out_path, existing[locale]) else "Unchanged"
+        print(f"{status} {out_path}", flush=True)
 
 
 def main() -> None:
+    pipeline_profile.start("translate_one_slug_locales")
     parser = argparse.ArgumentParser()
     parser.add_argument("slug", help="Post slug")
     parser.add_argument(
@@ -115,65 +132,42 @@ def main() -> None:
     parser.add_argument(
         "--delay",
         type=float,
-        default=0.15,
-        help="Sleep between API calls (seconds)",
+        default=None,
+        help="Minimum seconds between calls to one provider (shorthand for --rate PROVIDER=1/DELAY)",
     )
+    add_scheduler_arguments(parser)
+    add_backend_arguments(parser)
     args = parser.parse_args()
     slug = args.slug
     if args.locales.strip():
         locales = [x.strip() for x in args.locales.split(",") if x.strip()]
     else:
         locales = list(LOCALE_TO_TRANSLATOR_LANG.keys())
+    for locale in [x for x in locales if x not in LOCALE_TO_TRANSLATOR_LANG]:
+        print(f"Skip unknown locale: {locale}", file=sys.stderr)
+        locales.remove(locale)
+    rates = rates_from_args(args)
+    if args.delay:
+        rates.update({name: 1 / args.delay for name in rates if name not in dict(args.rate)})
 
     posts = json.loads(EN_CACHE_PATH.read_text(encoding="utf-8"))
     post = next((p for p in posts if p.get("slug") == slug), None)
     if not post:
         raise SystemExit(f"Slug not found in EN cache: {slug}")
 
-    for locale in locales:
-        lang = LOCALE_TO_TRANSLATOR_LANG.get(locale)
-        if not lang:
-            print(f"Skip unknown locale: {locale}", file=sys.stderr)
-            continue
-        out_path = TRANSLATIONS_DIR / f"translations.{locale}.json"
-        existing: dict[str, dict] = {}
-        if out_path.exists():
-            loaded = json.loads(out_path.read_text(encoding="utf-8"))
-            if isinstance(loaded, dict):
-                existing = loaded
-
-        translators = [GoogleTranslator(source="en", target=lang)]
-        mymemory_target = LOCALE_TO_MYMEMORY_LANG.get(locale)
-        if mymemory_target:
-            translators.append(
-                MyMemoryTranslator(source="en-GB", target=mymemory_target)
-            )
-        text_cache: dict[str, str] = {}
-        prior = existing.get(slug, {}) if isinstance(existing.get(slug), dict) else {}
-        entry: dict[str, str] = {}
-        for field in FIELDS:
-            if field == "postscript":
-                source_value = ""
-            else:
-                source_value = str(post.get(field) or "").strip()
-            prior_value = str(prior.get(field) or "").strip()
-            if prior_value and norm(prior_value) != norm(source_value):
-                entry[field] = fix_links(prior_value)
-                continue
-            print(f"{locale} {field} …", flush=True)
-            entry[field] = fix_links(
-                translate_text(source_value, translators, text_cache, args.delay)
-            )
-        if prior.get("slug"):
-            entry["slug"] = prior.get("slug")
-        if isinstance(prior.get("alternativeSlugs"), list):
-            entry["alternativeSlugs"] = prior["alternativeSlugs"]
-        existing[slug] = entry
-        out_path.write_text(
-            json.dumps(existing, ensure_ascii=False, indent=2) + "\n",
-            encoding="utf-8",
+    with open_memory() as memory:
+        scheduler = TranslationScheduler(
+            functools.partial(make_translators, args=args),
+            args.workers,
+            rates,
+            log_errors=True,
+            batch_chars=args.batch_chars,
+            placeholders=args.placeholders,
+            glossary=load_glossary_for_mt(),
+            budgets=budgets_from_args(args),
         )
-        print(f"Wrote {out_path}", flush=True)
+        _translate_locales(post, slug, locales, memory, scheduler)
+        print(memory.summary())
 
 
 if __name__ == "__main__":
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""Translator backends for the MT scripts.
+
+A backend has a name (the provider key used by the translation memory, --rate and
+the scheduler's report) and translate(text) -> str, raising on failure:
+
+- DeepTranslatorBackend: a deep_translator class (GoogleTranslator,
+  MyMemoryTranslator), imported on first use so the scripts load without it.
+- PseudoBackend: deterministic offline stand-in. It accents vowels (so output
+  differs from the source but placeholders and batch markers survive), sleeps a
+  configurable latency and fails a configurable share of calls. Failures depend on
+  (seed, backend, text, attempt), not on thread timing, so a run is repeatable.
+
+make_translators(locale, args) builds a locale's chain (GoogleTranslator, then
+MyMemoryTranslator where it has the locale) for both MT scripts; provider_names()
+gives the same names without constructing anything (for memory lookups and --plan).
+
+--backend pseudo swaps the locale chains for PseudoPrimary (errors injected with
+--pseudo-error-rate) and PseudoFallback (never fails), which exercises rate limits,
+backoff, the circuit breaker and fallback without network access. It writes pseudo
+translations wherever the script writes, so run it on a copy of the tree
+(test_translation_backends.py does). Stdlib-only.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import importlib
+import time
+from typing import Callable
+
+BACKENDS = ("deep-translator", "pseudo")
+PSEUDO_PROVIDERS = ("PseudoPrimary", "PseudoFallback")
+LOCALE_TO_TRANSLATOR_LANG = {
+    "es": "es",
+    "ca": "ca",
+    "zh": "zh-CN",
+    "hi": "hi",
+    "ar": "ar",
+    "fr": "fr",
+    "pt": "pt",
+    "ru": "ru",
+    "bn": "bn",
+    "ur": "ur",
+    "id": "id",
+    "de": "de",
+}
+LOCALE_TO_MYMEMORY_LANG = {
+    "es": "es-ES",
+    "ca": "ca-ES",
+    "zh": "zh-CN",
+    "hi": "hi-IN",
+    "ar": "ar-SA",
+    "fr": "fr-FR",
+    "pt": "pt-PT",
+    "ru": "ru-RU",
+    "bn": "bn-IN",
+    "ur": "ur-PK",
+    "id": "id-ID",
+    "de": "de-DE",
+}
+_ACCENTS = str.maketrans("aeiouAEIOU", "áéíóúÁÉÍÓÚ")
+
+
+class DeepTranslatorBackend:
+    def __init__(self, provider: str, source: str, target: str) -> None:
+        self.name = provider
+        self._translator = getattr(importlib.import_module("deep_translator"), provider)(source=source, target=target)
+
+    def translate(self, text: str) -> str:
+        return self._translator.translate(text)
+
+
+class PseudoBackend:
+    def __init__(
+        self,
+        name: str,
+        locale: str,
+        latency_s: float = 0.0,
+        error_rate: float = 0.0,
+        seed: int = 0,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.name = name
+        self.locale = locale
+        self.latency_s = latency_s
+        self.error_rate = error_rate
+        self.seed = seed
+        self._sleep = sleep
+        self._attempts: dict[str, int] = {}
+
+    def _fails(self, text: str) -> bool:
+        if self.error_rate <= 0:
+            return False
+        attempt = self._attempts[text] = self._attempts.get(text, 0) + 1
+        digest = hashlib.sha256(f"{self.seed}\0{self.name}\0{self.locale}\0{attempt}\0{text}".encode()).digest()
+        return int.from_bytes(digest[:8], "big") / 2**64 < self.error_rate
+
+    def translate(self, text: str) -> str:
+        if self.latency_s > 0:
+            self._sleep(self.latency_s)
+        if self._fails(text):
+            raise RuntimeError(f"{self.name}: injected error")
+        return text.translate(_ACCENTS)
+
+
+def pseudo_backends(locale: str, args: argparse.Namespace) -> list[PseudoBackend]:
+    latency_s = args.pseudo_latency_ms / 1000
+    primary, fallback = PSEUDO_PROVIDERS
+    return [
+        PseudoBackend(primary, locale, latency_s, args.pseudo_error_rate, args.pseudo_seed),
+        PseudoBackend(fallback, locale, latency_s, 0.0, args.pseudo_seed),
+    ]
+
+
+def make_translators(locale: str, args: argparse.Namespace) -> list:
+    """The locale's translators in fallback order: Google, then MyMemory where it has the locale."""
+    if args.backend == "pseudo":
+        return pseudo_backends(locale, args)
+    translators = [DeepTranslatorBackend("GoogleTranslator", "en", LOCALE_TO_TRANSLATOR_LANG[locale])]
+    mymemory_target = LOCALE_TO_MYMEMORY_LANG.get(locale)
+    if mymemory_target:
+        translators.append(DeepTranslatorBackend("MyMemoryTranslator", "en-GB", mymemory_target))
+    return translators
+
+
+def provider_names(locale: str, args: argparse.Namespace) -> list[str]:
+    """Providers make_translators(locale, args) returns, in fallback order, without constructing them."""
+    if args.backend == "pseudo":
+        return list(PSEUDO_PROVIDERS)
+    return ["GoogleTranslator"] + (["MyMemoryTranslator"] if LOCALE_TO_MYMEMORY_LANG.get(locale) else [])
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--backend",
+        choices=BACKENDS,
+        default="deep-translator",
+        help="Translator backends (pseudo: offline stand-in for tests and benchmarks; run it on a copy of the tree)",
+    )
+    parser.add_argument("--pseudo-latency-ms", type=float, default=0.0, help="Latency of each pseudo call")
+    parser.add_argument(
+        "--pseudo-error-rate", type=float, default=0.0, help="Share of PseudoPrimary calls that fail (0-1)"
+    )
+    parser.add_argument("--pseudo-seed", type=int, default=0, help="Seed for pseudo error injection")
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""Pack small translation segments into one provider request.
+
+Titles, excerpts, summaries and single re-translated paragraphs are mostly well
+under 300 characters, so one request each wastes most of a provider call.
+TranslationScheduler packs such chunks (up to SEGMENT_CHARS each, same locale, in
+job order) into requests of at most --batch-chars characters:
+
+    ⟦0⟧
+    First title
+
+    ⟦1⟧
+    An excerpt…
+
+The numbered markers are not words, so MT passes them through. unpack_segments()
+accepts spacing changes and [[n]] for the brackets, but nothing else: if any
+marker is missing, duplicated or out of order, or a segment comes back empty, the
+whole batch is misaligned and its chunks are sent one by one as before.
+
+Providers with a smaller request limit than the batch (PROVIDER_MAX_CHARS) are
+skipped for batches; their fallback role is kept by the single calls. Stdlib-only.
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Callable, Sequence, TypeVar
+
+DEFAULT_BATCH_CHARS = 4200
+SEGMENT_CHARS = 2500
+PROVIDER_MAX_CHARS = {"GoogleTranslator": 5000, "MyMemoryTranslator": 500}
+# Characters a packed segment adds to a request: its marker (up to ⟦999⟧) and separators.
+MARKER_CHARS = 8
+
+_MARKER = "⟦{}⟧"
+_MARKER_SPLIT = re.compile(r"\s*(?:⟦|\[\[)\s*(\d+)\s*(?:⟧|\]\])\s*")
+
+Job = TypeVar("Job")
+
+
+def packable(chunk: str) -> bool:
+    return len(chunk) <= SEGMENT_CHARS and not _MARKER_SPLIT.search(chunk)
+
+
+def pack_segments(segments: Sequence[str]) -> str:
+    return "\n\n".join(f"{_MARKER.format(i)}\n{segment}" for i, segment in enumerate(segments))
+
+
+def unpack_segments(text: str, count: int) -> list[str] | None:
+    """The count segments of a translated batch, or None if it came back misaligned."""
+    parts = _MARKER_SPLIT.split(text or "")
+    if parts[0].strip() or len(parts) != 2 * count + 1:
+        return None
+    if [int(i) for i in parts[1::2]] != list(range(count)):
+        return None
+    segments = [segment.strip() for segment in parts[2::2]]
+    return segments if all(segments) else None
+
+
+def batch_jobs(
+    jobs: Sequence[Job], chunk_of: Callable[[Job], str], locale_of: Callable[[Job], str], max_chars: int
+) -> tuple[list[list[Job]], list[Job]]:
+    """(batches of 2+ packable jobs of one locale, jobs to send alone); deterministic in job order."""
+    if max_chars <= 0:
+        return [], list(jobs)
+    open_batches: dict[str, tuple[list[Job], int]] = {}
+    batches: list[list[Job]] = []
+    singles: list[Job] = []
+    for job in jobs:
+        chunk = chunk_of(job)
+        if not packable(chunk):
+            singles.append(job)
+            continue
+        current, used = open_batches.get(locale_of(job), ([], 0))
+        size = len(_MARKER.format(len(current))) + len(chunk) + 3
+        if current and used + size > max_chars:
+            batches.append(current)
+            current, used = [], 0
+        current.append(job)
+        open_batches[locale_of(job)] = (current, used + size)
+    batches.extend(current for current, _ in open_batches.values())
+    singles.extend(batch[0] for batch in batches if len(batch) == 1)
+    return [batch for batch in batches if len(batch) > 1], singles
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""Compiled matcher for src/content/posts/translation_glossary.json.
+
+The glossary lists polysemous English terms (heading_overrides: term -> locale ->
+canonical translation) and the per-locale translations that show MT picked the
+wrong sense (forbidden_senses: term -> locale -> [patterns]). The operations
+run over it, all on Markdown heading lines only:
+
+- override_headings(): before MT, replace English glossary phrases with the
+  canonical translation (case-insensitive substring). heading_phrase_spans()
+  finds the same phrases as whole words, for translation_placeholders.py to mask.
+- correct_headings(): after MT, replace forbidden senses with the canonical
+  translation (whole word, case-insensitive); used by rebuild_locale_post_caches.py.
+- forbidden_in_headings(): report forbidden senses left in a text; used by
+  smoke_i18n_locales.py and test_translation_glossary.py.
+
+Each locale's patterns are compiled once into a single alternation regex
+(longest pattern first). A text's heading lines are joined and searched with it
+once, so a clean post costs one search instead of lines x terms x patterns
+searches; only a hit goes line by line. Reports keep the per-(term, pattern)
+detail of the old nested loops.
+
+load_glossary() parses the file once per (mtime, size). bench_translation_glossary.py
+times the scan over every locale cache. Stdlib-only.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+ROOT = Path(__file__).resolve().parents[1]
+GLOSSARY_PATH = ROOT / "src" / "content" / "posts" / "translation_glossary.json"
+
+_WORD = re.compile(r"\w")
+
+# (term, pattern, replacement); replacement is None when the term has no override.
+_Entry = tuple[str, str, Optional[str]]
+
+
+def _locale_map(value: Any) -> dict[str, Any]:
+    return value if isinstance(value, dict) else {}
+
+
+def _alternation(patterns: list[str], word_bounded: bool) -> re.Pattern[str] | None:
+    """One capture group per pattern, in the given order; None when there are none."""
+    if not patterns:
+        return None
+    body = "|".join(f"({re.escape(p)})" for p in patterns)
+    return re.compile(rf"\b(?:{body})\b" if word_bounded else body, re.IGNORECASE)
+
+
+def _heading_lines(text: str) -> list[str]:
+    if "#" not in text:
+        return []
+    return [ln for ln in text.split("\n") if ln.lstrip().startswith("#")]
+
+
+def _sub_headings(text: str, pattern: re.Pattern[str], repl: Callable[[re.Match[str]], str]) -> str:
+    headings = _heading_lines(text)
+    if not headings or not pattern.search("\n".join(headings)):
+        return text
+    lines = text.split("\n")
+    for i, line in enumerate(lines):
+        if line.lstrip().startswith("#"):
+            lines[i] = pattern.sub(repl, line)
+    return "\n".join(lines)
+
+
+class _LocaleMatcher:
+    """Compiled patterns of one locale."""
+
+    def __init__(self, glossary: dict[str, Any], locale: str) -> None:
+        overrides = _locale_map(glossary.get("heading_overrides"))
+        forbidden = _locale_map(glossary.get("forbidden_senses"))
+
+        # English phrases replaced before MT.
+        phrases = [(en, str(m[locale])) for en, m in overrides.items() if locale in _locale_map(m)]
+        phrases.sort(key=lambda pr: len(pr[0]), reverse=True)
+        self.phrase_replacements = [repl for _, repl in phrases]
+        self.phrases = _alternation([en for en, _ in phrases], word_bounded=False)
+
+        # Post-MT forbidden senses, in glossary order for reports.
+        self.entries: list[_Entry] = []
+        for term, locale_map in forbidden.items():
+            patterns = _locale_map(locale_map).get(locale)
+            if not isinstance(patterns, list):
+                continue
+            repl = _locale_map(overrides.get(term)).get(locale)
+            for bad in patterns:
+                self.entries.append((term, str(bad), str(repl) if repl is not None else None))
+        self.singles = [re.compile(r"\b" + re.escape(bad) + r"\b", re.IGNORECASE) for _, bad, _ in self.entries]
+        self.forbidden = _alternation(
+            [bad for _, bad, _ in sorted(self.entries, key=lambda e: len(e[1]), reverse=True)], word_bounded=True
+        )
+
+        fixable = sorted((e for e in self.entries if e[2] is not None), key=lambda e: len(e[1]), reverse=True)
+        self.fix_replacements = [repl or "" for _, _, repl in fixable]
+        self.fixes = _alternation([bad for _, bad, _ in fixable], word_bounded=True)
+
+
+class Glossary:
+    """heading_overrides / forbidden_senses with per-locale compiled matchers."""
+
+    def __init__(self, data: dict[str, Any] | None = None) -> None:
+        self.data = data if isinstance(data, dict) else {}
+        self._matchers: dict[str, _LocaleMatcher] = {}
+
+    @property
+    def heading_overrides(self) -> dict[str, Any]:
+        return _locale_map(self.data.get("heading_overrides"))
+
+    @property
+    def forbidden_senses(self) -> dict[str, Any]:
+        return _locale_map(self.data.get("forbidden_senses"))
+
+    def forbidden_locales(self) -> set[str]:
+        """Locales with at least one forbidden-sense pattern."""
+        return {
+            loc
+            for locale_map in self.forbidden_senses.values()
+            for loc, patterns in _locale_map(locale_map).items()
+            if isinstance(patterns, list) and patterns
+        }
+
+    def _matcher(self, locale: str) -> _LocaleMatcher:
+        matcher = self._matchers.get(locale)
+        if matcher is None:
+            matcher = self._matchers[locale] = _LocaleMatcher(self.data, locale)
+        return matcher
+
+    def override_headings(self, text: str, locale: str) -> str:
+        """Replace English glossary phrases in heading lines with the locale's override."""
+        m = self._matcher(locale)
+        if not text or m.phrases is None:
+            return text
+        return _sub_headings(text, m.phrases, lambda hit: m.phrase_replacements[hit.lastindex - 1])
+
+    def heading_phrase_spans(self, text: str, locale: str) -> list[tuple[int, int, str]]:
+        """(start, end, override) of every English glossary phrase on a heading line."""
+        m = self._matcher(locale)
+        if not text or m.phrases is None or not _heading_lines(text):
+            return []
+        spans: list[tuple[int, int, str]] = []
+        offset = 0
+        for line in text.split("\n"):
+            if line.lstrip().startswith("#"):
+                for hit in m.phrases.finditer(line):
+                    # Whole words only: "the state" must not claim "The statement".
+                    if _WORD.match(line, hit.end()) or (hit.start() and _WORD.match(line, hit.start() - 1)):
+                        continue
+                    spans.append((offset + hit.start(), offset + hit.end(), m.phrase_replacements[hit.lastindex - 1]))
+            offset += len(line) + 1
+        return spans
+
+    def correct_headings(self, text: str, locale: str) -> str:
+        """Replace forbidden senses in heading lines with the term's override for locale."""
+        if locale == "en" or not text:
+            return text
+        m = self._matcher(locale)
+        if m.fixes is None:
+            return text
+        return _sub_headings(text, m.fixes, lambda hit: m.fix_replacements[hit.lastindex - 1])
+
+    def forbidden_in(self, text: str, locale: str) -> list[tuple[str, str]]:
+        """(term, pattern) for every forbidden sense found anywhere in text."""
+        m = self._matcher(locale)
+        if not text or m.forbidden is None or not m.forbidden.search(text):
+            return []
+        return [(term, bad) for (term, bad, _), single in zip(m.entries, m.singles) if single.search(text)]
+
+    def forbidden_in_headings(self, text: str, locale: str) -> list[tuple[str, str, str]]:
+        """(term, pattern, heading line) for every forbidden sense on a heading line."""
+        m = self._matcher(locale)
+        if not text or m.forbidden is None:
+            return []
+        headings = _heading_lines(text)
+        if not headings or not m.forbidden.search("\n".join(headings)):
+            return []
+        return [(term, bad, line) for line in headings for term, bad in self.forbidden_in(line, locale)]
+
+
+_cache: dict[Path, tuple[tuple[int, int], Glossary | ValueError]] = {}
+
+
+def load_glossary(path: Path = GLOSSARY_PATH) -> Glossary:
+    """Parsed and cached per (mtime_ns, size); empty when the file is missing.
+
+    Raises ValueError (also cached) when the file does not parse.
+    """
+    try:
+        st = path.stat()
+    except OSError:
+        return Glossary()
+    key = (st.st_mtime_ns, st.st_size)
+    hit = _cache.get(path)
+    if hit is None or hit[0] != key:
+        try:
+            value: Glossary | ValueError = Glossary(json.loads(path.read_text(encoding="utf-8")))
+        except (OSError, ValueError) as exc:
+            value = ValueError(f"Failed to load glossary {path}: {exc}")
+        hit = _cache[path] = (key, value)
+    if isinstance(hit[1], ValueError):
+        raise hit[1]
+    return hit[1]
+
+
+def load_glossary_for_mt(path: Path = GLOSSARY_PATH) -> Glossary | None:
+    """load_glossary() for the MT scripts: None, with a warning, when the file does not parse."""
+    try:
+        return load_glossary(path)
+    except ValueError as e:
+        print(f"WARNING: {e}; glossary terms are not protected")
+        return None
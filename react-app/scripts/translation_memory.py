@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""Persistent translation memory for the MT scripts (data/translation_memory.sqlite).
+
+generate_locale_translations.py and translate_one_slug_locales.py send each field to
+the translators in chunks (chunk_text). Every chunk translation is stored here under
+(locale, provider, sha256 of the normalized source chunk), so a re-run after a crash,
+or the same boilerplate in another post, is answered locally instead of by another
+provider call:
+
+- entries(locale, provider, key, source_chars, translation, created_at, used_at)
+
+Normalization (normalize_segment) only drops differences MT does not see: CRLF, NFC
+vs NFD, trailing spaces and surrounding blank lines. A lookup tries the providers in
+the caller's fallback order and the first stored translation wins. Hits refresh
+used_at; hit/miss counts are kept per process and fed to pipeline_profile.
+
+Unlike data/tmp/, this file is not derived data: losing it costs provider quota, so
+prune() (generate_locale_translations.py --prune-memory) only drops entries whose
+source no longer appears in any current post, as a whole-field chunk or as a single
+paragraph re-translated after an edit (translation_paragraphs.live_keys).
+
+    python3 scripts/translation_memory.py stats
+
+Stdlib-only.
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import hashlib
+import sqlite3
+import sys
+import time
+import unicodedata
+from pathlib import Path
+from typing import Iterable, Iterator
+
+import pipeline_profile
+
+ROOT = Path(__file__).resolve().parents[1]
+MEMORY_PATH = ROOT / "data" / "translation_memory.sqlite"
+SCHEMA_VERSION = 1
+MAX_CHUNK_CHARS = 4200
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS entries (
+    locale TEXT, provider TEXT, key TEXT, source_chars INTEGER, translation TEXT,
+    created_at INTEGER, used_at INTEGER,
+    PRIMARY KEY (locale, provider, key)
+);
+"""
+
+
+def chunk_text(text: str, max_chars: int = MAX_CHUNK_CHARS) -> list[str]:
+    """Split text on paragraph breaks into chunks of at most max_chars (longer paragraphs stay whole)."""
+    if len(text) <= max_chars:
+        return [text]
+    chunks: list[str] = []
+    current: list[str] = []
+    current_len = 0
+    for paragraph in text.split("\n\n"):
+        extra = len(paragraph) + (2 if current else 0)
+        if current and current_len + extra > max_chars:
+            chunks.append("\n\n".join(current))
+            current = [paragraph]
+            current_len = len(paragraph)
+        else:
+            current.append(paragraph)
+            current_len += extra
+    if current:
+        chunks.append("\n\n".join(current))
+    return chunks
+
+
+def normalize_segment(text: str) -> str:
+    text = unicodedata.normalize("NFC", str(text or "")).replace("\r\n", "\n").replace("\r", "\n")
+    return "\n".join(line.rstrip() for line in text.split("\n")).strip("\n")
+
+
+def norm_text(value: str) -> str:
+    """Whitespace- and case-folded text: equal for the source means MT left it untranslated."""
+    return " ".join(str(value or "").split()).strip().lower()
+
+
+def segment_key(text: str) -> str:
+    return hashlib.sha256(normalize_segment(text).encode("utf-8")).hexdigest()
+
+
+def source_chunks(texts: Iterable[str]) -> list[str]:
+    """Distinct chunks the translators would be sent for these source texts, in first-seen order."""
+    chunks: dict[str, None] = {}
+    for text in texts:
+        source = (text or "").strip()
+        if source:
+            chunks.update(dict.fromkeys(chunk_text(source)))
+    return list(chunks)
+
+
+def source_keys(texts: Iterable[str]) -> set[str]:
+    """Keys of every chunk the translators would be sent for these source texts."""
+    return {segment_key(chunk) for chunk in source_chunks(texts)}
+
+
+def provider_name(translator: object) -> str:
+    """A backend's name (translation_backends.py), else its class name."""
+    return getattr(translator, "name", None) or type(translator).__name__
+
+
+class TranslationMemory:
+    def __init__(self, conn: sqlite3.Connection) -> None:
+        self.conn = conn
+        self.hits = 0
+        self.misses = 0
+
+    def find(self, locale: str, providers: Iterable[str], source: str) -> tuple[str, str] | None:
+        """(provider, translation) that lookup() would return; no side effects (for planning)."""
+        key = segment_key(source)
+        for provider in providers:
+            row = self.conn.execute(
+                "SELECT translation FROM entries WHERE locale = ? AND provider = ? AND key = ?",
+                (locale, provider, key),
+            ).fetchone()
+            if row is not None:
+                return provider, row[0]
+        return None
+
+    def lookup(self, locale: str, providers: Iterable[str], source: str) -> str | None:
+        """Stored translation of source for locale, trying providers in order; counts a hit or miss."""
+        found = self.find(locale, providers, source)
+        if found is None:
+            self.misses += 1
+            pipeline_profile.count("translation_memory_misses")
+            return None
+        provider, translation = found
+        with self.conn:
+            self.conn.execute(
+                "UPDATE entries SET used_at = ? WHERE locale = ? AND provider = ? AND key = ?",
+                (int(time.time()), locale, provider, segment_key(source)),
+            )
+        self.hits += 1
+        pipeline_profile.count("translation_memory_hits")
+        return translation
+
+    def put(self, locale: str, provider: str, source: str, translation: str) -> None:
+        """Record a provider's translation of source; committed immediately so a crash keeps it."""
+        now = int(time.time())
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO entries (locale, provider, key, source_chars, translation, created_at, used_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (locale, provider, segment_key(source), len(source), translation, now, now),
+            )
+
+    def prune(self, live_keys: set[str]) -> int:
+        """Delete entries whose source is not in live_keys (see source_keys); returns how many."""
+        keys = [row[0] for row in self.conn.execute("SELECT DISTINCT key FROM entries")]
+        dead = [(k,) for k in keys if k not in live_keys]
+        if not dead:
+            return 0
+        with self.conn:
+            cur = self.conn.executemany("DELETE FROM entries WHERE key = ?", dead)
+        return max(cur.rowcount, 0)
+
+    def stats(self) -> dict[str, dict[str, int]]:
+        """{provider: {"entries", "source_chars"}} over all locales."""
+        rows = self.conn.execute(
+            "SELECT provider, COUNT(*), COALESCE(SUM(source_chars), 0) FROM entries GROUP BY provider ORDER BY provider"
+        )
+        return {provider: {"entries": n, "source_chars": chars} for provider, n, chars in rows}
+
+    def summary(self) -> str:
+        total = sum(s["entries"] for s in self.stats().values())
+        return f"Translation memory: {self.hits} hits, {self.misses} misses ({total} entries)"
+
+
+def _connect(path: Path) -> sqlite3.Connection:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(path, timeout=30)
+    with conn:
+        conn.executescript(_SCHEMA)
+        row = conn.execute("SELECT value FROM meta WHERE key = 'schema_version'").fetchone()
+        if row is None:
+            conn.execute("INSERT INTO meta (key, value) VALUES ('schema_version', ?)", (str(SCHEMA_VERSION),))
+        elif row[0] != str(SCHEMA_VERSION):
+            # Not derived data, so never silently wiped like the content store.
+            raise ValueError(f"{path} has schema version {row[0]}, expected {SCHEMA_VERSION}")
+    return conn
+
+
+@contextlib.contextmanager
+def open_memory(path: Path = MEMORY_PATH) -> Iterator[TranslationMemory]:
+    """Open (creating if needed) the translation memory."""
+    conn = _connect(path)
+    try:
+        yield TranslationMemory(conn)
+    finally:
+        conn.close()
+
+
+def main() -> int:
+    p = argparse.ArgumentParser(description="Inspect the persistent translation memory.")
+    p.add_argument("command", choices=("stats",))
+    p.add_argument("--path", type=Path, default=MEMORY_PATH, help=f"Memory file (default: {MEMORY_PATH})")
+    args = p.parse_args()
+    if not args.path.exists():
+        print(f"No translation memory at {args.path}")
+        return 0
+    with open_memory(args.path) as memory:
+        stats = memory.stats()
+    for provider, s in stats.items():
+        print(f"{provider:<20} {s['entries']:>7} entries {s['source_chars']:>10} source chars")
+    print(f"{'total':<20} {sum(s['entries'] for s in stats.values()):>7} entries")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
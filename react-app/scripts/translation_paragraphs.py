@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""Paragraph-level source fingerprints for translations.<locale>.json entries.
+
+Each translated entry carries, per field, the fingerprints of the English paragraphs
+its translation was made from:
+
+    "sourceFingerprints": {"body": ["3f2a…", "91c0…", …], "title": ["…"]}
+
+sync_field() compares them with the current English source (difflib over the
+fingerprint lists) and re-sends only paragraphs that were added or edited; unchanged
+paragraphs keep their existing translation, spliced in place, and removed ones are
+dropped. An edit to one English paragraph therefore costs one paragraph per locale
+instead of a whole body (or, as before, nothing: prior translations were kept forever).
+
+Alignment needs the translation to have one paragraph per fingerprint. Entries
+without fingerprints (written before this), or whose paragraph count no longer
+matches (hand-merged paragraphs), keep the old rule: a prior translation that
+differs from the English is kept. When its paragraph count matches the source it is
+adopted as current and fingerprinted, so the next edit is tracked.
+
+Paragraphs are blank-line separated blocks; fingerprints are truncated
+translation_memory.segment_key digests, so whitespace-only edits are not changes.
+A paragraph that came back from MT unchanged is stored with an empty fingerprint,
+so it is retried (usually from the translation memory) rather than trusted, unless
+it has nothing to translate (a code block, a lone URL; see translation_placeholders.py).
+Shared by generate_locale_translations.py and translate_one_slug_locales.py. Stdlib-only.
+"""
+
+from __future__ import annotations
+
+import difflib
+import re
+from typing import Callable, Iterable
+
+import pipeline_profile
+from translation_memory import norm_text, segment_key, source_keys
+from translation_placeholders import needs_translation, protect
+
+FINGERPRINTS_KEY = "sourceFingerprints"
+FINGERPRINT_CHARS = 16
+
+_PARAGRAPH_BREAK = re.compile(r"\n[ \t]*\n")
+
+
+def paragraphs(text: str) -> list[str]:
+    return [p.strip("\n") for p in _PARAGRAPH_BREAK.split(str(text or "").strip()) if p.strip()]
+
+
+def fingerprints(text: str) -> list[str]:
+    return [segment_key(p)[:FINGERPRINT_CHARS] for p in paragraphs(text)]
+
+
+def live_keys(texts: Iterable[str]) -> set[str]:
+    """Memory keys sync_field() may use for these source texts: whole-field chunks and single paragraphs."""
+    texts = list(texts)
+    return source_keys(texts) | source_keys(p for text in texts for p in paragraphs(text))
+
+
+def _one_paragraph(text: str) -> str:
+    # A paragraph must stay one paragraph, or the next alignment is off by one.
+    return _PARAGRAPH_BREAK.sub("\n", text.strip())
+
+
+def _stamp(current: list[str], source_paragraphs: list[str], translated_paragraphs: list[str]) -> list[str]:
+    """Fingerprints to store; a paragraph that came back untranslated gets "" so it is retried."""
+    return [
+        "" if norm_text(src) == norm_text(out) and needs_translation(protect(src, "")) else fp
+        for fp, src, out in zip(current, source_paragraphs, translated_paragraphs)
+    ]
+
+
+def sync_field(
+    source: str,
+    prior_value: str,
+    prior_fingerprints: object,
+    translate: Callable[[str], str],
+) -> tuple[str, list[str] | None]:
+    """(translation, fingerprints to store or None) for one field.
+
+    translate(text) translates one source text (whole field or one paragraph).
+    """
+    source = (source or "").strip()
+    prior_value = (prior_value or "").strip()
+    if not source:
+        return prior_value, None
+    source_paragraphs = paragraphs(source)
+    current = [segment_key(p)[:FINGERPRINT_CHARS] for p in source_paragraphs]
+    translated_prior = bool(prior_value) and norm_text(prior_value) != norm_text(source)
+
+    if translated_prior:
+        old = prior_fingerprints if isinstance(prior_fingerprints, list) else None
+        prior_paragraphs = paragraphs(prior_value)
+        if old is None or len(old) != len(prior_paragraphs):
+            # Unknown provenance: keep it, and adopt it when it lines up with the source.
+            if len(prior_paragraphs) != len(current):
+                return prior_value, None
+            return prior_value, _stamp(current, source_paragraphs, prior_paragraphs)
+        if old == current:
+            return prior_value, current
+        out: list[str] = []
+        matcher = difflib.SequenceMatcher(a=old, b=current, autojunk=False)
+        for op, a0, a1, b0, b1 in matcher.get_opcodes():
+            if op == "equal":
+                out.extend(prior_paragraphs[a0:a1])
+            elif op in ("replace", "insert"):
+                for paragraph in source_paragraphs[b0:b1]:
+                    pipeline_profile.count("paragraphs_retranslated")
+                    out.append(_one_paragraph(translate(paragraph)) or paragraph)
+        return "\n\n".join(out), _stamp(current, source_paragraphs, out)
+
+    translated = translate(source)
+    translated_paragraphs = paragraphs(translated)
+    if len(translated_paragraphs) != len(current):
+        return translated, None
+    return translated, _stamp(current, source_paragraphs, translated_paragraphs)
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""Replace non-translatable Markdown spans with placeholders around MT.
+
+Bodies used to go to the translators as raw Markdown: URLs, code and image
+references cost provider quota and came back mangled (hence the hard-coded URL
+repairs in fix_post_translation_links.py and the "] (" fix-ups). protect() masks,
+in this order (earlier spans win):
+
+- fenced code blocks (an unclosed fence runs to the end of the chunk)
+- inline code, images, reference-link definitions, inline HTML tags
+- link targets "(url)" directly after "]"; restore() drops any space MT puts
+  between "]" and the placeholder, so the link stays a link
+- autolinks and bare http(s) URLs, and text that already looks like a placeholder
+- on heading lines, glossary heading_overrides phrases; these restore to the
+  locale's canonical translation instead of the English (capitalized like the
+  heading), so MT cannot pick the wrong sense (see translation_glossary.py)
+
+Placeholders are {{n}}. restore() tolerates MT adding spaces inside them but
+returns None unless every placeholder comes back exactly once and no new one
+appears; TranslationScheduler then sends that chunk unmasked instead. A chunk with
+nothing left to translate (a code block, a lone image) is not sent at all.
+Stdlib-only.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+
+from translation_glossary import Glossary
+
+_PATTERNS = (
+    re.compile(r"^(```|~~~)[^\n]*\n.*?(?:^\1[ \t]*$|\Z)", re.MULTILINE | re.DOTALL),
+    re.compile(r"(`+)[^\n]+?\1"),
+    re.compile(r"!\[[^\]\n]*\]\([^)\n]*\)"),
+    re.compile(r"^[ \t]*\[[^\]\n]+\]:[ \t]*\S.*$", re.MULTILINE),
+    re.compile(r"</?[A-Za-z][^<>\n]*>"),
+    re.compile(r"(?<=\])\([^()\s]+(?:\s+\"[^\"\n]*\")?\)"),
+    re.compile(r"https?://[^\s<>()\[\]]*[^\s<>()\[\].,;:!?'\"]"),
+    re.compile(r"\{\{\s*\d+\s*\}\}"),
+)
+_LINK_TARGET = 5
+_PLACEHOLDER = re.compile(r"(\]\s*)?\{\s*\{\s*(\d+)\s*\}\s*\}")
+_LETTER = re.compile(r"[^\W\d_]")
+
+
+@dataclass(frozen=True)
+class Protected:
+    text: str
+    spans: tuple[str, ...]
+    link_targets: frozenset[int] = frozenset()
+
+
+def _free(taken: list[tuple[int, int]], start: int, end: int) -> bool:
+    return all(end <= s or start >= e for s, e in taken)
+
+
+def protect(text: str, locale: str, glossary: Glossary | None = None) -> Protected:
+    """text with non-translatable spans replaced by {{n}} placeholders."""
+    found: list[tuple[int, int, str, bool]] = []
+    taken: list[tuple[int, int]] = []
+    for kind, pattern in enumerate(_PATTERNS):
+        for m in pattern.finditer(text):
+            if m.end() > m.start() and _free(taken, m.start(), m.end()):
+                found.append((m.start(), m.end(), m.group(0), kind == _LINK_TARGET))
+                taken.append((m.start(), m.end()))
+    if glossary is not None:
+        for start, end, replacement in glossary.heading_phrase_spans(text, locale):
+            if text[start].isupper():
+                replacement = replacement[:1].upper() + replacement[1:]
+            if _free(taken, start, end):
+                found.append((start, end, replacement, False))
+                taken.append((start, end))
+    if not found:
+        return Protected(text, ())
+    found.sort()
+    parts: list[str] = []
+    pos = 0
+    for i, (start, end, _, _) in enumerate(found):
+        parts.append(text[pos:start])
+        parts.append(f"{{{{{i}}}}}")
+        pos = end
+    parts.append(text[pos:])
+    return Protected(
+        "".join(parts),
+        tuple(value for _, _, value, _ in found),
+        frozenset(i for i, (_, _, _, link) in enumerate(found) if link),
+    )
+
+
+def restore(translated: str, protected: Protected) -> str | None:
+    """translated with the spans put back, or None if a placeholder was lost, repeated or invented."""
+    if not protected.spans:
+        return None if _PLACEHOLDER.search(translated) else translated
+    seen: list[int] = []
+
+    def put_back(m: re.Match[str]) -> str:
+        i = int(m.group(2))
+        seen.append(i)
+        if i >= len(protected.spans):
+            return m.group(0)
+        before = m.group(1) or ""
+        if before and i in protected.link_targets:
+            before = "]"
+        return before + protected.spans[i]
+
+    restored = _PLACEHOLDER.sub(put_back, translated)
+    return restored if sorted(seen) == list(range(len(protected.spans))) else None
+
+
+def needs_translation(protected: Protected) -> bool:
+    """False when nothing but placeholders, digits and punctuation is left to translate."""
+    return bool(_LETTER.search(_PLACEHOLDER.sub("", protected.text)))
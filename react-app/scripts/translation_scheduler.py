@@ -0,0 +1,528 @@
+#!/usr/bin/env python3
+"""Concurrent chunk translation with per-provider rate limits.
+
+generate_locale_translations.py and translate_one_slug_locales.py first walk their
+posts without translating, collecting every (locale, chunk) the translators would
+be sent, then hand the chunks that are not in the translation memory to
+TranslationScheduler.run() and assemble the files from its results. Assembly is
+keyed by (locale, chunk), so the output does not depend on completion order: any
+--workers value writes the same files as --workers 1 (a serial run, no threads).
+
+Each chunk still walks its locale's translators in fallback order. Calls to one
+provider share a TokenBucket (rate per second, small burst); an error pauses that
+provider for an exponentially growing backoff (halved again by each success) and
+the call is retried up to ATTEMPTS_PER_PROVIDER times before falling back to the
+next provider. After BREAKER_FAILURES consecutive errors the provider's
+CircuitBreaker opens and its calls are skipped for BREAKER_COOLDOWN_S, so a
+rate-limited Google no longer costs every chunk a failing call before MyMemory
+gets it. report() gives throughput, breaker state and call latency per provider.
+
+--budget PROVIDER=CHARS caps the characters sent to a provider in one run. Before
+batching, admit() walks the jobs in order and charges each to the first provider of
+its locale with budget left; jobs that fit nowhere are deferred, so callers that
+order jobs by importance (generate_locale_translations.py puts recent listed posts
+first) spend a tight budget on those. At call time the cap is hard (retries count,
+as providers bill them): a call that would exceed it is not made and the chunk falls
+through to the next provider. A chunk no provider translated keeps its English text
+and is retried on the next run (see translation_paragraphs.py).
+
+deep_translator instances keep per-request state, so every worker thread builds
+its own backends (translation_backends.py) through make_translators(locale).
+Small chunks of one locale are packed into shared requests (translation_batching.py),
+and code, URLs and glossary heading terms are masked with placeholders
+(translation_placeholders.py).
+
+Stdlib-only; the translators are whatever make_translators returns.
+"""
+
+from __future__ import annotations
+
+import argparse
+import functools
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Callable, Iterable
+
+import pipeline_profile
+from translation_batching import (
+    DEFAULT_BATCH_CHARS,
+    MARKER_CHARS,
+    PROVIDER_MAX_CHARS,
+    batch_jobs,
+    pack_segments,
+    packable,
+    unpack_segments,
+)
+from translation_glossary import Glossary
+from translation_memory import norm_text, provider_name
+from translation_placeholders import Protected, needs_translation, protect, restore
+
+DEFAULT_WORKERS = 8
+# Requests per second per provider; unlisted providers are not rate-limited.
+DEFAULT_RATES = {"GoogleTranslator": 5.0, "MyMemoryTranslator": 2.0}
+ATTEMPTS_PER_PROVIDER = 3
+MIN_BACKOFF_S = 1.0
+MAX_BACKOFF_S = 60.0
+BREAKER_FAILURES = 5
+BREAKER_COOLDOWN_S = 60.0
+
+
+class TokenBucket:
+    """Thread-safe token bucket with adaptive error backoff; rate <= 0 means unlimited."""
+
+    def __init__(
+        self,
+        rate: float,
+        burst: float = 2.0,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.rate = rate
+        self.burst = max(burst, 1.0)
+        self.backoff_s = 0.0
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._tokens = self.burst
+        self._updated = clock()
+        self._paused_until = 0.0
+
+    def acquire(self) -> float:
+        """Take one token, sleeping as needed; returns the seconds waited."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = self._clock()
+                wait = self._paused_until - now
+                if wait <= 0:
+                    if self.rate <= 0:
+                        return waited
+                    self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                    self._updated = now
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return waited
+                    wait = (1 - self._tokens) / self.rate
+            self._sleep(wait)
+            waited += wait
+
+    def penalize(self) -> None:
+        """An error: pause every caller for a backoff that doubles per consecutive error."""
+        with self._lock:
+            self.backoff_s = min(MAX_BACKOFF_S, max(MIN_BACKOFF_S, self.backoff_s * 2))
+            self._paused_until = max(self._paused_until, self._clock() + self.backoff_s)
+
+    def relax(self) -> None:
+        with self._lock:
+            self.backoff_s = self.backoff_s / 2 if self.backoff_s / 2 >= MIN_BACKOFF_S else 0.0
+
+
+class CircuitBreaker:
+    """Stops calling a failing provider.
+
+    Opens after `failures` consecutive errors; while open every call is refused (the
+    chunk goes to the next provider at once). After cooldown_s one trial call is let
+    through (half-open): success closes the breaker, failure opens it again.
+    """
+
+    def __init__(
+        self,
+        failures: int = BREAKER_FAILURES,
+        cooldown_s: float = BREAKER_COOLDOWN_S,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.failures = failures
+        self.cooldown_s = cooldown_s
+        self.state = "closed"
+        self.opens = 0
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._consecutive = 0
+        self._open_until = 0.0
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and self._clock() >= self._open_until:
+                self.state = "half-open"
+                return True
+            return False
+
+    def record(self, ok: bool) -> None:
+        with self._lock:
+            if ok:
+                self.state, self._consecutive = "closed", 0
+                return
+            self._consecutive += 1
+            if self.state == "half-open" or self._consecutive >= self.failures:
+                self.state, self._consecutive = "open", 0
+                self.opens += 1
+                self._open_until = self._clock() + self.cooldown_s
+
+
+@dataclass(frozen=True)
+class ChunkJob:
+    locale: str
+    chunk: str
+
+
+@dataclass(frozen=True)
+class ChunkResult:
+    """text is the last non-empty candidate (or the chunk); translated: it differs from the chunk."""
+
+    text: str
+    provider: str | None
+    translated: bool
+
+
+@dataclass
+class ProviderStats:
+    calls: int = 0
+    errors: int = 0
+    chunks: int = 0
+    chars: int = 0
+    misaligned: int = 0
+    placeholder_mismatches: int = 0
+    skipped: int = 0
+    over_budget: int = 0
+    waited_s: float = 0.0
+    latencies_s: list[float] = field(default_factory=list)
+
+
+class TranslationScheduler:
+    def __init__(
+        self,
+        make_translators: Callable[[str], list],
+        workers: int = DEFAULT_WORKERS,
+        rates: dict[str, float] | None = None,
+        bucket_factory: Callable[[float], TokenBucket] = TokenBucket,
+        breaker_factory: Callable[[], CircuitBreaker] = CircuitBreaker,
+        log_errors: bool = False,
+        batch_chars: int = DEFAULT_BATCH_CHARS,
+        placeholders: bool = True,
+        glossary: Glossary | None = None,
+        budgets: dict[str, int] | None = None,
+    ) -> None:
+        self.make_translators = make_translators
+        self.log_errors = log_errors
+        self.batch_chars = batch_chars
+        self.placeholders = placeholders
+        self.glossary = glossary
+        self.workers = max(1, workers)
+        self.rates = dict(DEFAULT_RATES if rates is None else rates)
+        self.stats: dict[str, ProviderStats] = {}
+        self.elapsed_s = 0.0
+        self.untranslated = 0
+        self.deferred = 0
+        self.budgets = dict(budgets or {})
+        self._spent: dict[str, int] = {}
+        self._bucket_factory = bucket_factory
+        self._breaker_factory = breaker_factory
+        self._buckets: dict[str, TokenBucket] = {}
+        self.breakers: dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _provider(self, name: str) -> tuple[TokenBucket, CircuitBreaker, ProviderStats]:
+        with self._lock:
+            if name not in self._buckets:
+                self._buckets[name] = self._bucket_factory(self.rates.get(name, 0.0))
+                self.breakers[name] = self._breaker_factory()
+                self.stats[name] = ProviderStats()
+            return self._buckets[name], self.breakers[name], self.stats[name]
+
+    def _translators(self, locale: str) -> list:
+        cache = getattr(self._local, "translators", None)
+        if cache is None:
+            cache = self._local.translators = {}
+        if locale not in cache:
+            cache[locale] = self.make_translators(locale)
+        return cache[locale]
+
+    def _spend(self, name: str, chars: int) -> bool:
+        """Charge chars to name's budget; False (nothing charged) when it would be exceeded."""
+        with self._lock:
+            if name not in self.budgets:
+                return True
+            spent = self._spent.get(name, 0)
+            if spent + chars > self.budgets[name]:
+                self.stats[name].over_budget += 1
+                return False
+            self._spent[name] = spent + chars
+            return True
+
+    def _call(self, translator: object, chunk: str) -> str | None:
+        """One provider's translation of chunk (None after ATTEMPTS_PER_PROVIDER errors, an open breaker or no budget)."""
+        name = provider_name(translator)
+        bucket, breaker, stats = self._provider(name)
+        for _ in range(ATTEMPTS_PER_PROVIDER):
+            if not self._spend(name, len(chunk)):
+                pipeline_profile.count("translator_calls_over_budget")
+                return None
+            if not breaker.allow():
+                pipeline_profile.count("translator_calls_skipped")
+                with self._lock:
+                    stats.skipped += 1
+                return None
+            waited = bucket.acquire()
+            pipeline_profile.count("translator_calls")
+            pipeline_profile.count("chars_sent", len(chunk))
+            with self._lock:
+                stats.calls += 1
+                stats.waited_s += waited
+            started = time.perf_counter()
+            try:
+                candidate = (translator.translate(chunk) or "").strip()
+            except Exception as exc:
+                if self.log_errors:
+                    print(f"  {name} error (backing off {bucket.backoff_s * 2 or MIN_BACKOFF_S:.0f}s): {exc}", file=sys.stderr)
+                with self._lock:
+                    stats.errors += 1
+                breaker.record(False)
+                bucket.penalize()
+                continue
+            with self._lock:
+                stats.latencies_s.append(time.perf_counter() - started)
+            breaker.record(True)
+            bucket.relax()
+            return candidate
+        return None
+
+    def _protect(self, job: ChunkJob) -> Protected:
+        if not self.placeholders:
+            return Protected(job.chunk, ())
+        return protect(job.chunk, job.locale, self.glossary)
+
+    def send_chars(self, job: ChunkJob) -> int:
+        """Characters run() sends for job before batch markers and retries (0: resolved locally)."""
+        mask = self._protect(job)
+        return len(mask.text) if needs_translation(mask) else 0
+
+    def admit(
+        self, jobs: Iterable[ChunkJob], providers: Callable[[str], list[str]]
+    ) -> tuple[list[ChunkJob], list[ChunkJob]]:
+        """(jobs the budgets cover, jobs they do not), in order; providers(locale) gives the fallback order."""
+        if not self.budgets:
+            return list(jobs), []
+        left = {name: chars - self._spent.get(name, 0) for name, chars in self.budgets.items()}
+        funded: list[ChunkJob] = []
+        deferred: list[ChunkJob] = []
+        for job in jobs:
+            mask = self._protect(job)
+            chars = len(mask.text) + (MARKER_CHARS if self.batch_chars > 0 and packable(mask.text) else 0)
+            name = next((n for n in providers(job.locale) if left.get(n, chars) >= chars), None)
+            if name is None:
+                deferred.append(job)
+                continue
+            if name in left:
+                left[name] -= chars
+            funded.append(job)
+        return funded, deferred
+
+    def _unmask(self, name: str, candidate: str, mask: Protected) -> str | None:
+        restored = restore(candidate, mask) if mask.spans else candidate
+        if restored is None:
+            pipeline_profile.count("placeholder_mismatches")
+            with self._lock:
+                self.stats[name].placeholder_mismatches += 1
+        return restored
+
+    def _accept(self, name: str, job: ChunkJob, candidate: str) -> ChunkResult | None:
+        if norm_text(candidate) == norm_text(job.chunk):
+            return None
+        with self._lock:
+            self.stats[name].chunks += 1
+            self.stats[name].chars += len(job.chunk)
+        return ChunkResult(candidate, name, True)
+
+    def _translate(self, job: ChunkJob, mask: Protected) -> ChunkResult:
+        text, produced_by = job.chunk, None
+        for translator in self._translators(job.locale):
+            name = provider_name(translator)
+            candidate = self._call(translator, mask.text)
+            if candidate and mask.spans:
+                # A lost or duplicated placeholder: this provider gets the raw chunk instead.
+                candidate = self._unmask(name, candidate, mask) or self._call(translator, job.chunk)
+            if not candidate:
+                continue
+            text, produced_by = candidate, name
+            accepted = self._accept(name, job, candidate)
+            if accepted:
+                return accepted
+        return ChunkResult(text, produced_by, False)
+
+    def _translate_batch(
+        self, jobs: list[ChunkJob], masks: dict[ChunkJob, Protected]
+    ) -> list[tuple[ChunkJob, ChunkResult]]:
+        """One request for several small chunks; chunks it does not translate are sent alone."""
+        packed = pack_segments([masks[job].text for job in jobs])
+        for translator in self._translators(jobs[0].locale):
+            name = provider_name(translator)
+            if len(packed) > PROVIDER_MAX_CHARS.get(name, len(packed)):
+                continue
+            candidate = self._call(translator, packed)
+            if not candidate:
+                continue
+            segments = unpack_segments(candidate, len(jobs))
+            if segments is None:
+                pipeline_profile.count("translation_batches_misaligned")
+                with self._lock:
+                    self.stats[name].misaligned += 1
+                break
+            pipeline_profile.count("translation_batches")
+            out: list[tuple[ChunkJob, ChunkResult]] = []
+            for job, segment in zip(jobs, segments):
+                restored = self._unmask(name, segment, masks[job])
+                accepted = self._accept(name, job, restored) if restored is not None else None
+                out.append((job, accepted or self._translate(job, masks[job])))
+            return out
+        return [(job, self._translate(job, masks[job])) for job in jobs]
+
+    def _translate_one(self, job: ChunkJob, mask: Protected) -> list[tuple[ChunkJob, ChunkResult]]:
+        return [(job, self._translate(job, mask))]
+
+    def run(
+        self,
+        jobs: Iterable[ChunkJob],
+        on_result: Callable[[ChunkJob, ChunkResult], None] | None = None,
+    ) -> dict[ChunkJob, ChunkResult]:
+        """Translate every distinct job; on_result runs in the calling thread as each one finishes."""
+        masks = {job: self._protect(job) for job in dict.fromkeys(jobs)}
+        results: dict[ChunkJob, ChunkResult] = {}
+
+        def collect(done: list[tuple[ChunkJob, ChunkResult]]) -> None:
+            for job, result in done:
+                results[job] = result
+                if on_result:
+                    on_result(job, result)
+
+        # Nothing left but code, URLs or glossary terms: resolved without a provider call.
+        local = [job for job, mask in masks.items() if not needs_translation(mask)]
+        for job in local:
+            text = restore(masks[job].text, masks[job]) or job.chunk
+            collect([(job, ChunkResult(text, None, text != job.chunk))])
+        pending = [job for job in masks if job not in results]
+        funded, deferred = self.admit(pending, lambda locale: [provider_name(t) for t in self._translators(locale)])
+        for job in deferred:
+            collect([(job, ChunkResult(job.chunk, None, False))])
+        self.deferred += len(deferred)
+        batches, singles = batch_jobs(funded, lambda j: masks[j].text, lambda j: j.locale, self.batch_chars)
+        # Start tasks in job order (a batch at its first job) so earlier jobs get the budget first.
+        order = {job: i for i, job in enumerate(funded)}
+        ordered = sorted(
+            [(order[batch[0]], functools.partial(self._translate_batch, batch, masks)) for batch in batches]
+            + [(order[job], functools.partial(self._translate_one, job, masks[job])) for job in singles],
+            key=lambda task: task[0],
+        )
+        tasks = [task for _, task in ordered]
+
+        started = time.perf_counter()
+        if self.workers == 1 or len(tasks) <= 1:
+            for task in tasks:
+                collect(task())
+        else:
+            with ThreadPoolExecutor(max_workers=min(self.workers, len(tasks))) as pool:
+                for future in as_completed([pool.submit(task) for task in tasks]):
+                    collect(future.result())
+        self.elapsed_s += time.perf_counter() - started
+        self.untranslated += sum(1 for job in pending if results[job].provider is None)
+        return results
+
+    def report(self) -> list[str]:
+        """Per provider: throughput (translated chunks and their source chars per second), then health."""
+        elapsed = max(self.elapsed_s, 1e-9)
+        lines: list[str] = []
+        for name, s in sorted(self.stats.items()):
+            latencies = sorted(s.latencies_s)
+            p50 = latencies[len(latencies) // 2] if latencies else 0.0
+            p95 = latencies[min(len(latencies) - 1, len(latencies) * 95 // 100)] if latencies else 0.0
+            lines.append(
+                f"{name}: {s.chunks} chunks, {s.chars} chars in {self.elapsed_s:.1f}s"
+                f" ({s.chunks / elapsed:.2f} chunks/s, {s.chars / elapsed:.0f} chars/s);"
+                f" {s.calls} calls, {s.errors} errors, {s.misaligned} misaligned batches,"
+                f" {s.placeholder_mismatches} placeholder mismatches, {s.waited_s:.1f}s rate-limited"
+            )
+            lines.append(
+                f"  health: breaker {self.breakers[name].state} (opened {self.breakers[name].opens}x,"
+                f" {s.skipped} calls skipped); latency p50 {p50 * 1000:.0f} ms, p95 {p95 * 1000:.0f} ms"
+            )
+            if name in self.budgets:
+                lines.append(
+                    f"  budget: {self._spent.get(name, 0)} of {self.budgets[name]} chars used,"
+                    f" {s.over_budget} calls over budget"
+                )
+        if self.untranslated:
+            lines.append(
+                f"{self.untranslated} chunks untranslated ({self.deferred} deferred by --budget);"
+                " they are retried next run"
+            )
+        return lines
+
+
+def _provider_value(value: str, cast: Callable[[str], float], unit: str) -> tuple[str, float]:
+    name, sep, amount = value.partition("=")
+    try:
+        if not sep or not name or cast(amount) < 0:
+            raise ValueError
+        return name, cast(amount)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected PROVIDER={unit}, got {value!r}") from None
+
+
+def _rate(value: str) -> tuple[str, float]:
+    return _provider_value(value, float, "REQUESTS_PER_SECOND")
+
+
+def _budget(value: str) -> tuple[str, int]:
+    name, chars = _provider_value(value, int, "CHARS")
+    return name, int(chars)
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help=f"Concurrent translator calls (default: {DEFAULT_WORKERS}; 1 = serial)",
+    )
+    parser.add_argument(
+        "--rate",
+        type=_rate,
+        action="append",
+        default=[],
+        metavar="PROVIDER=N",
+        help="Requests per second for one provider, e.g. GoogleTranslator=5 (0: unlimited; "
+        f"defaults: {', '.join(f'{k}={v:g}' for k, v in DEFAULT_RATES.items())})",
+    )
+    parser.add_argument(
+        "--budget",
+        type=_budget,
+        action="append",
+        default=[],
+        metavar="PROVIDER=CHARS",
+        help="Send at most this many characters to one provider in this run, e.g. GoogleTranslator=500000",
+    )
+    parser.add_argument(
+        "--batch-chars",
+        type=int,
+        default=DEFAULT_BATCH_CHARS,
+        help=f"Pack small chunks into requests of up to this many characters (default: {DEFAULT_BATCH_CHARS}; 0 = off)",
+    )
+    parser.add_argument(
+        "--no-placeholders",
+        dest="placeholders",
+        action="store_false",
+        help="Send Markdown as-is instead of masking code, URLs and glossary terms",
+    )
+
+
+def rates_from_args(args: argparse.Namespace) -> dict[str, float]:
+    return {**DEFAULT_RATES, **dict(args.rate)}
+
+
+def budgets_from_args(args: argparse.Namespace) -> dict[str, int]:
+    return dict(args.budget)
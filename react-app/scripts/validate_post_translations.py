@@ -1,12 +1,19 @@
 #!/usr/bin/env python3
-"""Fail deploy if published posts are missing required locale translations."""
+"""Fail deploy if published posts are missing required locale translations.
+
+Reads the caches through the content store (content_store.py), so per-slug lookups
+are indexed queries rather than scans of each locale list. Only the post caches are
+synced; the producers have usually recorded them already.
+"""
 
 from __future__ import annotations
 
-import json
 import sys
 from pathlib import Path
 
+import pipeline_profile
+from content_store import BASE, ContentStore, open_store
+
 
 ROOT = Path(__file__).resolve().parents[1]
 CACHE_POSTS = ROOT / "cache" / "posts.json"
@@ -35,11 +42,13 @@ LOCALE_CACHES = {
 REQUIRED_FIELDS = ("title", "excerpt", "summary", "body")
 
 
-def _read_json(path: Path):
+def _require_posts(store: ContentStore, locale: str, path: Path) -> None:
     try:
-        return json.loads(path.read_text(encoding="utf-8"))
-    except Exception as exc:
-        raise RuntimeError(f"Failed to parse JSON at {path}: {exc}") from exc
+        present = store.has_posts(locale)
+    except ValueError as exc:
+        raise RuntimeError(str(exc)) from exc
+    if not present:
+        raise RuntimeError(f"Missing {path}")
 
 
 def _norm_text(value: str) -> str:
@@ -55,42 +64,35 @@ def _looks_english(value: str) -> bool:
 
 
 def main() -> int:
-    posts = _read_json(CACHE_POSTS)
-    if not isinstance(posts, list):
-        raise RuntimeError(f"Expected list in {CACHE_POSTS}")
-    en_posts = _read_json(EN_CACHE_POSTS)
-    if not isinstance(en_posts, list):
-        raise RuntimeError(f"Expected list in {EN_CACHE_POSTS}")
-    en_by_slug = {
-        p.get("slug"): p for p in en_posts if isinstance(p, dict) and p.get("slug")
-    }
-
-    published_slugs = sorted(
-        {
-            p.get("slug")
-            for p in posts
-            if isinstance(p, dict) and p.get("published") and p.get("slug")
-        }
-    )
+    pipeline_profile.start("validate_post_translations")
+    with open_store(sync=False) as store:
+        store.sync(only=[CACHE_POSTS, EN_CACHE_POSTS, *LOCALE_CACHES.values()])
+        return _validate(store)
+
+
+def _validate(store: ContentStore) -> int:
+    _require_posts(store, BASE, CACHE_POSTS)
+    _require_posts(store, "en", EN_CACHE_POSTS)
+    published_slugs = store.published_slugs(BASE)
+    # Normalized en fields per slug, shared by every locale.
+    en_norm: dict[str, dict[str, str] | None] = {}
 
     failures: list[str] = []
     for locale, path in LOCALE_CACHES.items():
-        if not path.exists():
-            failures.append(f"{locale}: locale cache missing at {path}")
+        try:
+            present = store.has_posts(locale)
+        except ValueError as exc:
+            failures.append(f"{locale}: {exc}")
             continue
-        data = _read_json(path)
-        if not isinstance(data, list):
-            failures.append(f"{locale}: expected list in {path}")
+        if not present:
+            failures.append(f"{locale}: locale cache missing at {path}")
             continue
 
         missing_entries: list[str] = []
         missing_fields: list[str] = []
         untranslated_fields: list[str] = []
         for slug in published_slugs:
-            entry = next(
-                (p for p in data if isinstance(p, dict) and p.get("canonicalSlug") == slug),
-                None,
-            )
+            entry = store.post_by_canonical(locale, slug)
             if not isinstance(entry, dict):
                 missing_entries.append(slug)
                 continue
@@ -100,16 +102,17 @@ def main() -> int:
                 continue
 
             # Guard against stale fallback where locale cache silently retains English source.
-            source = en_by_slug.get(slug)
-            if isinstance(source, dict):
-                unchanged = [
-                    f
-                    for f in REQUIRED_FIELDS
-                    if _norm_text(entry.get(f, "")) == _norm_text(source.get(f, ""))
-                ]
-                # Flag stale English fallback only when the full article body remains unchanged.
-                # Titles may intentionally stay identical for names/terms (e.g., "Kanban").
-                if "body" in unchanged and _looks_english(source.get("body", "")):
+            if slug not in en_norm:
+                source = store.post("en", slug)
+                en_norm[slug] = (
+                    {f: _norm_text(source.get(f, "")) for f in REQUIRED_FIELDS} if isinstance(source, dict) else None
+                )
+            source_norm = en_norm[slug]
+            # Flag stale English fallback only when the full article body remains unchanged.
+            # Titles may intentionally stay identical for names/terms (e.g., "Kanban").
+            if source_norm is not None and _norm_text(entry.get("body", "")) == source_norm["body"]:
+                unchanged = [f for f in REQUIRED_FIELDS if _norm_text(entry.get(f, "")) == source_norm[f]]
+                if _looks_english(source_norm["body"]):
                     untranslated_fields.append(
                         f"{slug} (unchanged from en: {', '.join(unchanged)})"
                     )
@@ -1,6 +1,5 @@
 #!/usr/bin/env node
 
-import { watch } from 'node:fs'
 import path from 'node:path'
 import { fileURLToPath } from 'node:url'
 import { spawn } from 'node:child_process'
@@ -9,76 +8,40 @@ const __dirname = path.dirname(fileURLToPath(import.meta.url))
 const appRoot = path.resolve(__dirname, '..')
 const generateScript = path.join(appRoot, 'scripts', 'generate_cache.py')
 
-const watchedTargets = [
-  path.join(appRoot, 'src', 'content', 'posts'),
-]
+// generate_cache.py --watch stays resident: it polls src/content/posts (+ drafts),
+// public/images/{posts,og} and the export, and rebuilds only the affected slugs.
+const RESTART_DELAY_MS = 2000
 
-let timer = null
-let running = false
-let queued = false
+let child = null
+let stopping = false
 
 function log(message) {
   process.stdout.write(`[watch:cache] ${message}\n`)
 }
 
-function runGenerate() {
-  if (running) {
-    queued = true
-    return
-  }
-  running = true
-  const cmd = spawn('python3', [generateScript], {
+function startWatcher() {
+  child = spawn('python3', [generateScript, '--watch'], {
     cwd: appRoot,
     stdio: 'inherit',
     env: process.env,
   })
 
-  cmd.on('exit', (code) => {
-    if (code === 0) {
-      log('cache regenerated')
-    } else {
-      log(`cache regeneration failed (exit ${code ?? 'unknown'})`)
-    }
-    running = false
-    if (queued) {
-      queued = false
-      runGenerate()
-    }
+  child.on('exit', (code, signal) => {
+    child = null
+    if (stopping) return
+    log(`cache watcher exited (${signal ?? `exit ${code ?? 'unknown'}`}); restarting in ${RESTART_DELAY_MS / 1000}s`)
+    setTimeout(startWatcher, RESTART_DELAY_MS)
   })
 }
 
-function scheduleGenerate(eventType, filename) {
-  const label = filename ? `${eventType}: ${filename}` : eventType
-  log(`change detected (${label})`)
-
-  if (timer) {
-    clearTimeout(timer)
-  }
-  timer = setTimeout(() => {
-    timer = null
-    runGenerate()
-  }, 500)
+function stop() {
+  stopping = true
+  if (child) child.kill('SIGTERM')
+  process.exit(0)
 }
 
-for (const target of watchedTargets) {
-  watch(target, { recursive: true }, (eventType, filename) => {
-    // Only react to post content/metadata files relevant for publish/unpublish flow.
-    if (!filename) {
-      scheduleGenerate(eventType, filename)
-      return
-    }
-    const normalized = filename.toString()
-    if (
-      normalized.endsWith('.md') ||
-      normalized.endsWith('.summary.md') ||
-      normalized.endsWith('.tweet.md') ||
-      normalized.endsWith('posts.json')
-    ) {
-      scheduleGenerate(eventType, normalized)
-    }
-  })
-  log(`watching ${target}`)
-}
+log(`starting ${path.relative(appRoot, generateScript)} --watch`)
+startWatcher()
 
-process.on('SIGINT', () => process.exit(0))
-process.on('SIGTERM', () => process.exit(0))
+process.on('SIGINT', stop)
+process.on('SIGTERM', stop)